@@ -32,6 +32,7 @@ from gymnasium.envs.registration import register
 
 # Exporting envs:
 from flappy_bird_gymnasium.envs.flappy_bird_env import FlappyBirdEnv
+from flappy_bird_gymnasium.envs.flappy_bird_multi_env import FlappyBirdMultiEnv
 
 os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "hide"
 
@@ -40,7 +41,15 @@ register(
     entry_point="flappy_bird_gymnasium:FlappyBirdEnv",
 )
 
+register(
+    id="FlappyBirdMulti-v0",
+    entry_point="flappy_bird_gymnasium:FlappyBirdMultiEnv",
+    # the rewards and terminations are arrays of one value per bird
+    disable_env_checker=True,
+)
+
 # Main names:
 __all__ = [
     FlappyBirdEnv.__name__,
+    FlappyBirdMultiEnv.__name__,
 ]
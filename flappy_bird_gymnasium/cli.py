@@ -33,6 +33,7 @@ import pygame
 
 import flappy_bird_gymnasium
 from flappy_bird_gymnasium.tests.test_dqn import play as dqn_agent_env
+from flappy_bird_gymnasium.tests.test_evaluation import play as eval_agent_env
 from flappy_bird_gymnasium.tests.test_human import play as human_agent_env
 from flappy_bird_gymnasium.tests.test_random import play as random_agent_env
 
@@ -47,9 +48,39 @@ def _get_args():
         "-m",
         type=str,
         default="human",
-        choices=["human", "random", "dqn"],
+        choices=["human", "random", "dqn", "eval"],
         help="The execution mode for the game.",
     )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="tf",
+        choices=["tf", "numpy"],
+        help="The inference backend of the DQN agent.",
+    )
+    parser.add_argument(
+        "--episodes",
+        type=int,
+        default=500,
+        help="The number of seeded episodes of the evaluation.",
+    )
+    parser.add_argument(
+        "--envs",
+        type=int,
+        default=32,
+        help="The number of environments evaluated in lockstep.",
+    )
+    parser.add_argument(
+        "--score-limit",
+        type=int,
+        default=1000,
+        help="The score at which an evaluated episode is truncated.",
+    )
+    parser.add_argument(
+        "--lidar",
+        action="store_true",
+        help="If set, the DQN agent plays on the LIDAR observations.",
+    )
     parser.add_argument(
         "--quiet",
         action="store_true",
@@ -70,7 +101,18 @@ def main():
         )
     elif args.mode == "dqn":
         dqn_agent_env(
-            audio_on=(not args.quiet), render_mode="human" if not args.quiet else None
+            audio_on=(not args.quiet),
+            render_mode="human" if not args.quiet else None,
+            use_lidar=args.lidar,
+            backend=args.backend,
+        )
+    elif args.mode == "eval":
+        eval_agent_env(
+            episodes=args.episodes,
+            num_envs=args.envs,
+            use_lidar=args.lidar,
+            score_limit=args.score_limit,
+            backend=args.backend,
         )
     else:
         print("Invalid mode!")
@@ -21,7 +21,8 @@
 # SOFTWARE.
 # ==============================================================================
 
-""" Exposes the environment class.
+""" Exposes the environment classes.
 """
 
 from flappy_bird_gymnasium.envs.flappy_bird_env import FlappyBirdEnv
+from flappy_bird_gymnasium.envs.flappy_bird_multi_env import FlappyBirdMultiEnv
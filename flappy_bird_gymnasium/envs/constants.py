@@ -30,5 +30,8 @@ BACKGROUND_HEIGHT = 512
 #: Player's rotation threshold.
 PLAYER_ROT_THR = 20
 
+#: Sequence of the player's sprites animating its wings.
+PLAYER_INDICES = (0, 1, 2, 1)
+
 #: Color to fill the surface's background when no background image was loaded.
 FILL_BACKGROUND_COLOR = (200, 200, 200)
@@ -29,8 +29,8 @@ GitHub repository by `sourahbhv` (https://github.com/sourabhv/FlapPyBird),
 released under the MIT license.
 """
 
+import time
 from enum import IntEnum
-from itertools import cycle
 from typing import Dict, Optional, Tuple, Union
 
 import gymnasium
@@ -49,6 +49,7 @@ from flappy_bird_gymnasium.envs.constants import (
     PLAYER_ACC_Y,
     PLAYER_FLAP_ACC,
     PLAYER_HEIGHT,
+    PLAYER_INDICES,
     PLAYER_MAX_VEL_Y,
     PLAYER_PRIVATE_ZONE,
     PLAYER_ROT_THR,
@@ -56,6 +57,38 @@ from flappy_bird_gymnasium.envs.constants import (
     PLAYER_WIDTH,
 )
 from flappy_bird_gymnasium.envs.lidar import LIDAR
+from flappy_bird_gymnasium.envs.pipe_schedule import (
+    GAP_YS,
+    RandomSchedule,
+    TrackSchedule,
+    load_track,
+)
+from flappy_bird_gymnasium.envs.profiling import PHASES, PhaseStats
+from flappy_bird_gymnasium.envs.telemetry import CrashType, EventLog, PipePosition
+
+PHYSICS = ("pipe_gap", "player_acc_y", "player_flap_acc", "pipe_vel_x")
+
+
+def check_physics(name: str, value: Union[float, np.ndarray]) -> None:
+    """Raises a `ValueError` if a physics parameter is unknown or invalid."""
+    if name not in PHYSICS:
+        raise ValueError(f"Unknown physics parameter: {name}!")
+    if name == "pipe_gap" and np.any(np.asarray(value) <= 0):
+        raise ValueError(f"The pipe gap must be positive, got {value}!")
+    if name == "pipe_vel_x" and np.any(np.asarray(value) >= 0):
+        raise ValueError(f"The pipe speed must be negative (to the left), got {value}!")
+
+
+# rebuilt when rendering instead of being pickled
+_RENDER_STATE = (
+    "_fps_clock",
+    "_display",
+    "_dirty_rects",
+    "_last_rects",
+    "_surface",
+    "_images",
+    "_sounds",
+)
 
 
 class Actions(IntEnum):
@@ -90,6 +123,26 @@ class FlappyBirdEnv(gymnasium.Env):
         background (Optional[str]): Type of background image. The currently
             available types are "day" and "night". If `None`, no background will
             be drawn.
+        track (Optional[str]): Path of a benchmark track, see
+            :mod:`~flappy_bird_gymnasium.envs.pipe_schedule`, from which the
+            gaps of the pipes are read instead of being random. The seed of
+            `reset` selects the row of the track. It can be changed with the
+            `"track"` option of `reset`.
+        pixel_collision (bool): If `True`, the player crashes into a pipe only
+            when the pixels of their sprites overlap, instead of their
+            rectangles. The hitmasks of the sprites are computed once per
+            process.
+        debug (bool): If `True`, the crash type, the nearest pipe, the shortest
+            LIDAR ray and the ground clearance of every step are recorded into
+            :attr:`telemetry`, a
+            :class:`~flappy_bird_gymnasium.envs.telemetry.EventLog`.
+        profile (Union[bool, str]): If `True`, the phases of every step
+            (action, score, physics, pipes, observation, crash and render) are
+            timed into :attr:`profile`, a
+            :class:`~flappy_bird_gymnasium.envs.profiling.PhaseStats`. With
+            `"episode"`, the timings of every episode are also summarized in
+            the `info` of its last step. Without profiling, :meth:`step` runs
+            the phases inline, without any timing or extra calls.
     """
 
     metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 30}
@@ -106,11 +159,16 @@ class FlappyBirdEnv(gymnasium.Env):
         render_mode: Optional[str] = None,
         background: Optional[str] = "day",
         score_limit: Optional[int] = None,
+        track: Optional[str] = None,
+        pixel_collision: bool = False,
         debug: bool = False,
+        profile: Union[bool, str] = False,
     ) -> None:
         assert render_mode is None or render_mode in self.metadata["render_modes"]
         self.render_mode = render_mode
-        self._debug = debug
+        self.telemetry = EventLog() if debug else None
+        self._episode = -1
+        self._episode_step = 0
         self._score_limit = score_limit
 
         self.action_space = gymnasium.spaces.Discrete(2)
@@ -137,11 +195,17 @@ class FlappyBirdEnv(gymnasium.Env):
         self._screen_height = screen_size[1]
         self._normalize_obs = normalize_obs
         self._pipe_gap = pipe_gap
+        self._player_acc_y = PLAYER_ACC_Y
+        self._player_flap_acc = PLAYER_FLAP_ACC
+        self._pipe_vel_x = PIPE_VEL_X
+        self._track = track
+        self._gaps = None
+        self._pixel_collision = pixel_collision
         self._audio_on = audio_on
         self._use_lidar = use_lidar
         self._sound_cache = None
         self._player_flapped = False
-        self._player_idx_gen = cycle([0, 1, 2, 1])
+        self._player_idx_step = 0
         self._bird_color = bird_color
         self._pipe_color = pipe_color
         self._bg_type = background
@@ -151,22 +215,64 @@ class FlappyBirdEnv(gymnasium.Env):
 
         if use_lidar:
             self._lidar = LIDAR(LIDAR_MAX_DISTANCE)
+
+        self.profile = None
+        if profile:
+            self.profile = PhaseStats(PHASES)
+            self._profile_info = profile == "episode"
+            self._profile_snapshot = None
+        self._bind_methods()
+
+        self._surface = None
+        if render_mode is not None:
+            self._init_render()
+
+    def _bind_methods(self) -> None:
+        """Chooses the implementations of the configuration."""
+        if self._use_lidar:
             self._get_observation = self._get_observation_lidar
         else:
             self._get_observation = self._get_observation_features
+        if self.profile is not None:
+            self.step = self._step_profiled
+            self.render = self._render_profiled
+
+    def _init_render(self) -> None:
+        """Loads the resources of the rendering."""
+        self._fps_clock = pygame.time.Clock()
+        self._display = None
+        self._dirty_rects = None
+        self._last_rects = None
+        self._surface = pygame.Surface((self._screen_width, self._screen_height))
+        self._images = utils.load_images(
+            convert=False,
+            bird_color=self._bird_color,
+            pipe_color=self._pipe_color,
+            bg_type=self._bg_type,
+        )
+        if self._audio_on:
+            self._sounds = utils.load_sounds()
 
-        if render_mode is not None:
-            self._fps_clock = pygame.time.Clock()
-            self._display = None
-            self._surface = pygame.Surface(screen_size)
-            self._images = utils.load_images(
-                convert=False,
-                bird_color=bird_color,
-                pipe_color=pipe_color,
-                bg_type=background,
-            )
-            if audio_on:
-                self._sounds = utils.load_sounds()
+    def __getstate__(self) -> Dict:
+        """Returns the configuration and the simulation state of the environment.
+
+        The pygame resources of the rendering aren't pickled, they are loaded
+        again by the first rendering after unpickling, and neither are the
+        records of the telemetry, which starts empty.
+        """
+        state = self.__dict__.copy()
+        for name in _RENDER_STATE + ("_get_observation", "step", "render"):
+            state.pop(name, None)
+        if self.telemetry is not None:
+            state["telemetry"] = self.telemetry.capacity
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        if self.telemetry is not None:
+            self.telemetry = EventLog(self.telemetry)
+        self._bind_methods()
+        self._surface = None
 
     def step(
         self,
@@ -198,28 +304,29 @@ class FlappyBirdEnv(gymnasium.Env):
         Returns:
             `True` if the player is alive and `False` otherwise.
         """
-        terminal = False
-        reward = None
-
+        # the phases are inlined, `_step_profiled` calls them one by one
         self._sound_cache = None
         if action == Actions.FLAP:
             if self._player_y > -2 * PLAYER_HEIGHT:
-                self._player_vel_y = PLAYER_FLAP_ACC
+                self._player_vel_y = self._player_flap_acc
                 self._player_flapped = True
                 self._sound_cache = "wing"
 
         # check for score
+        reward = None
         player_mid_pos = self._player_x + PLAYER_WIDTH / 2
         for pipe in self._upper_pipes:
             pipe_mid_pos = pipe["x"] + PIPE_WIDTH / 2
-            if pipe_mid_pos <= player_mid_pos < pipe_mid_pos + 4:
+            # the pipes pass the player's middle in one step
+            if pipe_mid_pos <= player_mid_pos < pipe_mid_pos - self._pipe_vel_x:
                 self._score += 1
                 reward = 1  # reward for passed pipe
                 self._sound_cache = "point"
 
         # player_index base_x change
         if (self._loop_iter + 1) % 3 == 0:
-            self._player_idx = next(self._player_idx_gen)
+            self._player_idx = PLAYER_INDICES[self._player_idx_step % 4]
+            self._player_idx_step += 1
 
         self._loop_iter = (self._loop_iter + 1) % 30
         self._ground["x"] = -((-self._ground["x"] + 100) % self._base_shift)
@@ -230,7 +337,7 @@ class FlappyBirdEnv(gymnasium.Env):
 
         # player's movement
         if self._player_vel_y < PLAYER_MAX_VEL_Y and not self._player_flapped:
-            self._player_vel_y += PLAYER_ACC_Y
+            self._player_vel_y += self._player_acc_y
 
         if self._player_flapped:
             self._player_flapped = False
@@ -245,8 +352,8 @@ class FlappyBirdEnv(gymnasium.Env):
 
         # move pipes to left
         for up_pipe, low_pipe in zip(self._upper_pipes, self._lower_pipes):
-            up_pipe["x"] += PIPE_VEL_X
-            low_pipe["x"] += PIPE_VEL_X
+            up_pipe["x"] += self._pipe_vel_x
+            low_pipe["x"] += self._pipe_vel_x
 
             # it is out of the screen
             if up_pipe["x"] < -PIPE_WIDTH:
@@ -260,73 +367,207 @@ class FlappyBirdEnv(gymnasium.Env):
             self.render()
 
         obs, reward_private_zone = self._get_observation()
+        crashed = self._check_crash()
+        if self.telemetry is not None:
+            self._record_telemetry(obs, crashed)
+
+        terminal = False
         if reward is None:
             if reward_private_zone is not None:
                 reward = reward_private_zone
             else:
                 reward = 0.1  # reward for staying alive
 
-        # check
-        if self._debug and self._use_lidar:
-            # sort pipes by the distance between pipe and agent
-            up_pipe = sorted(
-                self._upper_pipes,
-                key=lambda x: np.sqrt(
-                    (self._player_x - x["x"]) ** 2
-                    + (self._player_y - (x["y"] + PIPE_HEIGHT)) ** 2
-                ),
-            )[0]
-            # find ray closest to the obstacle
-            min_index = np.argmin(obs)
-            min_value = obs[min_index] * LIDAR_MAX_DISTANCE
-            # mean approach to the obstacle
-            if "pipe_mean_value" in self._statistics:
-                self._statistics["pipe_mean_value"] = self._statistics[
-                    "pipe_mean_value"
-                ] * 0.99 + min_value * (1 - 0.99)
-            else:
-                self._statistics["pipe_mean_value"] = min_value
+        # agent touch the top of the screen as punishment
+        if self._player_y < 0:
+            reward = -0.5
 
-            # Nearest to the pipe
-            if "pipe_min_value" in self._statistics:
-                if min_value < self._statistics["pipe_min_value"]:
-                    self._statistics["pipe_min_value"] = min_value
-                    self._statistics["pipe_min_index"] = min_index
-            else:
-                self._statistics["pipe_min_value"] = min_value
-                self._statistics["pipe_min_index"] = min_index
-
-            # Nearest to the ground
-            diff = np.abs(self._player_y - self._ground["y"])
-            if "ground_min_value" in self._statistics:
-                if diff < self._statistics["ground_min_value"]:
-                    self._statistics["ground_min_value"] = diff
+        # check for crash
+        if crashed:
+            self._sound_cache = "hit"
+            reward = -1  # reward for dying
+            terminal = True
+            self._player_vel_y = 0
+
+        info = {"score": self._score}
+
+        return (
+            obs,
+            reward,
+            terminal,
+            (self._score_limit is not None) and (self._score >= self._score_limit),
+            info,
+        )
+
+    def _step_profiled(
+        self,
+        action: Union[Actions, int],
+    ) -> Tuple[np.ndarray, float, bool, Dict]:
+        """Same as :meth:`step`, timing every phase into :attr:`profile`."""
+        clock = time.perf_counter_ns
+        add = self.profile.add
+
+        t0 = clock()
+        self._handle_action(action)
+        t1 = clock()
+        add(0, t1 - t0)
+        reward = self._check_score()
+        t0 = clock()
+        add(1, t0 - t1)
+        self._update_player()
+        t1 = clock()
+        add(2, t1 - t0)
+        self._move_pipes()
+        t0 = clock()
+        add(3, t0 - t1)
+
+        if self.render_mode == "human":
+            self.render()  # timed by `_render_profiled`
+
+        t0 = clock()
+        obs, reward_private_zone = self._get_observation()
+        t1 = clock()
+        add(4, t1 - t0)
+
+        t0 = clock()
+        crashed = self._check_crash()
+        add(5, clock() - t0)
+        if self.telemetry is not None:
+            self._record_telemetry(obs, crashed)
+
+        result = self._step_result(obs, reward, reward_private_zone, crashed)
+        if self._profile_info and (result[2] or result[3]):
+            result[4]["profile"] = self.profile.summary(since=self._profile_snapshot)
+        return result
+
+    def _render_profiled(self) -> Optional[np.ndarray]:
+        t0 = time.perf_counter_ns()
+        frame = FlappyBirdEnv.render(self)
+        self.profile.add(6, time.perf_counter_ns() - t0)
+        return frame
+
+    def _handle_action(self, action: Union[Actions, int]) -> None:
+        self._sound_cache = None
+        if action == Actions.FLAP:
+            if self._player_y > -2 * PLAYER_HEIGHT:
+                self._player_vel_y = self._player_flap_acc
+                self._player_flapped = True
+                self._sound_cache = "wing"
+
+    def _check_score(self) -> Optional[float]:
+        """Returns the reward for a passed pipe, if any."""
+        reward = None
+        player_mid_pos = self._player_x + PLAYER_WIDTH / 2
+        for pipe in self._upper_pipes:
+            pipe_mid_pos = pipe["x"] + PIPE_WIDTH / 2
+            # the pipes pass the player's middle in one step
+            if pipe_mid_pos <= player_mid_pos < pipe_mid_pos - self._pipe_vel_x:
+                self._score += 1
+                reward = 1  # reward for passed pipe
+                self._sound_cache = "point"
+        return reward
+
+    def _update_player(self) -> None:
+        # player_index base_x change
+        if (self._loop_iter + 1) % 3 == 0:
+            self._player_idx = PLAYER_INDICES[self._player_idx_step % 4]
+            self._player_idx_step += 1
+
+        self._loop_iter = (self._loop_iter + 1) % 30
+        self._ground["x"] = -((-self._ground["x"] + 100) % self._base_shift)
+
+        # rotate the player
+        if self._player_rot > -90:
+            self._player_rot -= PLAYER_VEL_ROT
+
+        # player's movement
+        if self._player_vel_y < PLAYER_MAX_VEL_Y and not self._player_flapped:
+            self._player_vel_y += self._player_acc_y
+
+        if self._player_flapped:
+            self._player_flapped = False
+
+            # more rotation to cover the threshold
+            # (calculated in visible rotation)
+            self._player_rot = 45
+
+        self._player_y += min(
+            self._player_vel_y, self._ground["y"] - self._player_y - PLAYER_HEIGHT
+        )
+
+    def _move_pipes(self) -> None:
+        # move pipes to left
+        for up_pipe, low_pipe in zip(self._upper_pipes, self._lower_pipes):
+            up_pipe["x"] += self._pipe_vel_x
+            low_pipe["x"] += self._pipe_vel_x
+
+            # it is out of the screen
+            if up_pipe["x"] < -PIPE_WIDTH:
+                new_up_pipe, new_low_pipe = self._get_random_pipe()
+                up_pipe["x"] = new_up_pipe["x"]
+                up_pipe["y"] = new_up_pipe["y"]
+                low_pipe["x"] = new_low_pipe["x"]
+                low_pipe["y"] = new_low_pipe["y"]
+
+    def _record_telemetry(self, obs: np.ndarray, crash: CrashType) -> None:
+        """Writes the record of the step into :attr:`telemetry`."""
+        self._episode_step += 1
+
+        # nearest pipe not passed yet
+        front = self._player_x + PLAYER_WIDTH
+        pipe_x, gap_y = np.inf, np.nan
+        for up_pipe, low_pipe in zip(self._upper_pipes, self._lower_pipes):
+            if self._player_x < up_pipe["x"] + PIPE_WIDTH and up_pipe["x"] < pipe_x:
+                pipe_x = up_pipe["x"]
+                gap_y = (up_pipe["y"] + PIPE_HEIGHT + low_pipe["y"]) / 2
+        position = PipePosition.BETWEEN if front > pipe_x else PipePosition.IN_FRONT
+
+        if self._use_lidar:
+            ray_index = int(obs.argmin())
+            ray_value = obs[ray_index]
+            if self._normalize_obs:
+                ray_value *= LIDAR_MAX_DISTANCE
+        else:
+            ray_index, ray_value = -1, np.nan
+
+        self.telemetry.record(
+            self._episode,
+            self._episode_step,
+            self._score,
+            crash,
+            position,
+            pipe_x - front,
+            self._player_y + PLAYER_HEIGHT / 2 - gap_y,
+            ray_index,
+            ray_value,
+            self._ground["y"] - self._player_y - PLAYER_HEIGHT,
+        )
+
+    def _step_result(
+        self,
+        obs: np.ndarray,
+        reward: Optional[float],
+        reward_private_zone: Optional[float],
+        crashed: CrashType,
+    ) -> Tuple[np.ndarray, float, bool, bool, Dict]:
+        """Computes the reward and the status of the step."""
+        terminal = False
+        if reward is None:
+            if reward_private_zone is not None:
+                reward = reward_private_zone
             else:
-                self._statistics["ground_min_value"] = diff
+                reward = 0.1  # reward for staying alive
 
         # agent touch the top of the screen as punishment
         if self._player_y < 0:
             reward = -0.5
 
         # check for crash
-        if self._check_crash():
+        if crashed:
             self._sound_cache = "hit"
             reward = -1  # reward for dying
             terminal = True
             self._player_vel_y = 0
-            if self._debug and self._use_lidar:
-                if ((self._player_x + PLAYER_WIDTH) - up_pipe["x"]) > (0 + 5) and (
-                    self._player_x - up_pipe["x"]
-                ) < PIPE_WIDTH:
-                    print("BETWEEN PIPES")
-                elif ((self._player_x + PLAYER_WIDTH) - up_pipe["x"]) < (0 + 5):
-                    print("IN FRONT OF")
-                print(
-                    f"obs: [{self._statistics['pipe_min_index']},"
-                    f"{self._statistics['pipe_min_value']},"
-                    f"{self._statistics['pipe_mean_value']}],"
-                    f"Ground: {self._statistics['ground_min_value']}"
-                )
 
         info = {"score": self._score}
 
@@ -338,9 +579,40 @@ class FlappyBirdEnv(gymnasium.Env):
             info,
         )
 
+    @property
+    def physics(self) -> Dict[str, float]:
+        """The physics parameters: `pipe_gap`, the gravity `player_acc_y`, the
+        flap impulse `player_flap_acc` and the pipe speed `pipe_vel_x`.
+
+        They can be set between the episodes, e.g. for domain randomization,
+        without rebuilding the environment, and are kept by the next episodes.
+        """
+        return {name: getattr(self, "_" + name) for name in PHYSICS}
+
+    @physics.setter
+    def physics(self, parameters: Dict[str, float]) -> None:
+        for name, value in parameters.items():
+            if np.ndim(value) != 0:
+                raise ValueError(
+                    f"The physics parameter {name} must be a single value! The "
+                    "sub-environments of a vector environment get their own "
+                    'values with `envs.set_attr("physics", [...])`.'
+                )
+            check_physics(name, value)
+        for name, value in parameters.items():
+            setattr(self, "_" + name, value)
+
     def reset(self, seed=None, options=None):
-        """Resets the environment (starts a new game)."""
+        """Resets the environment (starts a new game).
+
+        Args:
+            seed (Optional[int]): Seed of the random generator.
+            options (Optional[dict]): The physics parameters of the episode, see
+                :attr:`physics`, and the benchmark track (`"track"`).
+        """
         super().reset(seed=seed)
+        if options is not None:
+            self.physics = {k: v for k, v in options.items() if k in PHYSICS}
 
         # Player's info:
         self._player_x = int(self._screen_width * 0.2)
@@ -348,11 +620,64 @@ class FlappyBirdEnv(gymnasium.Env):
         self._player_vel_y = -9  # player"s velocity along Y
         self._player_rot = 45  # player"s rotation
         self._player_idx = 0
+        self._player_idx_step = 0
+        self._player_flapped = False
         self._loop_iter = 0
         self._score = 0
+        self._ground["x"] = 0
+
+        self._episode += 1
+        self._episode_step = 0
+
+        if self.profile is not None:
+            self._profile_snapshot = self.profile.snapshot()
+
+        self._reset_pipes(seed, options)
+
+        if self.render_mode == "human":
+            self.render()
+
+        obs, _ = self._get_observation()
+        info = {"score": self._score}
+        return obs, info
+
+    def render(self) -> None:
+        """Renders the next frame."""
+        if self.render_mode == "rgb_array":
+            self._draw_surface(show_score=False, show_rays=False)
+            # Flip the image to retrieve a correct aspect
+            return np.transpose(pygame.surfarray.array3d(self._surface), axes=(1, 0, 2))
+        else:
+            self._draw_surface(show_score=True, show_rays=self._use_lidar)
+            if self._display is None:
+                self._make_display()
+
+            self._update_display()
+            self._fps_clock.tick(self.metadata["render_fps"])
+
+    def close(self):
+        """Closes the environment."""
+        if self.render_mode is not None:
+            pygame.display.quit()
+            pygame.quit()
+        super().close()
 
-        if self._debug and self._use_lidar:
-            self._statistics = {}
+    def _reset_pipes(self, seed=None, options=None) -> None:
+        """Chooses the schedule of the gaps and places the three initial pipes."""
+        if options is not None and "track" in options:
+            self._track = options["track"]
+        if self._track is not None:
+            track = load_track(self._track)
+            if seed is None:
+                seed = int(self.np_random.integers(len(track)))
+            self._gaps = TrackSchedule(track, seed)
+        elif (
+            not isinstance(self._gaps, RandomSchedule)
+            or self._gaps.rng is not self.np_random
+        ):
+            # the gaps continue the blocks drawn in the previous episodes, unless
+            # the random generator was seeded again
+            self._gaps = RandomSchedule(self.np_random)
 
         # Generate 3 new pipes to add to upper_pipes and lower_pipes lists
         new_pipe1 = self._get_random_pipe()
@@ -385,40 +710,10 @@ class FlappyBirdEnv(gymnasium.Env):
             },
         ]
 
-        if self.render_mode == "human":
-            self.render()
-
-        obs, _ = self._get_observation()
-        info = {"score": self._score}
-        return obs, info
-
-    def render(self) -> None:
-        """Renders the next frame."""
-        if self.render_mode == "rgb_array":
-            self._draw_surface(show_score=False, show_rays=False)
-            # Flip the image to retrieve a correct aspect
-            return np.transpose(pygame.surfarray.array3d(self._surface), axes=(1, 0, 2))
-        else:
-            self._draw_surface(show_score=True, show_rays=self._use_lidar)
-            if self._display is None:
-                self._make_display()
-
-            self._update_display()
-            self._fps_clock.tick(self.metadata["render_fps"])
-
-    def close(self):
-        """Closes the environment."""
-        if self.render_mode is not None:
-            pygame.display.quit()
-            pygame.quit()
-        super().close()
-
     def _get_random_pipe(self) -> Dict[str, int]:
         """Returns a randomly generated pipe."""
         # y of gap between upper and lower pipe
-        gapYs = [20, 30, 40, 50, 60, 70, 80, 90]
-        index = self.np_random.integers(0, len(gapYs))
-        gap_y = gapYs[index]
+        gap_y = GAP_YS[self._gaps.next()]
         gap_y += int(self._ground["y"] * 0.2)
 
         pipe_x = self._screen_width + PIPE_WIDTH + (self._screen_width * 0.2)
@@ -427,17 +722,25 @@ class FlappyBirdEnv(gymnasium.Env):
             {"x": pipe_x, "y": gap_y + self._pipe_gap},  # lower pipe
         ]
 
-    def _check_crash(self) -> bool:
-        """Returns True if player collides with the ground (base) or a pipe."""
+    def _check_crash(self) -> CrashType:
+        """Returns what the player collides with: the ground (base), a pipe or
+        nothing (`CrashType.NONE`, which is falsy)."""
         # if player crashes into ground
         if self._player_y + PLAYER_HEIGHT >= self._ground["y"] - 1:
-            if self._debug and self._use_lidar:
-                print("CRASH TO THE GROUND")
-            return True
+            return CrashType.GROUND
         else:
-            player_rect = pygame.Rect(
-                self._player_x, self._player_y, PLAYER_WIDTH, PLAYER_HEIGHT
-            )
+            if self._pixel_collision:
+                hitmasks = utils.get_hitmasks(self._bird_color, self._pipe_color)
+                # the sprite as drawn, rotated around its top-left corner
+                rot = max(min(round(self._player_rot), PLAYER_ROT_THR), -90)
+                player_hitmask = hitmasks.players[self._player_idx, rot + 90]
+                player_rect = pygame.Rect(
+                    self._player_x, self._player_y, hitmasks.size, hitmasks.size
+                )
+            else:
+                player_rect = pygame.Rect(
+                    self._player_x, self._player_y, PLAYER_WIDTH, PLAYER_HEIGHT
+                )
 
             for up_pipe, low_pipe in zip(self._upper_pipes, self._lower_pipes):
                 # upper and lower pipe rects
@@ -451,29 +754,65 @@ class FlappyBirdEnv(gymnasium.Env):
                 # check collision
                 up_collide = player_rect.colliderect(up_pipe_rect)
                 low_collide = player_rect.colliderect(low_pipe_rect)
+                if self._pixel_collision:
+                    up_collide = up_collide and utils.pixel_collision(
+                        player_rect, up_pipe_rect, player_hitmask, hitmasks.pipes[0]
+                    )
+                    low_collide = low_collide and utils.pixel_collision(
+                        player_rect, low_pipe_rect, player_hitmask, hitmasks.pipes[1]
+                    )
+
+                if up_collide:
+                    return CrashType.UPPER_PIPE
+                if low_collide:
+                    return CrashType.LOWER_PIPE
+
+        return CrashType.NONE
+
+    def _pack_state(self) -> np.ndarray:
+        """Returns the game's state as a flat array.
+
+        The state doesn't depend on the observation type, so it identifies a
+        point of an episode regardless of how the environment is observed.
+        """
+        return np.array(
+            [
+                self._player_x,
+                self._player_y,
+                self._player_vel_y,
+                self._player_rot,
+                self._player_idx,
+                self._loop_iter,
+                self._score,
+                self._ground["x"],
+            ]
+            + [
+                value
+                for up_pipe, low_pipe in zip(self._upper_pipes, self._lower_pipes)
+                for value in (up_pipe["x"], up_pipe["y"], low_pipe["y"])
+            ],
+            dtype=np.float64,
+        )
 
-                if self._debug and self._use_lidar:
-                    if up_collide:
-                        print("CRASH TO UPPER PIPE")
-                        print(
-                            f"up_pipe: {[up_pipe['x'], up_pipe['y']+PIPE_HEIGHT]},"
-                            f"low_pipe: {low_pipe},"
-                            f"player: [{self._player_x}, {self._player_y}]"
-                        )
-                        return True
-                    if low_collide:
-                        print("CRASH TO LOWER PIPE")
-                        print(
-                            f"up_pipe: {[up_pipe['x'], up_pipe['y']+PIPE_HEIGHT]},"
-                            f"low_pipe: {low_pipe},"
-                            f"player: [{self._player_x}, {self._player_y}]"
-                        )
-                        return True
-                else:
-                    if up_collide or low_collide:
-                        return True
-
-        return False
+    def _unpack_state(self, state: np.ndarray) -> None:
+        """Restores a state returned by :meth:`_pack_state`."""
+        (
+            self._player_x,
+            self._player_y,
+            self._player_vel_y,
+            self._player_rot,
+            self._player_idx,
+            self._loop_iter,
+            self._score,
+            self._ground["x"],
+        ) = state[:8].tolist()
+        self._player_idx = int(self._player_idx)
+        self._loop_iter = int(self._loop_iter)
+        self._score = int(self._score)
+
+        pipes = state[8:].reshape(-1, 3).tolist()
+        self._upper_pipes = [{"x": x, "y": up_y} for x, up_y, _ in pipes]
+        self._lower_pipes = [{"x": x, "y": low_y} for x, _, low_y in pipes]
 
     def _get_observation_features(self) -> np.ndarray:
         pipes = []
@@ -550,6 +889,8 @@ class FlappyBirdEnv(gymnasium.Env):
 
         Required for drawing images on the screen.
         """
+        if self._surface is None:
+            self._init_render()
         self._display = pygame.display.set_mode(
             (self._screen_width, self._screen_height)
         )
@@ -589,6 +930,9 @@ class FlappyBirdEnv(gymnasium.Env):
         Args:
             show_score (bool): Whether to draw the player's score or not.
         """
+        if self._surface is None:
+            self._init_render()
+
         # Background
         if self._images["background"] is not None:
             self._surface.blit(self._images["background"], (0, 0))
@@ -690,13 +1034,40 @@ class FlappyBirdEnv(gymnasium.Env):
         )
         self._surface.blit(player_surface, player_surface_rect)
 
+        if show_rays:
+            # the rays can cross the whole screen
+            self._dirty_rects = None
+        else:
+            self._dirty_rects = [
+                pygame.Rect(pipe["x"], pipe["y"], PIPE_WIDTH, PIPE_HEIGHT)
+                for pipe in self._upper_pipes + self._lower_pipes
+            ] + [
+                pygame.Rect(
+                    0,
+                    self._ground["y"],
+                    self._screen_width,
+                    self._screen_height - self._ground["y"],
+                ),
+                player_surface_rect,
+            ]
+            if show_score:
+                self._dirty_rects.append(
+                    pygame.Rect(
+                        0,
+                        self._screen_height * 0.1,
+                        self._screen_width,
+                        self._images["numbers"][0].get_height(),
+                    )
+                )
+
     def _update_display(self) -> None:
         """Updates the display with the current surface of the renderer.
 
         A call to this method is usually preceded by a call to
         :meth:`.draw_surface()`. This method simply updates the display by
         showing the current state of the renderer's surface on it, it doesn't
-        make any change to the surface.
+        make any change to the surface. Only the areas drawn in the last two
+        frames are updated, unless the LIDAR rays were drawn.
         """
         if self._display is None:
             raise RuntimeError(
@@ -705,9 +1076,15 @@ class FlappyBirdEnv(gymnasium.Env):
                 "call the `make_display()` method."
             )
 
-        pygame.event.get()
+        # keep the window responsive without discarding the events, which
+        # belong to whoever handles the input
+        pygame.event.pump()
         self._display.blit(self._surface, [0, 0])
-        pygame.display.update()
+        if self._dirty_rects is None or self._last_rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(self._last_rects + self._dirty_rects)
+        self._last_rects = self._dirty_rects
 
         # Sounds:
         if self._audio_on and self._sound_cache is not None:
@@ -0,0 +1,445 @@
+#
+# Copyright (c) 2020 Gabriel Nogueira (Talendar)
+# Copyright (c) 2023 Martin Kubovcik
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+# ==============================================================================
+
+""" Implementation of a Flappy Bird environment in which several birds fly through
+the same pipes.
+
+The world (pipes and ground) is moved once per step for all the birds, and the
+birds are stepped together as arrays, with the physics of :class:`FlappyBirdEnv`.
+"""
+
+from typing import Dict, Optional, Tuple
+
+import gymnasium
+import numpy as np
+import pygame
+
+from flappy_bird_gymnasium.envs import utils
+from flappy_bird_gymnasium.envs.constants import (
+    BACKGROUND_WIDTH,
+    BASE_WIDTH,
+    FILL_BACKGROUND_COLOR,
+    LIDAR_MAX_DISTANCE,
+    PIPE_HEIGHT,
+    PIPE_VEL_X,
+    PIPE_WIDTH,
+    PLAYER_ACC_Y,
+    PLAYER_FLAP_ACC,
+    PLAYER_HEIGHT,
+    PLAYER_INDICES,
+    PLAYER_MAX_VEL_Y,
+    PLAYER_PRIVATE_ZONE,
+    PLAYER_ROT_THR,
+    PLAYER_VEL_ROT,
+    PLAYER_WIDTH,
+)
+from flappy_bird_gymnasium.envs.flappy_bird_env import (
+    PHYSICS,
+    Actions,
+    FlappyBirdEnv,
+    check_physics,
+)
+from flappy_bird_gymnasium.envs.lidar import LIDAR
+
+_BIRD_PHYSICS = ("player_acc_y", "player_flap_acc")  # the others are the world's
+
+
+class FlappyBirdMultiEnv(gymnasium.Env):
+    """Flappy Bird Gymnasium environment with several birds in the same world.
+
+    Every step takes one action per bird and returns the observations, rewards,
+    terminations and truncations of all the birds as arrays, which are the same
+    as the ones of :class:`FlappyBirdEnv`. A bird that crashed is frozen: it
+    gets a reward of zero, its observation is no longer updated and it stays
+    terminated until the world is reset. The `info` dictionary holds the
+    `score` of every bird and the `alive` mask of the birds.
+
+    The gravity and the flap impulse are set per bird, so differently
+    parameterised birds are stepped together, see :attr:`physics`.
+
+    Args:
+        num_birds (int): Number of birds.
+        screen_size (Tuple[int, int]): The screen's width and height.
+        normalize_obs (bool): If `True`, the observations will be normalized
+            before being returned.
+        use_lidar (bool): If `True`, the birds observe the distances of the
+            LIDAR rays, computed for all the birds in one pass.
+        pipe_gap (int): Space between a lower and an upper pipe.
+        bird_color (str): Color of the flappy birds.
+        pipe_color (str): Color of the pipes.
+        render_mode (Optional[str]): `None` or "rgb_array".
+        background (Optional[str]): Type of background image.
+        score_limit (Optional[int]): Score at which the birds are truncated.
+        track (Optional[str]): Path of a benchmark track of the gaps, see
+            :class:`FlappyBirdEnv`.
+        pixel_collision (bool): If `True`, the birds crash into the pipes when
+            the pixels of their sprites overlap, checked for all the birds
+            near a pipe at once.
+    """
+
+    metadata = {"render_modes": ["rgb_array"], "render_fps": 30}
+
+    # the world is the one of the single bird environment
+    _reset_pipes = FlappyBirdEnv._reset_pipes
+    _get_random_pipe = FlappyBirdEnv._get_random_pipe
+    _move_pipes = FlappyBirdEnv._move_pipes
+
+    def __init__(
+        self,
+        num_birds: int = 8,
+        screen_size: Tuple[int, int] = (288, 512),
+        normalize_obs: bool = True,
+        use_lidar: bool = True,
+        pipe_gap: int = 100,
+        bird_color: str = "yellow",
+        pipe_color: str = "green",
+        render_mode: Optional[str] = None,
+        background: Optional[str] = "day",
+        score_limit: Optional[int] = None,
+        track: Optional[str] = None,
+        pixel_collision: bool = False,
+    ) -> None:
+        assert render_mode is None or render_mode in self.metadata["render_modes"]
+        self.render_mode = render_mode
+        self.num_birds = num_birds
+        self._score_limit = score_limit
+
+        self.action_space = gymnasium.spaces.MultiDiscrete([2] * num_birds)
+        if use_lidar:
+            size = 180
+            low, high = 0.0, 1.0 if normalize_obs else np.inf
+        else:
+            size = 12
+            low, high = (-1.0, 1.0) if normalize_obs else (-np.inf, np.inf)
+        self.observation_space = gymnasium.spaces.Box(
+            low, high, shape=(num_birds, size), dtype=np.float64
+        )
+
+        self._screen_width = screen_size[0]
+        self._screen_height = screen_size[1]
+        self._normalize_obs = normalize_obs
+        self._pipe_gap = pipe_gap
+        self._bird_color = bird_color
+        self._pipe_color = pipe_color
+        self._bg_type = background
+        self._pipe_vel_x = PIPE_VEL_X
+        self._player_acc_y = np.full(num_birds, float(PLAYER_ACC_Y))
+        self._player_flap_acc = np.full(num_birds, float(PLAYER_FLAP_ACC))
+        self._track = track
+        self._gaps = None
+        self._pixel_collision = pixel_collision
+        self._use_lidar = use_lidar
+
+        self._ground = {"x": 0, "y": self._screen_height * 0.79}
+        self._base_shift = BASE_WIDTH - BACKGROUND_WIDTH
+        self._player_x = int(self._screen_width * 0.2)
+
+        if use_lidar:
+            self._lidar = LIDAR(LIDAR_MAX_DISTANCE)
+        self._bind_methods()
+        self._obs = np.zeros((num_birds, size))
+        self._surface = None
+
+    def _bind_methods(self) -> None:
+        if self._use_lidar:
+            self._get_observation = self._get_observation_lidar
+        else:
+            self._get_observation = self._get_observation_features
+
+    def __getstate__(self) -> Dict:
+        """Returns the configuration and the state of the world, without the
+        pygame resources of the rendering, loaded again when rendering."""
+        state = self.__dict__.copy()
+        for name in ("_surface", "_images", "_get_observation"):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._bind_methods()
+        self._surface = None
+
+    @property
+    def physics(self) -> Dict[str, np.ndarray]:
+        """The physics parameters, like :attr:`FlappyBirdEnv.physics`.
+
+        The gravity `player_acc_y` and the flap impulse `player_flap_acc` are
+        arrays of one value per bird, which can be set from a single value or an
+        array. The pipes are shared by the birds, so `pipe_gap` and
+        `pipe_vel_x` are single values for the whole world.
+        """
+        return {name: getattr(self, "_" + name) for name in PHYSICS}
+
+    @physics.setter
+    def physics(self, parameters: Dict[str, np.ndarray]) -> None:
+        for name, value in parameters.items():
+            check_physics(name, value)
+            if name not in _BIRD_PHYSICS and np.ndim(value) != 0:
+                raise ValueError(
+                    f"The physics parameter {name} is shared by all the birds, "
+                    "it must be a single value!"
+                )
+        for name, value in parameters.items():
+            if name in _BIRD_PHYSICS:
+                value = np.broadcast_to(
+                    np.asarray(value, dtype=np.float64), (self.num_birds,)
+                ).copy()
+            setattr(self, "_" + name, value)
+
+    def reset(self, seed=None, options=None):
+        """Resets the world and revives all the birds.
+
+        Args:
+            seed (Optional[int]): Seed of the random generator.
+            options (Optional[dict]): The physics parameters of the episode, see
+                :attr:`physics`, and the benchmark track (`"track"`).
+        """
+        super().reset(seed=seed)
+        if options is not None:
+            self.physics = {k: v for k, v in options.items() if k in PHYSICS}
+
+        n = self.num_birds
+        self._player_y = np.full(
+            n, int((self._screen_height - PLAYER_HEIGHT) / 2), dtype=np.float64
+        )
+        self._player_vel_y = np.full(n, -9.0)
+        self._player_rot = np.full(n, 45.0)
+        self._player_flapped = np.zeros(n, dtype=bool)
+        self._alive = np.ones(n, dtype=bool)
+        self._terminated = np.zeros(n, dtype=bool)
+        self._truncated = np.zeros(n, dtype=bool)
+        self._score = np.zeros(n, dtype=np.int64)
+        self._player_idx = 0
+        self._player_idx_step = 0
+        self._loop_iter = 0
+        self._ground["x"] = 0
+
+        self._reset_pipes(seed, options)
+        self._get_observation(self._alive)
+        return self._obs.copy(), self._info()
+
+    def step(
+        self, actions: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict]:
+        """Steps the world and all the living birds.
+
+        Args:
+            actions (np.ndarray): One action per bird, dead birds' are ignored.
+
+        Returns:
+            The observations, rewards, terminations and truncations of the birds
+            as arrays of length `num_birds`, and an info dictionary.
+        """
+        alive = self._alive.copy()
+        flap = (
+            alive
+            & (np.asarray(actions) == Actions.FLAP)
+            & (self._player_y > -2 * PLAYER_HEIGHT)
+        )
+        self._player_vel_y[flap] = self._player_flap_acc[flap]
+        self._player_flapped |= flap
+
+        passed = self._check_score()
+        if passed:
+            self._score[alive] += 1
+        self._update_players(alive)
+        self._move_pipes()
+
+        private_zone = self._get_observation(alive)
+        crashed = alive & self._check_crash()
+
+        # same rewards as the single bird environment
+        if passed:
+            rewards = np.ones(self.num_birds)
+        else:
+            rewards = np.where(private_zone, -0.5, 0.1)
+        rewards[self._player_y < 0] = -0.5
+        rewards[crashed] = -1.0
+        rewards[~alive] = 0.0
+
+        self._player_vel_y[crashed] = 0
+        self._terminated |= crashed
+        if self._score_limit is not None:
+            self._truncated |= alive & ~crashed & (self._score >= self._score_limit)
+        self._alive = ~(self._terminated | self._truncated)
+
+        return (
+            self._obs.copy(),
+            rewards,
+            self._terminated.copy(),
+            self._truncated.copy(),
+            self._info(),
+        )
+
+    def _info(self) -> Dict:
+        return {"score": self._score.copy(), "alive": self._alive.copy()}
+
+    def _check_score(self) -> bool:
+        """Returns whether the birds passed a pipe, they all share its x."""
+        player_mid_pos = self._player_x + PLAYER_WIDTH / 2
+        for pipe in self._upper_pipes:
+            pipe_mid_pos = pipe["x"] + PIPE_WIDTH / 2
+            if pipe_mid_pos <= player_mid_pos < pipe_mid_pos - self._pipe_vel_x:
+                return True
+        return False
+
+    def _update_players(self, alive: np.ndarray) -> None:
+        # player_index base_x change
+        if (self._loop_iter + 1) % 3 == 0:
+            self._player_idx = PLAYER_INDICES[self._player_idx_step % 4]
+            self._player_idx_step += 1
+        self._loop_iter = (self._loop_iter + 1) % 30
+        self._ground["x"] = -((-self._ground["x"] + 100) % self._base_shift)
+
+        # rotate the players
+        rot = self._player_rot
+        rot[alive & (rot > -90)] -= PLAYER_VEL_ROT
+
+        # players' movement
+        vel_y = self._player_vel_y
+        flapped = alive & self._player_flapped
+        accelerated = alive & ~flapped & (vel_y < PLAYER_MAX_VEL_Y)
+        vel_y[accelerated] += self._player_acc_y[accelerated]
+        self._player_flapped[flapped] = False
+        rot[flapped] = 45
+
+        y = self._player_y
+        y[alive] += np.minimum(
+            vel_y[alive], self._ground["y"] - y[alive] - PLAYER_HEIGHT
+        )
+
+    def _check_crash(self) -> np.ndarray:
+        """Returns which players collide with the ground or a pipe."""
+        crashed = self._player_y + PLAYER_HEIGHT >= self._ground["y"] - 1
+
+        if self._pixel_collision:
+            hitmasks = utils.get_hitmasks(self._bird_color, self._pipe_color)
+            width = height = hitmasks.size
+            player_hitmasks = None
+        else:
+            width, height = PLAYER_WIDTH, PLAYER_HEIGHT
+
+        # same rectangles as `pygame.Rect`, truncated to whole pixels
+        top = np.trunc(self._player_y)
+        pipes = [(pipe, 0) for pipe in self._upper_pipes]
+        pipes += [(pipe, 1) for pipe in self._lower_pipes]
+        for pipe, side in pipes:
+            pipe_x, pipe_y = np.trunc(pipe["x"]), np.trunc(pipe["y"])
+            if not (
+                pipe_x < self._player_x + width and self._player_x < pipe_x + PIPE_WIDTH
+            ):
+                continue
+            overlap = (top < pipe_y + PIPE_HEIGHT) & (pipe_y < top + height)
+            if self._pixel_collision and np.any(overlap):
+                if player_hitmasks is None:
+                    rotations = hitmasks.rotation_index(self._player_rot)
+                    player_hitmasks = hitmasks.players[self._player_idx, rotations]
+                # only the birds overlapping the pipe's rectangle are checked
+                candidates = np.flatnonzero(overlap)
+                overlap[candidates] = utils.pixel_collision_batch(
+                    np.full(len(candidates), self._player_x),
+                    top[candidates],
+                    player_hitmasks[candidates],
+                    pygame.Rect(pipe_x, pipe_y, PIPE_WIDTH, PIPE_HEIGHT),
+                    hitmasks.pipes[side],
+                )
+            crashed |= overlap
+        return crashed
+
+    def _get_observation_features(self, alive: np.ndarray) -> np.ndarray:
+        pipes = []
+        for up_pipe, low_pipe in zip(self._upper_pipes, self._lower_pipes):
+            # the pipe is behind the screen?
+            if low_pipe["x"] > self._screen_width:
+                pipes.append((self._screen_width, 0, self._screen_height))
+            else:
+                pipes.append(
+                    (low_pipe["x"], (up_pipe["y"] + PIPE_HEIGHT), low_pipe["y"])
+                )
+        pipes = np.array(sorted(pipes, key=lambda x: x[0]), dtype=np.float64)
+        players = np.stack(
+            [self._player_y[alive], self._player_vel_y[alive], self._player_rot[alive]],
+            axis=1,
+        )
+
+        if self._normalize_obs:
+            pipes /= (self._screen_width, self._screen_height, self._screen_height)
+            players /= (self._screen_height, PLAYER_MAX_VEL_Y, 90)
+
+        self._obs[alive, :9] = pipes.ravel()
+        self._obs[alive, 9:] = players
+        return np.zeros(self.num_birds, dtype=bool)
+
+    def _get_observation_lidar(self, alive: np.ndarray) -> np.ndarray:
+        """Scans the obstacles for all the living birds at once.
+
+        Returns:
+            Which birds have an obstacle in their private zone.
+        """
+        distances = self._lidar.scan_batch(
+            self._player_x,
+            self._player_y[alive],
+            self._player_rot[alive],
+            self._upper_pipes,
+            self._lower_pipes,
+            self._ground,
+        )
+        private_zone = np.zeros(self.num_birds, dtype=bool)
+        private_zone[alive] = np.any(distances < PLAYER_PRIVATE_ZONE, axis=1)
+
+        if self._normalize_obs:
+            distances /= LIDAR_MAX_DISTANCE
+        self._obs[alive] = distances
+        return private_zone
+
+    def render(self) -> Optional[np.ndarray]:
+        """Returns a frame of the world with all the living birds."""
+        if self.render_mode is None:
+            return None
+        if self._surface is None:
+            self._surface = pygame.Surface((self._screen_width, self._screen_height))
+            self._images = utils.load_images(
+                convert=False,
+                bird_color=self._bird_color,
+                pipe_color=self._pipe_color,
+                bg_type=self._bg_type,
+            )
+
+        if self._images["background"] is not None:
+            self._surface.blit(self._images["background"], (0, 0))
+        else:
+            self._surface.fill(FILL_BACKGROUND_COLOR)
+        for up_pipe, low_pipe in zip(self._upper_pipes, self._lower_pipes):
+            self._surface.blit(self._images["pipe"][0], (up_pipe["x"], up_pipe["y"]))
+            self._surface.blit(self._images["pipe"][1], (low_pipe["x"], low_pipe["y"]))
+        self._surface.blit(self._images["base"], (self._ground["x"], self._ground["y"]))
+
+        image = self._images["player"][self._player_idx]
+        for y, rot in zip(self._player_y[self._alive], self._player_rot[self._alive]):
+            player_surface = pygame.transform.rotate(image, min(rot, PLAYER_ROT_THR))
+            self._surface.blit(
+                player_surface, player_surface.get_rect(topleft=(self._player_x, y))
+            )
+
+        # Flip the image to retrieve a correct aspect
+        return np.transpose(pygame.surfarray.array3d(self._surface), axes=(1, 0, 2))
@@ -0,0 +1,225 @@
+""" Watching many environments in a single window.
+
+The :class:`TiledMonitor` draws the packed states of N games (see
+:meth:`FlappyBirdEnv._pack_state`) into the downscaled tiles of a grid and
+updates the display once per frame. The crashed games are
+framed in red and every tile shows the score of its game. The monitor draws at
+most `fps` frames per second, whatever the speed of the stepping loop, so
+:meth:`TiledMonitor.due` can be checked before gathering the states.
+
+Example:
+
+    envs = VectorMonitor(gymnasium.make_vec("FlappyBird-v0", num_envs=64), fps=10)
+"""
+
+import math
+import time
+
+import gymnasium
+import numpy as np
+import pygame
+
+from flappy_bird_gymnasium.envs import utils
+from flappy_bird_gymnasium.envs.constants import FILL_BACKGROUND_COLOR, PLAYER_ROT_THR
+
+CRASH_COLOR = (255, 0, 0)
+SCORE_COLOR = (255, 255, 255)
+
+
+class TiledMonitor:
+    """Renders N games into a grid of downscaled tiles.
+
+    The sprites are scaled once, so the games are drawn directly at the size
+    of the tiles instead of being drawn in full size and downscaled.
+
+    Args:
+        num_envs (int): Number of games (N).
+        scale (float): Size of a tile relative to the game's screen.
+        columns (Optional[int]): Number of columns of the grid, chosen to give
+            a roughly square window if None.
+        fps (int): Maximum number of frames per second.
+        headless (bool): If `True`, the grid is only drawn to :attr:`surface`
+            and no window is opened.
+        screen_size (Tuple[int, int]): The games' screen width and height.
+        bird_color (str): Color of the flappy birds.
+        pipe_color (str): Color of the pipes.
+        background (Optional[str]): Type of the background image.
+    """
+
+    def __init__(
+        self,
+        num_envs,
+        scale=0.25,
+        columns=None,
+        fps=10,
+        headless=False,
+        screen_size=(288, 512),
+        bird_color="yellow",
+        pipe_color="green",
+        background="day",
+    ):
+        self.num_envs = num_envs
+        self.scale = scale
+        self.fps = fps
+        self.headless = headless
+        self.frames = 0
+
+        width, height = screen_size
+        self.tile_size = (max(int(width * scale), 1), max(int(height * scale), 1))
+        self._ground_y = height * 0.79 * scale
+
+        if columns is None:
+            columns = math.ceil(
+                math.sqrt(num_envs * self.tile_size[1] / self.tile_size[0])
+            )
+        self.columns = min(columns, num_envs)
+        self.rows = math.ceil(num_envs / self.columns)
+        self.surface = pygame.Surface(
+            (self.columns * self.tile_size[0], self.rows * self.tile_size[1])
+        )
+
+        images = utils.load_images(
+            convert=False,
+            bird_color=bird_color,
+            pipe_color=pipe_color,
+            bg_type=background,
+        )
+        self._images = {
+            name: self._scale_images(images[name])
+            for name in ("background", "base", "pipe", "player")
+        }
+
+        pygame.font.init()
+        self._font = pygame.font.Font(None, max(self.tile_size[1] // 6, 12))
+        self._scores = {}
+        self._display = None
+        self._last_frame = -math.inf
+
+    def _scale_images(self, images):
+        if images is None:
+            return None
+        if isinstance(images, tuple):
+            return tuple(self._scale_images(image) for image in images)
+        width, height = images.get_size()
+        size = (max(round(width * self.scale), 1), max(round(height * self.scale), 1))
+        return pygame.transform.scale(images, size)
+
+    def due(self):
+        """Returns whether enough time has passed to draw a new frame."""
+        return time.monotonic() - self._last_frame >= 1.0 / self.fps
+
+    def _score_surface(self, score):
+        if score not in self._scores:
+            self._scores[score] = self._font.render(str(score), True, SCORE_COLOR)
+        return self._scores[score]
+
+    def _draw_tile(self, i, state, crashed):
+        x = (i % self.columns) * self.tile_size[0]
+        y = (i // self.columns) * self.tile_size[1]
+        tile = self.surface.subsurface((x, y, *self.tile_size))
+        player = state[:8].tolist()
+        player_x, player_y, _, player_rot, player_idx, _, score, ground_x = player
+        scale = self.scale
+
+        # Background
+        if self._images["background"] is not None:
+            tile.blit(self._images["background"], (0, 0))
+        else:
+            tile.fill(FILL_BACKGROUND_COLOR)
+
+        # Pipes
+        for pipe_x, up_y, low_y in state[8:].reshape(-1, 3).tolist():
+            tile.blit(self._images["pipe"][0], (pipe_x * scale, up_y * scale))
+            tile.blit(self._images["pipe"][1], (pipe_x * scale, low_y * scale))
+
+        # Base (ground)
+        tile.blit(self._images["base"], (ground_x * scale, self._ground_y))
+
+        # Player
+        visible_rot = min(player_rot, PLAYER_ROT_THR)
+        sprite = pygame.transform.rotate(
+            self._images["player"][int(player_idx)], visible_rot
+        )
+        tile.blit(sprite, sprite.get_rect(topleft=(player_x * scale, player_y * scale)))
+
+        if crashed:
+            pygame.draw.rect(tile, CRASH_COLOR, (0, 0, *self.tile_size), 2)
+        tile.blit(self._score_surface(int(score)), (3, 3))
+
+    def draw(self, states, crashed=None):
+        """Draws a frame of the (N, D) states regardless of the frame rate."""
+        if crashed is None:
+            crashed = np.zeros(self.num_envs, dtype=np.bool_)
+        for i, (state, c) in enumerate(zip(states, crashed)):
+            self._draw_tile(i, state, c)
+
+        if not self.headless:
+            if self._display is None:
+                self._display = pygame.display.set_mode(self.surface.get_size())
+            pygame.event.pump()
+            self._display.blit(self.surface, (0, 0))
+            pygame.display.update()
+
+        self._last_frame = time.monotonic()
+        self.frames += 1
+
+    def update(self, states, crashed=None):
+        """Draws a frame if it's due.
+
+        Args:
+            states (Union[np.ndarray, Callable[[], np.ndarray]]): The (N, D)
+                packed states or a function returning them, called only if
+                a frame is drawn.
+            crashed (Optional[np.ndarray]): Mask of the crashed games.
+
+        Returns:
+            `True` if a frame was drawn.
+        """
+        if not self.due():
+            return False
+        self.draw(states() if callable(states) else states, crashed)
+        return True
+
+    def close(self):
+        if self._display is not None:
+            pygame.display.quit()
+            self._display = None
+
+
+class VectorMonitor(gymnasium.vector.VectorWrapper):
+    """Shows the sub-environments of a vector environment in a tiled window.
+
+    The states are gathered with `call("_pack_state")` only when the monitor
+    draws a frame, so asynchronous vector environments are supported too. The
+    games that crashed since the last frame are framed in the next one.
+
+    Args:
+        env (gymnasium.vector.VectorEnv): The vector environment.
+        **kwargs: Arguments of the :class:`TiledMonitor`.
+    """
+
+    def __init__(self, env, **kwargs):
+        super().__init__(env)
+        self.monitor = TiledMonitor(env.num_envs, **kwargs)
+        self._crashed = np.zeros(env.num_envs, dtype=np.bool_)
+
+    def _states(self):
+        return np.stack(self.env.call("_pack_state"))
+
+    def reset(self, *, seed=None, options=None):
+        obs, info = self.env.reset(seed=seed, options=options)
+        self._crashed[:] = False
+        self.monitor.update(self._states)
+        return obs, info
+
+    def step(self, actions):
+        obs, rewards, terminations, truncations, infos = self.env.step(actions)
+        # the crashes between two frames are kept for the next one
+        self._crashed |= terminations
+        if self.monitor.update(self._states, self._crashed):
+            self._crashed[:] = False
+        return obs, rewards, terminations, truncations, infos
+
+    def close(self, **kwargs):
+        self.monitor.close()
+        return super().close(**kwargs)
@@ -0,0 +1,112 @@
+""" Schedules of the gaps of the pipes.
+
+A schedule yields the index, into :data:`GAP_YS`, of the gap of every new pipe:
+
+    * :class:`RandomSchedule` draws the indices from the environment's random
+      generator in blocks, so a generator call is made every `block_size` pipes
+      instead of once per pipe;
+    * :class:`TrackSchedule` reads them from a benchmark track, a fixed table of
+      gap sequences with one row per seed. The tracks are `.npy` files created
+      by :func:`create_track` and memory-mapped by :func:`load_track`, so all
+      the environments and processes of a machine share one copy, and agents
+      evaluated on the same track and seeds fly through exactly the same pipes.
+
+    $ python -m flappy_bird_gymnasium.envs.pipe_schedule tracks/eval.npy
+
+    env = gymnasium.make("FlappyBird-v0", track="tracks/eval.npy")
+    env.reset(seed=7)  # the pipes of the row 7 of the track
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+GAP_YS = (20, 30, 40, 50, 60, 70, 80, 90)  # y of the gaps above 20% of the ground
+
+_tracks = {}
+
+
+class RandomSchedule:
+    """Gap indices drawn from a random generator in blocks.
+
+    Args:
+        rng (np.random.Generator): The random generator, whose state advances by
+            a block at a time.
+        block_size (int): Number of indices drawn by a generator call.
+    """
+
+    def __init__(self, rng, block_size=256):
+        self.rng = rng
+        self.block_size = block_size
+        self._block = []
+        self._position = 0
+
+    def next(self):
+        """Returns the gap index of the next pipe."""
+        if self._position == len(self._block):
+            self._block = self.rng.integers(
+                0, len(GAP_YS), size=self.block_size
+            ).tolist()
+            self._position = 0
+        self._position += 1
+        return self._block[self._position - 1]
+
+
+class TrackSchedule:
+    """Gap indices read from a row of a benchmark track, repeated when the
+    episode outlasts the row.
+
+    Args:
+        track (np.ndarray): The track, see :func:`load_track`.
+        seed (int): The seed of the episode, which selects the row.
+    """
+
+    def __init__(self, track, seed):
+        self._row = track[seed % len(track)].tolist()
+        self._position = 0
+
+    def next(self):
+        """Returns the gap index of the next pipe."""
+        if self._position == len(self._row):
+            self._position = 0
+        self._position += 1
+        return self._row[self._position - 1]
+
+
+def create_track(path, num_seeds=1000, length=4096, seed=0):
+    """Writes a benchmark track of random gap indices.
+
+    Args:
+        path (str): The `.npy` file of the track.
+        num_seeds (int): Number of gap sequences, one per episode seed.
+        length (int): Number of pipes of a sequence.
+        seed (int): Seed of the random gaps.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    np.save(path, rng.integers(0, len(GAP_YS), size=(num_seeds, length), dtype=np.int8))
+
+
+def load_track(path):
+    """Returns the memory-mapped benchmark track of a path, loaded once per
+    process."""
+    path = os.path.abspath(path)
+    track = _tracks.get(path)
+    if track is None:
+        track = _tracks[path] = np.load(path, mmap_mode="r")
+        if track.ndim != 2 or np.any(track >= len(GAP_YS)) or np.any(track < 0):
+            raise ValueError(f"{path} isn't a benchmark track!")
+    return track
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Creates a benchmark track.")
+    parser.add_argument("path", type=str, help="The .npy file of the track.")
+    parser.add_argument("--seeds", type=int, default=1000, help="Number of seeds.")
+    parser.add_argument("--length", type=int, default=4096, help="Pipes per seed.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the gaps.")
+    args = parser.parse_args()
+    create_track(args.path, args.seeds, args.length, args.seed)
@@ -0,0 +1,83 @@
+""" Low-overhead timing of the phases of the environment's step.
+
+The durations are measured with `time.perf_counter_ns` and accumulated into plain
+Python integers: a total, a count and a histogram with power-of-two buckets per
+phase, from which approximate percentiles are read.
+"""
+
+PHASES = (
+    "action",
+    "score",
+    "physics",
+    "pipes",
+    "observation",
+    "crash",
+    "render",
+)
+NUM_BUCKETS = 48  # bucket i holds the durations in [2^(i-1), 2^i) ns
+
+
+class PhaseStats:
+    """Timings of the step phases.
+
+    Args:
+        phases (Tuple[str, ...]): Names of the phases.
+    """
+
+    def __init__(self, phases=PHASES):
+        self.phases = phases
+        self.reset()
+
+    def reset(self):
+        self.totals = [0] * len(self.phases)
+        self.counts = [0] * len(self.phases)
+        self.histograms = [[0] * NUM_BUCKETS for _ in self.phases]
+
+    def add(self, phase, ns):
+        """Adds a duration in nanoseconds to the phase with the index `phase`."""
+        self.totals[phase] += ns
+        self.counts[phase] += 1
+        self.histograms[phase][min(ns.bit_length(), NUM_BUCKETS - 1)] += 1
+
+    def snapshot(self):
+        """Returns a copy of the totals and counts, see :meth:`summary`."""
+        return list(self.totals), list(self.counts)
+
+    def _percentile(self, histogram, count, q):
+        rank = q * count
+        seen = 0
+        for i, n in enumerate(histogram):
+            seen += n
+            if n and seen >= rank:
+                return (1 << i) / 1e3  # upper bound of the bucket in us
+        return 0.0
+
+    def summary(self, since=None):
+        """Returns the mean, p50 and p99 duration of every phase in us.
+
+        Args:
+            since (Optional[tuple]): A :meth:`snapshot`, only the total time
+                and the mean since the snapshot are returned if given.
+        """
+        result = {}
+        for i, phase in enumerate(self.phases):
+            total, count = self.totals[i], self.counts[i]
+            if since is not None:
+                total -= since[0][i]
+                count -= since[1][i]
+            if count == 0:
+                continue
+
+            result[phase] = {
+                "count": count,
+                "total_ms": total / 1e6,
+                "mean_us": total / count / 1e3,
+            }
+            if since is None:
+                result[phase]["p50_us"] = self._percentile(
+                    self.histograms[i], count, 0.5
+                )
+                result[phase]["p99_us"] = self._percentile(
+                    self.histograms[i], count, 0.99
+                )
+        return result
@@ -0,0 +1,295 @@
+""" Compact replay files of Flappy Bird episodes and their re-simulation.
+
+An episode is fully determined by the seed passed to `reset` and by the actions
+taken in it, so a replay file stores only those, next to the configuration of
+the environment and the final score and state checksum used to verify it:
+
+    * magic `FBRP` and format version (uint16);
+    * seed (int64), number of steps (uint32), final score (int32) and CRC32 of
+      the final state (uint32), see :meth:`FlappyBirdEnv._pack_state`;
+    * length (uint16) and UTF-8 JSON of the configuration;
+    * the actions, one bit per step (`np.packbits`).
+
+Replays are verified or re-rendered to videos from the command line:
+
+    $ python -m flappy_bird_gymnasium.envs.replays verify replays/
+    $ python -m flappy_bird_gymnasium.envs.replays render replays/episode_000000.fbr \
+        frames/
+"""
+
+import argparse
+import glob
+import json
+import os
+import struct
+import time
+import zlib
+from typing import NamedTuple
+
+import gymnasium
+import numpy as np
+import pygame
+
+from flappy_bird_gymnasium.envs.flappy_bird_env import PHYSICS, FlappyBirdEnv
+from flappy_bird_gymnasium.envs.video import FORMATS, VideoWriter
+
+MAGIC = b"FBRP"
+VERSION = 1
+_HEADER = struct.Struct("<4sHqIiIH")
+
+
+class Replay(NamedTuple):
+    """A recorded episode."""
+
+    seed: int
+    config: dict
+    actions: np.ndarray
+    score: int
+    checksum: int
+
+
+def state_checksum(env):
+    """Returns the CRC32 of the packed state of an environment."""
+    return zlib.crc32(env.unwrapped._pack_state().tobytes())
+
+
+def env_config(env):
+    """Returns the arguments of an environment that change its simulation."""
+    env = env.unwrapped
+    return {
+        "screen_size": [env._screen_width, env._screen_height],
+        "score_limit": env._score_limit,
+        "track": env._track,
+        "pixel_collision": env._pixel_collision,
+        **{name: np.asarray(value).item() for name, value in env.physics.items()},
+    }
+
+
+def save_replay(path, replay):
+    """Writes a replay file."""
+    config = json.dumps(replay.config, separators=(",", ":")).encode("utf8")
+    actions = np.asarray(replay.actions, dtype=np.uint8)
+    with open(path, "wb") as f:
+        f.write(
+            _HEADER.pack(
+                MAGIC,
+                VERSION,
+                replay.seed,
+                len(actions),
+                replay.score,
+                replay.checksum,
+                len(config),
+            )
+        )
+        f.write(config)
+        f.write(np.packbits(actions).tobytes())
+
+
+def load_replay(path):
+    """Reads a replay file."""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    header = _HEADER.unpack_from(data)
+    magic, version, seed, num_steps, score, checksum, config_len = header
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a replay file!")
+    if version != VERSION:
+        raise ValueError(f"Unsupported replay version {version} of {path}!")
+
+    start = _HEADER.size
+    end = start + config_len
+    config = json.loads(data[start:end].decode("utf8"))
+    bits = np.frombuffer(data, dtype=np.uint8, offset=end)
+    actions = np.unpackbits(bits, count=num_steps)
+    return Replay(seed, config, actions, score, checksum)
+
+
+class ReplayRecorder(gymnasium.Wrapper):
+    """Saves every episode of an environment as a replay file.
+
+    An episode is saved when it terminates or is truncated, and on `close`
+    if it is still running. When `reset` is called without a seed, the
+    recorder draws one, so every episode can be re-simulated on its own.
+
+    Args:
+        env (gymnasium.Env): The recorded environment.
+        directory (str): The directory of the replay files.
+        seed (Optional[int]): Seed of the generator of the missing seeds.
+    """
+
+    def __init__(self, env, directory, seed=None):
+        super().__init__(env)
+
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        self._config = env_config(env)
+        self._rng = np.random.default_rng(seed)
+        self._episode = 0
+        self._seed = None
+        self._actions = bytearray()
+
+    def _save(self):
+        save_replay(
+            os.path.join(self.directory, f"episode_{self._episode:06d}.fbr"),
+            Replay(
+                self._seed,
+                self._config,
+                np.frombuffer(self._actions, dtype=np.uint8),
+                self.env.unwrapped._score,
+                state_checksum(self.env),
+            ),
+        )
+        self._episode += 1
+        self._seed = None
+
+    def reset(self, *, seed=None, options=None):
+        if self._seed is not None:
+            self._save()
+        if seed is None:
+            seed = int(self._rng.integers(2**63))
+
+        self._seed = seed
+        self._actions = bytearray()
+        result = self.env.reset(seed=seed, options=options)
+        # the options can change the physics and the track
+        self._config = env_config(self.env)
+        return result
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+
+        self._actions.append(int(action))
+        if terminated or truncated:
+            self._save()
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        if self._seed is not None:
+            self._save()
+        super().close()
+
+
+def _make_env(config, render_mode=None):
+    env = FlappyBirdEnv(
+        screen_size=tuple(config["screen_size"]),
+        pipe_gap=config["pipe_gap"],
+        score_limit=config["score_limit"],
+        track=config.get("track"),
+        pixel_collision=config.get("pixel_collision", False),
+        use_lidar=False,
+        render_mode=render_mode,
+    )
+    # the replays of older versions have no accelerations and pipe speed
+    env.physics = {name: config[name] for name in PHYSICS if name in config}
+    if render_mode is None:
+        # the observations don't change the simulation
+        env._get_observation = lambda: (None, None)
+    return env
+
+
+def simulate(replay, env=None):
+    """Re-simulates a replay without rendering it or computing observations.
+
+    Args:
+        replay (Replay): The replay.
+        env (Optional[FlappyBirdEnv]): An environment made for the replay's
+            configuration, reused between the calls.
+
+    Returns:
+        The final score and state checksum.
+    """
+    if env is None:
+        env = _make_env(replay.config)
+
+    env.reset(seed=replay.seed)
+    for action in replay.actions.tolist():
+        env.step(action)
+    return env._score, state_checksum(env)
+
+
+def verify(paths):
+    """Re-simulates replay files and checks their scores and checksums.
+
+    Returns:
+        The paths of the replays whose re-simulation doesn't match.
+    """
+    envs = {}
+    mismatches = []
+    for path in paths:
+        replay = load_replay(path)
+        key = json.dumps(replay.config, sort_keys=True)
+        if key not in envs:
+            envs[key] = _make_env(replay.config)
+
+        if simulate(replay, envs[key]) != (replay.score, replay.checksum):
+            mismatches.append(path)
+    return mismatches
+
+
+def render(replay, path, every=1, format="png"):
+    """Re-renders a replay into a video.
+
+    Args:
+        replay (Replay): The replay.
+        path (str): The video file or directory, see
+            :class:`flappy_bird_gymnasium.envs.video.VideoWriter`.
+        every (int): Renders only every n-th frame.
+        format (str): The video format.
+    """
+    env = _make_env(replay.config, render_mode="rgb_array")
+    writer = VideoWriter(path, format=format)
+
+    def save(t):
+        if t % every == 0:
+            env._draw_surface(show_score=True, show_rays=False)
+            writer.write(
+                np.transpose(pygame.surfarray.array3d(env._surface), axes=(1, 0, 2))
+            )
+
+    env.reset(seed=replay.seed)
+    save(0)
+    for t, action in enumerate(replay.actions.tolist(), start=1):
+        env.step(action)
+        save(t)
+    writer.close()
+    env.close()
+
+
+def _replay_paths(path):
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "*.fbr")))
+    return [path]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Verifies or renders replays.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    verify_parser = subparsers.add_parser("verify", help="Re-simulates replays.")
+    verify_parser.add_argument("path", type=str, help="A replay file or directory.")
+    render_parser = subparsers.add_parser("render", help="Renders a replay.")
+    render_parser.add_argument("path", type=str, help="The replay file.")
+    render_parser.add_argument("output", type=str, help="The video file or directory.")
+    render_parser.add_argument("--every", type=int, default=1, help="Frame step.")
+    render_parser.add_argument(
+        "--format", type=str, default="png", choices=FORMATS, help="Video format."
+    )
+    args = parser.parse_args()
+
+    if args.command == "verify":
+        paths = _replay_paths(args.path)
+        start = time.perf_counter()
+        mismatches = verify(paths)
+        elapsed = time.perf_counter() - start
+        print(
+            f"Verified {len(paths)} replays in {elapsed:.2f}s "
+            f"({len(paths) / max(elapsed, 1e-9):.0f} replays/s), "
+            f"{len(mismatches)} mismatches."
+        )
+        for path in mismatches:
+            print(f"Mismatch: {path}")
+    else:
+        render(
+            load_replay(args.path), args.output, every=args.every, format=args.format
+        )
@@ -0,0 +1,175 @@
+""" Watching an environment from a separate viewer process.
+
+With `render_mode="human"`, every step waits for the display and for the 30 fps
+clock. The :class:`Spectator` wrapper instead publishes the packed state of the
+game (see :meth:`FlappyBirdEnv._pack_state`) after every step into a ring of
+shared memory, and a viewer process draws the newest state with the game's
+sprites at its own frame rate. The environment never waits for the viewer, which
+skips the states published between two of its frames.
+
+Example:
+
+    env = Spectator(gymnasium.make("FlappyBird-v0"), fps=30)
+    ...
+    env.close()
+"""
+
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import gymnasium
+import numpy as np
+import pygame
+
+from flappy_bird_gymnasium.envs.flappy_bird_env import FlappyBirdEnv
+
+# header of the ring: number of published states, stop flag, drawn frames
+_HEAD, _STOP, _FRAMES = range(3)
+_HEADER_SIZE = 3
+
+
+class StateRing:
+    """Ring of packed states in shared memory, written by a single process.
+
+    A record is written before the head is advanced, and a reader checks
+    after copying a record that it hasn't been overwritten in the meantime.
+
+    Args:
+        capacity (int): Number of records.
+        dim (int): Size of a record.
+        name (Optional[str]): Name of an existing ring to attach to.
+    """
+
+    def __init__(self, capacity, dim, name=None):
+        self.capacity = capacity
+        self.dim = dim
+        size = 8 * (_HEADER_SIZE + capacity * dim)
+        self.shm = shared_memory.SharedMemory(name=name, create=name is None, size=size)
+        self.header = np.ndarray((_HEADER_SIZE,), dtype=np.int64, buffer=self.shm.buf)
+        self.records = np.ndarray(
+            (capacity, dim),
+            dtype=np.float64,
+            buffer=self.shm.buf,
+            offset=8 * _HEADER_SIZE,
+        )
+        if name is None:
+            self.header[:] = 0
+
+    def publish(self, record):
+        head = int(self.header[_HEAD])
+        self.records[head % self.capacity] = record
+        self.header[_HEAD] = head + 1
+
+    def latest(self):
+        """Returns the sequence number and a copy of the newest record."""
+        head = int(self.header[_HEAD])
+        if head == 0:
+            return 0, None
+        record = self.records[(head - 1) % self.capacity].copy()
+        if int(self.header[_HEAD]) - head >= self.capacity - 1:
+            return 0, None  # overwritten while copying, retry
+        return head, record
+
+    def close(self):
+        self.header, self.records = None, None
+        self.shm.close()
+
+
+def _view(name, capacity, dim, config, fps):
+    ring = StateRing(capacity, dim, name=name)
+    env = FlappyBirdEnv(use_lidar=False, render_mode="human", **config)
+    env.reset()
+    clock = pygame.time.Clock()
+
+    seq = 0
+    try:
+        while not ring.header[_STOP]:
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                break
+
+            head, record = ring.latest()
+            if head > seq:
+                seq = head
+                env._unpack_state(record)
+                env._draw_surface(show_score=True, show_rays=False)
+                if env._display is None:
+                    env._make_display()
+                env._update_display()
+                ring.header[_FRAMES] += 1
+            clock.tick(fps)
+    finally:
+        env.close()
+        ring.close()
+
+
+class Spectator(gymnasium.Wrapper):
+    """Shows an environment in a window drawn by a separate process.
+
+    Args:
+        env (gymnasium.Env): The watched environment, made without rendering.
+        fps (int): Frame rate of the viewer.
+        capacity (int): Number of states kept in the ring.
+        context (Optional[multiprocessing.context.BaseContext]): The context
+            of the viewer process, `spawn` by default.
+    """
+
+    def __init__(self, env, fps=30, capacity=64, context=None):
+        super().__init__(env)
+
+        unwrapped = env.unwrapped
+        self.fps = fps
+        self.capacity = capacity
+        self.ring = None
+        self._config = {
+            "screen_size": (unwrapped._screen_width, unwrapped._screen_height),
+            "bird_color": unwrapped._bird_color,
+            "pipe_color": unwrapped._pipe_color,
+            "background": unwrapped._bg_type,
+        }
+        self._context = context or mp.get_context("spawn")
+        self._viewer = None
+
+    def _publish(self):
+        state = self.env.unwrapped._pack_state()
+        if self.ring is None:
+            # the size of the states is known after the first reset
+            self.ring = StateRing(self.capacity, len(state))
+            self._viewer = self._context.Process(
+                target=_view,
+                args=(
+                    self.ring.shm.name,
+                    self.capacity,
+                    len(state),
+                    self._config,
+                    self.fps,
+                ),
+                daemon=True,
+            )
+            self._viewer.start()
+        self.ring.publish(state)
+
+    @property
+    def frames(self):
+        """Number of frames drawn by the viewer."""
+        return 0 if self.ring is None else int(self.ring.header[_FRAMES])
+
+    def reset(self, *, seed=None, options=None):
+        obs, info = self.env.reset(seed=seed, options=options)
+        self._publish()
+        return obs, info
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self._publish()
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        if self.ring is not None:
+            self.ring.header[_STOP] = 1
+            self._viewer.join(timeout=5.0)
+            if self._viewer.is_alive():
+                self._viewer.terminate()
+            self.ring.close()
+            self.ring.shm.unlink()
+            self.ring = None
+        super().close()
@@ -0,0 +1,340 @@
+""" Streaming statistics of the episodes in bounded memory.
+
+The scores, lengths and returns of the episodes are summarized by running moments
+(count, mean, standard deviation, min and max) and by quantile sketches, which
+keep counts of logarithmically sized buckets, so a quantile is known within a
+relative error whatever the number of episodes. Both are merged by adding them
+up, so the statistics of many workers or configurations are aggregated exactly as
+if they had been collected by one, and are serialized to plain dictionaries:
+
+    env = StatisticsWrapper(gymnasium.make("FlappyBird-v0"), snapshot_every=100)
+    ...
+    queue.put(env.statistics.to_dict())  # in a worker
+    ...
+    total.merge(EpisodeStatistics.from_dict(queue.get()))  # in the aggregator
+    print(total.snapshot())
+"""
+
+import math
+
+import gymnasium
+import numpy as np
+from gymnasium.vector import AutoresetMode
+
+METRICS = ("score", "length", "return")
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Moments:
+    """Running count, mean, variance, min and max of values (Welford)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of the squared differences from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, values):
+        """Adds an array of values."""
+        values = np.asarray(values, dtype=np.float64)
+        if values.size:
+            other = Moments()
+            other.count = values.size
+            other.mean = float(values.mean())
+            other.m2 = float(np.sum((values - other.mean) ** 2))
+            other.min = float(values.min())
+            other.max = float(values.max())
+            self.merge(other)
+
+    def merge(self, other):
+        """Adds the values of other moments (Chan et al.)."""
+        count = self.count + other.count
+        if count == 0:
+            return
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / self.count) if self.count else 0.0
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        moments = cls()
+        moments.__dict__.update(data)
+        return moments
+
+
+class QuantileSketch:
+    """Mergeable sketch of the quantiles of values within a relative error.
+
+    The magnitudes of the values are counted in buckets whose bounds grow by a
+    factor `gamma = (1 + relative_accuracy) / (1 - relative_accuracy)`, for the
+    positive and the negative values, so the memory doesn't depend on the
+    number of values. The magnitudes out of the range of the buckets, about
+    1e-9 to 1e9 by default, are counted in the first or last bucket.
+
+    Args:
+        relative_accuracy (float): Relative error of the quantiles.
+        num_buckets (int): Number of buckets of each sign.
+    """
+
+    def __init__(self, relative_accuracy=0.01, num_buckets=2048):
+        self.relative_accuracy = relative_accuracy
+        self.num_buckets = num_buckets
+        self.positive = np.zeros(num_buckets, dtype=np.int64)
+        self.negative = np.zeros(num_buckets, dtype=np.int64)
+        self.zeros = 0
+        self._log_gamma = math.log((1 + relative_accuracy) / (1 - relative_accuracy))
+
+    @property
+    def count(self):
+        return int(self.positive.sum() + self.negative.sum()) + self.zeros
+
+    def _indices(self, magnitudes):
+        indices = np.ceil(np.log(magnitudes) / self._log_gamma) + self.num_buckets // 2
+        return np.clip(indices, 0, self.num_buckets - 1).astype(np.int64)
+
+    def _values(self):
+        """Returns the representative magnitude of every bucket."""
+        gamma = math.exp(self._log_gamma)
+        exponents = np.arange(self.num_buckets) - self.num_buckets // 2
+        return 2.0 * np.exp(exponents * self._log_gamma) / (gamma + 1.0)
+
+    def add(self, values):
+        """Adds an array of values."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        for store, magnitudes in (
+            (self.positive, values[values > 0]),
+            (self.negative, -values[values < 0]),
+        ):
+            if magnitudes.size:
+                store += np.bincount(
+                    self._indices(magnitudes), minlength=self.num_buckets
+                )
+        self.zeros += int(np.count_nonzero(values == 0))
+
+    def merge(self, other):
+        """Adds the values of another sketch with the same parameters."""
+        if (other.relative_accuracy, other.num_buckets) != (
+            self.relative_accuracy,
+            self.num_buckets,
+        ):
+            raise ValueError("Can't merge sketches with different parameters!")
+        self.positive += other.positive
+        self.negative += other.negative
+        self.zeros += other.zeros
+
+    def quantiles(self, qs):
+        """Returns the quantiles `qs` (in [0, 1]) of the values, NaN without
+        values."""
+        values = self._values()
+        counts = np.concatenate([self.negative[::-1], [self.zeros], self.positive])
+        if not counts.any():
+            return [math.nan for _ in qs]
+        buckets = np.concatenate([-values[::-1], [0.0], values])
+        cumulative = np.cumsum(counts)
+        ranks = np.asarray(qs, dtype=np.float64) * (cumulative[-1] - 1)
+        return buckets[np.searchsorted(cumulative, ranks, side="right")].tolist()
+
+    def to_dict(self):
+        positive = np.flatnonzero(self.positive)
+        negative = np.flatnonzero(self.negative)
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "num_buckets": self.num_buckets,
+            "zeros": self.zeros,
+            "positive": [positive.tolist(), self.positive[positive].tolist()],
+            "negative": [negative.tolist(), self.negative[negative].tolist()],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"], data["num_buckets"])
+        sketch.zeros = data["zeros"]
+        for store, (indices, counts) in (
+            (sketch.positive, data["positive"]),
+            (sketch.negative, data["negative"]),
+        ):
+            store[indices] = counts
+        return sketch
+
+
+class EpisodeStatistics:
+    """Moments and quantile sketches of the score, length and return of episodes.
+
+    Args:
+        relative_accuracy (float): Relative error of the quantiles.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.moments = {metric: Moments() for metric in METRICS}
+        self.sketches = {
+            metric: QuantileSketch(relative_accuracy) for metric in METRICS
+        }
+
+    @property
+    def episodes(self):
+        return self.moments["score"].count
+
+    def add(self, scores, lengths, returns):
+        """Adds finished episodes, given as arrays."""
+        for metric, values in zip(METRICS, (scores, lengths, returns)):
+            self.moments[metric].add(values)
+            self.sketches[metric].add(values)
+
+    def merge(self, other):
+        """Adds the episodes of other statistics."""
+        for metric in METRICS:
+            self.moments[metric].merge(other.moments[metric])
+            self.sketches[metric].merge(other.sketches[metric])
+
+    def snapshot(self):
+        """Returns the number of episodes, and the mean, standard deviation,
+        min, max, p50, p90 and p99 of every metric."""
+        result = {"episodes": self.episodes}
+        for metric in METRICS:
+            moments = self.moments[metric]
+            summary = {
+                "mean": moments.mean,
+                "std": moments.std,
+                "min": moments.min,
+                "max": moments.max,
+            }
+            quantiles = self.sketches[metric].quantiles(QUANTILES)
+            for q, value in zip(QUANTILES, quantiles):
+                # the exact bounds are tighter than the buckets
+                value = min(max(value, moments.min), moments.max)
+                summary[f"p{round(100 * q)}"] = value
+            result[metric] = summary
+        return result
+
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "moments": {k: v.to_dict() for k, v in self.moments.items()},
+            "sketches": {k: v.to_dict() for k, v in self.sketches.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        statistics = cls(data["relative_accuracy"])
+        statistics.moments = {
+            k: Moments.from_dict(v) for k, v in data["moments"].items()
+        }
+        statistics.sketches = {
+            k: QuantileSketch.from_dict(v) for k, v in data["sketches"].items()
+        }
+        return statistics
+
+
+class StatisticsWrapper(gymnasium.Wrapper):
+    """Collects the statistics of the episodes of an environment.
+
+    Args:
+        env (gymnasium.Env): The environment, whose `info` holds the `score`.
+        statistics (Optional[EpisodeStatistics]): Statistics to add to, e.g.
+            shared by the environments of a configuration.
+        snapshot_every (Optional[int]): If given, the :meth:`snapshot` of the
+            statistics is added to the `info` of the last step of every
+            `snapshot_every`-th episode, as `info["statistics"]`.
+    """
+
+    def __init__(self, env, statistics=None, snapshot_every=None):
+        super().__init__(env)
+        self.statistics = statistics if statistics is not None else EpisodeStatistics()
+        self.snapshot_every = snapshot_every
+        self._episodes = 0
+        self._length = 0
+        self._return = 0.0
+
+    def reset(self, *, seed=None, options=None):
+        self._length = 0
+        self._return = 0.0
+        return self.env.reset(seed=seed, options=options)
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self._length += 1
+        self._return += reward
+
+        if terminated or truncated:
+            self.statistics.add([info["score"]], [self._length], [self._return])
+            self._episodes += 1
+            if self.snapshot_every and self._episodes % self.snapshot_every == 0:
+                info["statistics"] = self.statistics.snapshot()
+        return obs, reward, terminated, truncated, info
+
+
+class VectorStatisticsWrapper(gymnasium.vector.VectorWrapper):
+    """Collects the statistics of the episodes of all the sub-environments of a
+    vector environment, in any autoreset mode.
+
+    Args:
+        env (gymnasium.vector.VectorEnv): The vector environment.
+        statistics (Optional[EpisodeStatistics]): Statistics to add to.
+        snapshot_every (Optional[int]): If given, the :meth:`snapshot` of the
+            statistics is added to the `info` of the steps that end at least
+            one episode after every `snapshot_every` episodes.
+    """
+
+    def __init__(self, env, statistics=None, snapshot_every=None):
+        super().__init__(env)
+        self.statistics = statistics if statistics is not None else EpisodeStatistics()
+        self.snapshot_every = snapshot_every
+        self._autoreset_mode = env.metadata.get(
+            "autoreset_mode", AutoresetMode.NEXT_STEP
+        )
+        self._next_snapshot = snapshot_every
+        self._lengths = np.zeros(self.num_envs, dtype=np.int64)
+        self._returns = np.zeros(self.num_envs)
+        self._dones = np.zeros(self.num_envs, dtype=bool)
+
+    def reset(self, *, seed=None, options=None):
+        self._lengths[:] = 0
+        self._returns[:] = 0.0
+        self._dones[:] = False
+        return self.env.reset(seed=seed, options=options)
+
+    def step(self, actions):
+        obs, rewards, terminations, truncations, infos = self.env.step(actions)
+
+        # the step after an episode's end only resets the sub-environment
+        counted = ~self._dones
+        self._lengths[counted] += 1
+        self._returns[counted] += rewards[counted]
+
+        dones = terminations | truncations
+        if self._autoreset_mode == AutoresetMode.NEXT_STEP:
+            self._dones = dones
+        if np.any(dones):
+            if "final_info" in infos:
+                scores = infos["final_info"]["score"]
+            else:
+                scores = infos["score"]
+            self.statistics.add(
+                scores[dones], self._lengths[dones], self._returns[dones]
+            )
+            self._lengths[dones] = 0
+            self._returns[dones] = 0.0
+
+            if self.snapshot_every and self.statistics.episodes >= self._next_snapshot:
+                infos["statistics"] = self.statistics.snapshot()
+                while self._next_snapshot <= self.statistics.episodes:
+                    self._next_snapshot += self.snapshot_every
+        return obs, rewards, terminations, truncations, infos
@@ -0,0 +1,134 @@
+""" Structured crash and proximity telemetry of the environment.
+
+With `debug=True`, :class:`FlappyBirdEnv` writes one record per step into a
+preallocated ring of :data:`EVENT_DTYPE` records, which keeps the newest steps:
+
+    * `env_id`, `episode`, `step`: where the record comes from;
+    * `score`: the score after the step;
+    * `crash`: the :class:`CrashType` of the step;
+    * `position`: the :class:`PipePosition` of the bird relative to the nearest
+      pipe not yet passed;
+    * `pipe_dx`: horizontal distance from the bird's front to that pipe;
+    * `gap_dy`: vertical distance from the bird's center to the center of the
+      pipe's gap (positive below);
+    * `ray_index`, `ray_value`: the shortest LIDAR ray and its length (-1 and
+      NaN without LIDAR);
+    * `ground_clearance`: distance from the bird's bottom to the ground.
+
+The records of the sub-environments of a vector environment are gathered with
+:func:`collect` and aggregated with :func:`summarize`:
+
+    envs = gymnasium.make_vec("FlappyBird-v0", num_envs=8, debug=True)
+    ...
+    print(summarize(collect(envs)))
+"""
+
+from enum import IntEnum
+
+import numpy as np
+
+EVENT_DTYPE = np.dtype(
+    [
+        ("env_id", np.int32),
+        ("episode", np.int32),
+        ("step", np.int32),
+        ("score", np.int32),
+        ("crash", np.int8),
+        ("position", np.int8),
+        ("pipe_dx", np.float32),
+        ("gap_dy", np.float32),
+        ("ray_index", np.int16),
+        ("ray_value", np.float32),
+        ("ground_clearance", np.float32),
+    ]
+)
+
+
+class CrashType(IntEnum):
+    """What the bird crashed into, if anything."""
+
+    NONE, GROUND, UPPER_PIPE, LOWER_PIPE = 0, 1, 2, 3
+
+
+class PipePosition(IntEnum):
+    """Position of the bird relative to the nearest pipe."""
+
+    IN_FRONT, BETWEEN = 0, 1
+
+
+class EventLog:
+    """Ring of telemetry records.
+
+    Args:
+        capacity (int): Maximum number of kept records.
+    """
+
+    def __init__(self, capacity=1 << 16):
+        self.capacity = capacity
+        self.records = np.zeros(capacity, dtype=EVENT_DTYPE)
+        self.recorded = 0  # number of records ever written
+
+    def record(self, *fields):
+        """Writes a record with the fields of :data:`EVENT_DTYPE` after
+        `env_id`, which is set by :func:`merge`."""
+        self.records[self.recorded % self.capacity] = (0, *fields)
+        self.recorded += 1
+
+    def events(self):
+        """Returns the kept records from the oldest to the newest."""
+        if self.recorded <= self.capacity:
+            return self.records[: self.recorded].copy()
+        return np.roll(self.records, -(self.recorded % self.capacity))
+
+    @property
+    def dropped(self):
+        """Number of records overwritten in the ring."""
+        return max(self.recorded - self.capacity, 0)
+
+    def clear(self):
+        self.recorded = 0
+
+
+def merge(logs):
+    """Concatenates the records of several :class:`EventLog`, numbering their
+    environments by their position in `logs`."""
+    records = [log.events() for log in logs]
+    for env_id, events in enumerate(records):
+        events["env_id"] = env_id
+    return np.concatenate(records) if records else np.zeros(0, dtype=EVENT_DTYPE)
+
+
+def collect(envs):
+    """Returns the records of all the sub-environments of a vector environment."""
+    return merge(envs.call("telemetry"))
+
+
+def summarize(events):
+    """Aggregates telemetry records, e.g. of many environments.
+
+    Returns:
+        A dictionary with the number of steps and crashes, the crashes per
+        :class:`CrashType` and per :class:`PipePosition`, and the minimum and
+        mean ground clearance and shortest LIDAR ray.
+    """
+    crashes = events[events["crash"] != CrashType.NONE]
+    rays = events["ray_value"][events["ray_index"] >= 0]
+    summary = {
+        "steps": len(events),
+        "crashes": len(crashes),
+        "crash_types": {
+            t.name.lower(): int(np.sum(crashes["crash"] == t))
+            for t in CrashType
+            if t != CrashType.NONE
+        },
+        "crash_positions": {
+            p.name.lower(): int(np.sum(crashes["position"] == p)) for p in PipePosition
+        },
+    }
+    if len(events):
+        summary["ground_clearance_min"] = float(np.min(events["ground_clearance"]))
+        summary["ground_clearance_mean"] = float(np.mean(events["ground_clearance"]))
+    if len(rays):
+        summary["ray_min"] = float(np.min(rays))
+        summary["ray_mean"] = float(np.mean(rays))
+    return summary
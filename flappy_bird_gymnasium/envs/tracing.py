@@ -0,0 +1,242 @@
+""" Timeline tracing of environments across processes.
+
+Every process records its spans (step, reset, render, observation, inference
+waits, ...) into its own fixed-size ring, which overwrites the oldest spans when
+it is full, and saves them into a `.npz` file. The files of all the processes are
+then merged into one Chrome trace-event JSON file, which can be opened in
+Perfetto (https://ui.perfetto.dev) or `chrome://tracing`:
+
+    env = gymnasium.make_vec(
+        "FlappyBird-v0",
+        num_envs=8,
+        vectorization_mode="async",
+        wrappers=[functools.partial(TracingWrapper, directory="traces/")],
+    )
+    ...
+    env.close()
+    merge_traces(glob.glob("traces/*.npz"), "trace.json")
+
+The timestamps come from `time.monotonic_ns`, which is shared by the processes of
+a machine.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+import gymnasium
+import numpy as np
+
+SPAN_DTYPE = np.dtype(
+    [("name", np.int32), ("tid", np.int32), ("start", np.int64), ("dur", np.int64)]
+)
+
+_tracer = None
+
+
+class Tracer:
+    """Per-process ring of spans.
+
+    Args:
+        capacity (int): Maximum number of kept spans.
+        sample_rate (float): Fraction of the spans of every name that are
+            recorded, spread evenly over time.
+        label (Optional[str]): Name of the process in the timeline.
+    """
+
+    def __init__(self, capacity=1 << 16, sample_rate=1.0, label=None):
+        self.capacity = capacity
+        self.sample_rate = sample_rate
+        self.pid = os.getpid()
+        self.label = label or f"process {self.pid}"
+        self.spans = np.zeros(capacity, dtype=SPAN_DTYPE)
+        self.names = {}
+        self.recorded = 0  # number of spans ever recorded
+        self._credits = {}
+
+    def _name_id(self, name):
+        name_id = self.names.get(name)
+        if name_id is None:
+            name_id = self.names[name] = len(self.names)
+            # the first span is always recorded
+            self._credits[name_id] = 1.0 - self.sample_rate
+        return name_id
+
+    def sampled(self, name):
+        """Returns whether the next span of `name` is recorded."""
+        name_id = self._name_id(name)
+        if self.sample_rate >= 1.0:
+            return True
+        credits = self._credits[name_id] + self.sample_rate
+        self._credits[name_id] = credits - (credits >= 1.0)
+        return credits >= 1.0
+
+    def record(self, name, start, end, tid=0):
+        """Records a span of `name` between two `time.monotonic_ns` times."""
+        self.spans[self.recorded % self.capacity] = (
+            self._name_id(name),
+            tid,
+            start,
+            end - start,
+        )
+        self.recorded += 1
+
+    @contextlib.contextmanager
+    def span(self, name, tid=0):
+        """Records the duration of a `with` block if it is sampled."""
+        if not self.sampled(name):
+            yield
+            return
+        start = time.monotonic_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.monotonic_ns(), tid)
+
+    def traced(self, name, function, tid=0):
+        """Returns `function` recording a span of `name` around every call."""
+
+        def wrapper(*args, **kwargs):
+            if not self.sampled(name):
+                return function(*args, **kwargs)
+            start = time.monotonic_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, start, time.monotonic_ns(), tid)
+
+        return wrapper
+
+    @property
+    def dropped(self):
+        """Number of spans overwritten in the ring."""
+        return max(self.recorded - self.capacity, 0)
+
+    def ordered_spans(self):
+        """Returns the kept spans from the oldest to the newest."""
+        if self.recorded <= self.capacity:
+            return self.spans[: self.recorded].copy()
+        return np.roll(self.spans, -(self.recorded % self.capacity))
+
+    def save(self, path):
+        """Saves the kept spans into a `.npz` file."""
+        names = sorted(self.names, key=self.names.get)
+        np.savez(
+            path,
+            spans=self.ordered_spans(),
+            names=np.array(names, dtype=str),
+            pid=self.pid,
+            label=self.label,
+            dropped=self.dropped,
+        )
+
+
+def get_tracer():
+    """Returns the tracer of the current process, created on the first call."""
+    global _tracer
+    if _tracer is None or _tracer.pid != os.getpid():
+        _tracer = Tracer()
+    return _tracer
+
+
+class TracingWrapper(gymnasium.Wrapper):
+    """Records the `step`, `reset`, `render` and observation spans of an env.
+
+    The spans of an environment are recorded on its own track (thread id) of
+    the process. The observations are traced by wrapping the observation
+    function of the unwrapped :class:`FlappyBirdEnv`.
+
+    Args:
+        env (gymnasium.Env): The traced environment.
+        tracer (Optional[Tracer]): The tracer, the one of the process if None.
+        directory (Optional[str]): If given, the spans of the tracer are saved
+            into `trace_<pid>.npz` in this directory when the environment is
+            closed, so the environments sharing a tracer write the same file.
+    """
+
+    _next_tid = 0
+    _lock = threading.Lock()
+
+    def __init__(self, env, tracer=None, directory=None):
+        super().__init__(env)
+        self.tracer = tracer or get_tracer()
+        self.directory = directory
+        with TracingWrapper._lock:
+            self.tid = TracingWrapper._next_tid
+            TracingWrapper._next_tid += 1
+
+        unwrapped = env.unwrapped
+        if hasattr(unwrapped, "_get_observation"):
+            unwrapped._get_observation = self.tracer.traced(
+                "observation", unwrapped._get_observation, self.tid
+            )
+
+    def reset(self, *, seed=None, options=None):
+        with self.tracer.span("reset", self.tid):
+            return self.env.reset(seed=seed, options=options)
+
+    def step(self, action):
+        with self.tracer.span("step", self.tid):
+            return self.env.step(action)
+
+    def render(self):
+        with self.tracer.span("render", self.tid):
+            return self.env.render()
+
+    def close(self):
+        super().close()
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.tracer.save(
+                os.path.join(self.directory, f"trace_{self.tracer.pid}.npz")
+            )
+
+
+def merge_traces(paths, output):
+    """Merges saved spans into a Chrome trace-event JSON file.
+
+    Returns:
+        The number of merged spans.
+    """
+    events = []
+    start = None
+    traces = []
+    for path in paths:
+        with np.load(path) as f:
+            trace = {key: f[key] for key in f.files}
+        traces.append(trace)
+        if len(trace["spans"]):
+            first = int(trace["spans"]["start"].min())
+            start = first if start is None else min(start, first)
+
+    pids = set()
+    for trace in traces:
+        pid = int(trace["pid"])
+        if pid not in pids:
+            pids.add(pid)
+            events.append(
+                {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "args": {"name": str(trace["label"])},
+                }
+            )
+        names = trace["names"].tolist()
+        for name, tid, span_start, dur in trace["spans"].tolist():
+            events.append(
+                {
+                    "name": names[name],
+                    "ph": "X",
+                    "pid": pid,
+                    "tid": tid,
+                    "ts": (span_start - start) / 1e3,
+                    "dur": dur / 1e3,
+                }
+            )
+
+    with open(output, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return sum(event["ph"] == "X" for event in events)
@@ -0,0 +1,311 @@
+""" Streaming storage of trajectories into memory-mapped shards.
+
+A recording is a directory with an `index.json` file and a sub-directory per
+shard holding one preallocated `.npy` file per column. Every row of a shard is
+one observation of an episode:
+
+    * `obs`: the observation;
+    * `action`, `reward`, `terminated`, `truncated`, `score`: the step that
+      produced the observation (-1, 0.0, False, False and 0 for the first
+      observation of an episode, returned by `reset`);
+    * `step`: the index of the step in its episode (0 for the first
+      observation);
+    * `episode`: the index of the episode in the recording;
+    * `seed`: the seed passed to `reset` (-1 if none).
+
+An episode that continues past the end of a shard starts the next shard with a
+copy of its last row, so the transitions never span two shards. The recordings
+are read back with :class:`TrajectoryDataset`.
+"""
+
+import json
+import os
+import queue
+import threading
+
+import gymnasium
+import numpy as np
+
+INDEX_FILE = "index.json"
+
+
+def _columns(obs_shape, obs_dtype):
+    return {
+        "obs": (obs_shape, obs_dtype),
+        "action": ((), np.int8),
+        "reward": ((), np.float32),
+        "terminated": ((), np.bool_),
+        "truncated": ((), np.bool_),
+        "score": ((), np.int32),
+        "step": ((), np.int32),
+        "episode": ((), np.int64),
+        "seed": ((), np.int64),
+    }
+
+
+class TrajectoryRecorder(gymnasium.Wrapper):
+    """Records every transition of an environment into memory-mapped shards.
+
+    The rows are written into preallocated `.npy` memory maps, so recording
+    doesn't accumulate anything in memory. A shard is flushed and a new one is
+    created every `shard_size` rows and the index file is rewritten after every
+    rotation and on `close`.
+
+    Args:
+        env (gymnasium.Env): The recorded environment.
+        directory (str): The directory of the recording.
+        shard_size (int): Number of rows per shard, at least 2 since a
+            continuing episode starts a shard with a copy of its last row.
+    """
+
+    def __init__(self, env, directory, shard_size=100_000):
+        if shard_size < 2:
+            raise ValueError(f"The shards need at least 2 rows, got {shard_size}!")
+        super().__init__(env)
+
+        self.directory = directory
+        self.shard_size = shard_size
+        os.makedirs(directory, exist_ok=True)
+
+        space = env.observation_space
+        self._spec = _columns(tuple(space.shape), np.dtype(space.dtype))
+        self._shards = []
+        self._shard = None
+        self._row = 0
+        self._episode = -1
+        self._step = 0
+        self._seed = -1
+
+    def _open_shard(self):
+        name = f"shard_{len(self._shards):05d}"
+        os.makedirs(os.path.join(self.directory, name), exist_ok=True)
+        self._shard = {
+            key: np.lib.format.open_memmap(
+                os.path.join(self.directory, name, key + ".npy"),
+                mode="w+",
+                dtype=dtype,
+                shape=(self.shard_size, *shape),
+            )
+            for key, (shape, dtype) in self._spec.items()
+        }
+        self._shards.append({"name": name, "length": 0})
+        self._row = 0
+
+    def _close_shard(self):
+        for column in self._shard.values():
+            column.flush()
+        self._shards[-1]["length"] = self._row
+        self._shard = None
+        self._write_index()
+
+    def _write_index(self):
+        index = {
+            "obs_shape": list(self._spec["obs"][0]),
+            "obs_dtype": self._spec["obs"][1].str,
+            "shard_size": self.shard_size,
+            "shards": self._shards,
+        }
+        with open(os.path.join(self.directory, INDEX_FILE), "w") as f:
+            json.dump(index, f, indent=2)
+
+    def _write(self, obs, action, reward, terminated, truncated, score):
+        if self._shard is None:
+            self._open_shard()
+        elif self._row == self.shard_size:
+            last = self._row - 1
+            previous = self._shard
+            self._close_shard()
+            self._open_shard()
+            # the episode continues in the new shard
+            if self._step > 0:
+                for key, column in self._shard.items():
+                    column[0] = previous[key][last]
+                self._row = 1
+
+        row = self._row
+        shard = self._shard
+        shard["obs"][row] = obs
+        shard["action"][row] = action
+        shard["reward"][row] = reward
+        shard["terminated"][row] = terminated
+        shard["truncated"][row] = truncated
+        shard["score"][row] = score
+        shard["step"][row] = self._step
+        shard["episode"][row] = self._episode
+        shard["seed"][row] = self._seed
+        self._row += 1
+
+    def reset(self, *, seed=None, options=None):
+        obs, info = self.env.reset(seed=seed, options=options)
+
+        self._episode += 1
+        self._step = 0
+        self._seed = -1 if seed is None else seed
+        self._write(obs, -1, 0.0, False, False, info.get("score", 0))
+        return obs, info
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+
+        self._step += 1
+        self._write(obs, action, reward, terminated, truncated, info.get("score", 0))
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        if self._shard is not None:
+            self._close_shard()
+        super().close()
+
+
+class TrajectoryDataset:
+    """Random access to the transitions of a recording.
+
+    The shards are opened as read-only memory maps, so only the sampled rows
+    are ever read from the disk. The index of the transitions is built once
+    from the `step` columns: a row starts a transition if the next row of the
+    shard continues the same episode.
+
+    With `k` > 1, the observations are stacked on the fly from the k last rows
+    of the episode, repeating its first row like
+    :class:`flappy_bird_gymnasium.tests.framestack.FrameStack`. The stacks of
+    an episode that continues from a previous shard read its earlier rows
+    from the previous shards.
+
+    Args:
+        directory (str): The directory of the recording.
+        k (int): Number of stacked observations.
+        seed (Optional[int]): Seed of the sampling generator.
+    """
+
+    def __init__(self, directory, k=1, seed=None):
+        self.directory = directory
+        self.k = k
+
+        with open(os.path.join(directory, INDEX_FILE)) as f:
+            index = json.load(f)
+        self.obs_shape = tuple(index["obs_shape"])
+
+        self._shards = []
+        self._lengths = np.array([shard["length"] for shard in index["shards"]])
+        shard_of, rows = [], []
+        for i, shard in enumerate(index["shards"]):
+            length = shard["length"]
+            columns = {
+                key: np.load(
+                    os.path.join(directory, shard["name"], key + ".npy"),
+                    mmap_mode="r",
+                )[:length]
+                for key in ("obs", "action", "reward", "terminated", "step")
+            }
+            self._shards.append(columns)
+
+            valid = np.flatnonzero(np.asarray(columns["step"][1:]) > 0)
+            shard_of.append(np.full(len(valid), i, dtype=np.int32))
+            rows.append(valid)
+
+        self._shard_of = np.concatenate(shard_of)
+        self._rows = np.concatenate(rows)
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _stack(self, i, rows):
+        columns = self._shards[i]
+        if self.k == 1:
+            return np.asarray(columns["obs"][rows], dtype=np.float32)
+
+        # the rows of the k last steps, down to the first step of the episode
+        back = np.minimum(
+            np.arange(self.k - 1, -1, -1), columns["step"][rows][:, np.newaxis]
+        )
+        positions = rows[:, np.newaxis] - back
+        shards = np.full(positions.shape, i)
+        # the row 0 of a continuing episode is a copy of the previous shard's last
+        while np.any(positions < 0):
+            before = positions < 0
+            shards[before] -= 1
+            positions[before] += self._lengths[shards[before]] - 1
+
+        stacks = np.empty((len(rows), self.k, *self.obs_shape), dtype=np.float32)
+        for j in np.unique(shards):
+            selected = shards == j
+            stacks[selected] = self._shards[j]["obs"][positions[selected]]
+        return stacks
+
+    def get(self, idx):
+        """Returns a dictionary with the transitions `idx` of the index."""
+        # read the memory maps in order, and put the rows back in the order of idx
+        order = np.argsort(idx, kind="stable")
+        idx = np.asarray(idx)[order]
+        shape = (self.k,) * (self.k > 1) + self.obs_shape
+        batch = {
+            "obs": np.empty((len(idx), *shape), dtype=np.float32),
+            "actions": np.empty(len(idx), dtype=np.int64),
+            "rewards": np.empty(len(idx), dtype=np.float32),
+            "next_obs": np.empty((len(idx), *shape), dtype=np.float32),
+            "dones": np.empty(len(idx), dtype=np.float32),
+        }
+
+        shard_of = self._shard_of[idx]
+        for i in np.unique(shard_of):
+            selected = shard_of == i
+            positions = order[selected]
+            columns = self._shards[i]
+            rows = self._rows[idx[selected]]
+
+            batch["obs"][positions] = self._stack(i, rows)
+            batch["next_obs"][positions] = self._stack(i, rows + 1)
+            batch["actions"][positions] = columns["action"][rows + 1]
+            batch["rewards"][positions] = columns["reward"][rows + 1]
+            batch["dones"][positions] = columns["terminated"][rows + 1]
+        return batch
+
+    def sample(self, batch_size):
+        """Returns a dictionary with a uniformly sampled batch of transitions."""
+        if len(self) == 0:
+            raise ValueError("The recording doesn't contain any transition!")
+        return self.get(self._rng.integers(0, len(self), size=batch_size))
+
+    def batches(self, batch_size, num_batches=None, prefetch=4):
+        """Yields sampled batches prepared by a background thread.
+
+        Args:
+            batch_size (int): Number of transitions per batch.
+            num_batches (Optional[int]): Number of batches, unlimited if None.
+            prefetch (int): Maximum number of batches prepared in advance.
+        """
+        batches = queue.Queue(maxsize=prefetch)
+        stop = threading.Event()
+
+        def put(item):
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+
+        def produce():
+            try:
+                n = 0
+                while not stop.is_set() and (num_batches is None or n < num_batches):
+                    put(self.sample(batch_size))
+                    n += 1
+                put(None)
+            except Exception as e:
+                put(e)
+
+        thread = threading.Thread(target=produce, daemon=True)
+        thread.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is None:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+                yield batch
+        finally:
+            stop.set()
+            thread.join()
@@ -29,15 +29,22 @@ GitHub repository by `sourahbhv` (https://github.com/sourabhv/FlapPyBird),
 released under the MIT license.
 """
 
+import functools
 import os
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Optional
 
+import numpy as np
 from pygame import Rect
 from pygame import image as pyg_image
+from pygame import mask as pyg_mask
 from pygame import mixer as pyg_mixer
+from pygame import surfarray
 from pygame.transform import flip as img_flip
+from pygame.transform import rotate as img_rotate
+
+from flappy_bird_gymnasium.envs.constants import PLAYER_ROT_THR
 
 _BASE_DIR = Path(os.path.dirname(os.path.realpath(__file__))).parent
 
@@ -47,7 +54,7 @@ MODEL_PATH = str(_BASE_DIR / "assets/model")
 
 
 def pixel_collision(
-    rect1: Rect, rect2: Rect, hitmask1: List[List[bool]], hitmask2: List[List[bool]]
+    rect1: Rect, rect2: Rect, hitmask1: np.ndarray, hitmask2: np.ndarray
 ) -> bool:
     """Checks if two objects collide and not just their rects."""
     rect = rect1.clip(rect2)
@@ -57,22 +64,97 @@ def pixel_collision(
 
     x1, y1 = rect.x - rect1.x, rect.y - rect1.y
     x2, y2 = rect.x - rect2.x, rect.y - rect2.y
-
-    for x in range(rect.width):
-        for y in range(rect.height):
-            if hitmask1[x1 + x][y1 + y] and hitmask2[x2 + x][y2 + y]:
-                return True
-    return False
-
-
-def get_hitmask(image) -> List[List[bool]]:
-    """Returns a hitmask using an image's alpha."""
-    mask = []
-    for x in range(image.get_width()):
-        mask.append([])
-        for y in range(image.get_height()):
-            mask[x].append(bool(image.get_at((x, y))[3]))
-    return mask
+    end_x1, end_y1 = x1 + rect.width, y1 + rect.height
+    end_x2, end_y2 = x2 + rect.width, y2 + rect.height
+    return bool(np.any(hitmask1[x1:end_x1, y1:end_y1] & hitmask2[x2:end_x2, y2:end_y2]))
+
+
+def pixel_collision_batch(
+    xs: np.ndarray,
+    ys: np.ndarray,
+    hitmasks: np.ndarray,
+    rect: Rect,
+    hitmask: np.ndarray,
+) -> np.ndarray:
+    """Checks which of many objects collide with another object.
+
+    Args:
+        xs (np.ndarray): Horizontal positions of the objects' top-left corners.
+        ys (np.ndarray): Vertical positions of the objects' top-left corners.
+        hitmasks (np.ndarray): Hitmasks of the objects, of shape (N, width,
+            height), padded with `False` to the same size.
+        rect (Rect): Rect of the other object.
+        hitmask (np.ndarray): Hitmask of the other object.
+
+    Returns:
+        A boolean array of the colliding objects.
+    """
+    _, width, height = hitmasks.shape
+    # pixels of the other object under every pixel of the objects
+    columns = np.trunc(xs).astype(np.int64)[:, None] - rect.x + np.arange(width)
+    rows = np.trunc(ys).astype(np.int64)[:, None] - rect.y + np.arange(height)
+    inside_x = (columns >= 0) & (columns < rect.width)
+    inside_y = (rows >= 0) & (rows < rect.height)
+    under = hitmask[
+        np.clip(columns, 0, rect.width - 1)[:, :, None],
+        np.clip(rows, 0, rect.height - 1)[:, None, :],
+    ]
+    under &= inside_x[:, :, None] & inside_y[:, None, :]
+    return np.any(under & hitmasks, axis=(1, 2))
+
+
+def get_hitmask(image) -> np.ndarray:
+    """Returns a hitmask, indexed [x, y], of the pixels of an image that aren't
+    transparent, by their alpha or the image's colorkey."""
+    return surfarray.array_red(pyg_mask.from_surface(image).to_surface()) > 0
+
+
+class Hitmasks:
+    """Hitmasks of the sprites, computed once.
+
+    Attributes:
+        pipes (Tuple[np.ndarray, np.ndarray]): Hitmasks of the upper and lower
+            pipe.
+        players (np.ndarray): Hitmasks of the player's sprites rotated by every
+            visible rotation, indexed [sprite, rotation + 90, x, y] and padded
+            to the same square size. The rotated sprites are placed at the
+            player's position by their top-left corner, like when drawn.
+    """
+
+    def __init__(self, bird_color: str = "yellow", pipe_color: str = "green"):
+        images = load_images(
+            convert=False, bg_type=None, bird_color=bird_color, pipe_color=pipe_color
+        )
+        self.pipes = tuple(get_hitmask(image) for image in images["pipe"])
+
+        rotated = [
+            [
+                get_hitmask(img_rotate(image, rot))
+                for rot in range(-90, PLAYER_ROT_THR + 1)
+            ]
+            for image in images["player"]
+        ]
+        size = max(max(mask.shape) for masks in rotated for mask in masks)
+        self.players = np.zeros((len(rotated), len(rotated[0]), size, size), dtype=bool)
+        for i, masks in enumerate(rotated):
+            for j, mask in enumerate(masks):
+                self.players[i, j, : mask.shape[0], : mask.shape[1]] = mask
+
+    @property
+    def size(self) -> int:
+        """Size of the players' hitmasks."""
+        return self.players.shape[2]
+
+    @staticmethod
+    def rotation_index(rot):
+        """Returns the index of the visible rotation of a player's rotation."""
+        return np.clip(np.round(rot), -90, PLAYER_ROT_THR).astype(np.int64) + 90
+
+
+@functools.lru_cache(maxsize=None)
+def get_hitmasks(bird_color: str = "yellow", pipe_color: str = "green") -> Hitmasks:
+    """Returns the hitmasks of the sprites, shared within the process."""
+    return Hitmasks(bird_color, pipe_color)
 
 
 def _load_sprite(filename, convert, alpha=True):
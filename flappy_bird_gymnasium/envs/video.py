@@ -0,0 +1,196 @@
+""" Streaming capture of episode videos.
+
+The frames are written to the disk as they are rendered, so the memory used by a
+recording doesn't grow with the length of the episodes. Two formats are
+supported, neither of which needs ffmpeg:
+
+    * `png`: a directory with one PNG image per frame;
+    * `delta`: a single lossless file of zlib-compressed frames XOR-ed with their
+      previous frame. Consecutive frames differ only around the bird and the
+      pipes, so the deltas compress very well. The file starts with the magic
+      `FBVD`, the format version (uint16) and the frame's height, width and
+      channels (uint32), followed by the compressed size (uint32) and data of
+      every frame. It is read back with :func:`read_video`.
+"""
+
+import os
+import queue
+import struct
+import threading
+import zlib
+
+import gymnasium
+import numpy as np
+import pygame
+
+MAGIC = b"FBVD"
+VERSION = 1
+FORMATS = ("png", "delta")
+_HEADER = struct.Struct("<4sHIII")
+_FRAME = struct.Struct("<I")
+
+
+class VideoWriter:
+    """Writes the frames of one video.
+
+    Args:
+        path (str): The video file (`delta`) or directory (`png`).
+        format (str): One of `FORMATS`.
+        compression (int): The zlib compression level of the `delta` format.
+    """
+
+    def __init__(self, path, format="delta", compression=1):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown video format {format}!")
+
+        self.path = path
+        self.format = format
+        self.num_frames = 0
+        self._compression = compression
+        self._previous = None
+        if format == "png":
+            os.makedirs(path, exist_ok=True)
+            self._file = None
+        else:
+            self._file = open(path, "wb")
+
+    def write(self, frame):
+        """Appends a (height, width, channels) uint8 frame."""
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if self.format == "png":
+            surface = pygame.surfarray.make_surface(frame.transpose(1, 0, 2))
+            pygame.image.save(
+                surface, os.path.join(self.path, f"frame_{self.num_frames:06d}.png")
+            )
+        else:
+            if self._previous is None:
+                self._file.write(_HEADER.pack(MAGIC, VERSION, *frame.shape))
+                delta = frame
+            else:
+                delta = np.bitwise_xor(frame, self._previous)
+            data = zlib.compress(delta.tobytes(), self._compression)
+            self._file.write(_FRAME.pack(len(data)))
+            self._file.write(data)
+            self._previous = frame
+        self.num_frames += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_video(path):
+    """Yields the frames of a `delta` video file one by one."""
+    with open(path, "rb") as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return
+        magic, version, *shape = _HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a video file!")
+        if version != VERSION:
+            raise ValueError(f"Unsupported video version {version} of {path}!")
+
+        frame = np.zeros(shape, dtype=np.uint8)
+        while True:
+            size = f.read(_FRAME.size)
+            if not size:
+                break
+            data = zlib.decompress(f.read(_FRAME.unpack(size)[0]))
+            frame = np.bitwise_xor(frame, np.frombuffer(data, np.uint8).reshape(shape))
+            yield frame
+
+
+class VideoRecorder(gymnasium.Wrapper):
+    """Records the episodes of an environment as videos.
+
+    The environment must be made with `render_mode="rgb_array"`. The frames
+    are passed to a background thread through a bounded queue, so rendering,
+    compressing and writing overlap with the simulation, and the environment
+    waits for the writer when it falls `max_queue` frames behind. Every
+    episode is written to `episode_XXXXXX.fbv` or to the `episode_XXXXXX/`
+    directory.
+
+    Args:
+        env (gymnasium.Env): The recorded environment.
+        directory (str): The directory of the videos.
+        format (str): One of `FORMATS`.
+        every (int): Records only every n-th frame of an episode.
+        max_queue (int): Maximum number of frames waiting to be written.
+    """
+
+    def __init__(self, env, directory, format="delta", every=1, max_queue=64):
+        super().__init__(env)
+        if env.render_mode != "rgb_array":
+            raise ValueError("The recorded environment must render RGB arrays!")
+        if format not in FORMATS:
+            raise ValueError(f"Unknown video format {format}!")
+
+        self.directory = directory
+        self.format = format
+        self.every = every
+        os.makedirs(directory, exist_ok=True)
+
+        self._episode = -1
+        self._t = 0
+        self._error = None
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._write_frames, daemon=True)
+        self._thread.start()
+
+    def _write_frames(self):
+        writer, episode = None, None
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                if item[0] != episode:
+                    if writer is not None:
+                        writer.close()
+                    episode = item[0]
+                    name = f"episode_{episode:06d}"
+                    if self.format == "delta":
+                        name += ".fbv"
+                    writer = VideoWriter(
+                        os.path.join(self.directory, name), format=self.format
+                    )
+                writer.write(item[1])
+        except Exception as e:
+            self._error = e
+            # unblock the environment
+            while self._queue.get() is not None:
+                pass
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def _capture(self):
+        if self._error is not None:
+            raise RuntimeError("The video writer failed!") from self._error
+        if self._t % self.every == 0:
+            self._queue.put((self._episode, self.env.render()))
+        self._t += 1
+
+    def reset(self, *, seed=None, options=None):
+        obs, info = self.env.reset(seed=seed, options=options)
+
+        self._episode += 1
+        self._t = 0
+        self._capture()
+        return obs, info
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+
+        self._capture()
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        super().close()
+        if self._error is not None:
+            raise RuntimeError("The video writer failed!") from self._error
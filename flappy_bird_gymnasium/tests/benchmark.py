@@ -0,0 +1,269 @@
+""" Benchmarks the speed of the environment in its observation, render and batch
+modes.
+
+Every case reports the environment steps per second and the p50/p99 latency of a
+`step` call (of a whole batch for the vector environments, and including the
+`render` call in the `rgb_array` mode). The results are saved
+as JSON and can be compared with a stored baseline, failing if the throughput of
+any case drops by more than the threshold:
+
+    $ python -m flappy_bird_gymnasium.tests.benchmark --output baseline.json
+    $ python -m flappy_bird_gymnasium.tests.benchmark --baseline baseline.json
+
+The spin-up time of `spawn` worker processes receiving pickled environments is
+measured separately:
+
+    $ python -m flappy_bird_gymnasium.tests.benchmark --spawn 64
+"""
+
+import argparse
+import functools
+import itertools
+import json
+import multiprocessing
+import pickle
+import sys
+import time
+
+import gymnasium
+import numpy as np
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.tests.framestack import FrameStack, VectorFrameStack
+
+BATCH_SIZES = (1, 4, 16, 64, 256, 1024, 4096)
+
+
+def _measure(env, actions, vector=False, render=False):
+    """Steps an environment through `actions` and times every call."""
+    latencies = np.empty(len(actions), dtype=np.int64)
+    env.reset(seed=0)
+    start_time = time.perf_counter()
+    for i, action in enumerate(actions):
+        t = time.perf_counter_ns()
+        _, _, terminated, truncated, _ = env.step(action)
+        if render:
+            env.render()
+        latencies[i] = time.perf_counter_ns() - t
+        if not vector and (terminated or truncated):
+            env.reset()
+    elapsed = time.perf_counter() - start_time
+    return elapsed, latencies
+
+
+def benchmark(name, make_env, num_steps, batch_size=None, render=False, config=None):
+    """Benchmarks one case.
+
+    Args:
+        name (str): Name of the case.
+        make_env (Callable[[], gymnasium.Env]): Creates the environment.
+        num_steps (int): Number of `step` calls.
+        batch_size (Optional[int]): Number of sub-environments of a vector
+            environment, None for a single environment.
+        render (bool): Whether to fetch a rendered frame after every step.
+        config (Optional[dict]): Settings of the case saved with the results.
+    """
+    env = make_env()
+    rng = np.random.default_rng(0)
+    if batch_size is None:
+        actions = rng.integers(0, 2, size=num_steps).tolist()
+    else:
+        actions = rng.integers(0, 2, size=(num_steps, batch_size))
+    elapsed, latencies = _measure(
+        env, actions, vector=batch_size is not None, render=render
+    )
+    env.close()
+
+    return {
+        "name": name,
+        "config": config or {},
+        "steps_per_s": num_steps * (batch_size or 1) / elapsed,
+        "p50_us": float(np.percentile(latencies, 50)) / 1e3,
+        "p99_us": float(np.percentile(latencies, 99)) / 1e3,
+    }
+
+
+def _make_env(use_lidar, frame_stack=None, **kwargs):
+    env = gymnasium.make("FlappyBird-v0", use_lidar=use_lidar, **kwargs)
+    return FrameStack(env, frame_stack) if frame_stack else env
+
+
+def _make_vec_env(use_lidar, batch_size, frame_stack=None):
+    env = gymnasium.make_vec(
+        "FlappyBird-v0",
+        num_envs=batch_size,
+        vectorization_mode="sync",
+        use_lidar=use_lidar,
+    )
+    return VectorFrameStack(env, frame_stack) if frame_stack else env
+
+
+def cases(env_steps=2000, batch_sizes=BATCH_SIZES):
+    """Returns the keyword arguments of :func:`benchmark` for every case."""
+    configs = [
+        {
+            "use_lidar": use_lidar,
+            "normalize_obs": normalize_obs,
+            "render_mode": render_mode,
+            "debug": debug,
+        }
+        for use_lidar, normalize_obs, render_mode, debug in itertools.product(
+            (False, True), (False, True), (None, "rgb_array"), (False, True)
+        )
+    ]
+    configs += [
+        {"use_lidar": use_lidar, "frame_stack": 4} for use_lidar in (False, True)
+    ]
+
+    result = []
+    for config in configs:
+        result.append(
+            {
+                "name": ",".join(f"{k}={v}" for k, v in config.items()),
+                "make_env": functools.partial(_make_env, **config),
+                # the frames are fetched after every step
+                "num_steps": env_steps // 4 if config.get("render_mode") else env_steps,
+                "render": config.get("render_mode") is not None,
+                "config": config,
+            }
+        )
+
+    for use_lidar, frame_stack, batch_size in itertools.product(
+        (False, True), (None, 4), batch_sizes
+    ):
+        config = {
+            "use_lidar": use_lidar,
+            "frame_stack": frame_stack,
+            "batch_size": batch_size,
+        }
+        result.append(
+            {
+                "name": "vector," + ",".join(f"{k}={v}" for k, v in config.items()),
+                "make_env": functools.partial(_make_vec_env, **config),
+                "num_steps": max(env_steps // batch_size, 5),
+                "batch_size": batch_size,
+                "config": config,
+            }
+        )
+    return result
+
+
+def run(env_steps=2000, batch_sizes=BATCH_SIZES, verbose=True):
+    """Runs all the cases and returns their results."""
+    results = []
+    for case in cases(env_steps, batch_sizes):
+        result = benchmark(**case)
+        results.append(result)
+        if verbose:
+            print(
+                f"{result['name']:<70} {result['steps_per_s']:>10.0f} steps/s, "
+                f"p50: {result['p50_us']:>9.1f} us, p99: {result['p99_us']:>9.1f} us"
+            )
+    return results
+
+
+def compare(results, baseline, threshold=0.2):
+    """Returns the cases whose throughput dropped by more than `threshold`.
+
+    Returns:
+        A list of (name, steps/s, baseline steps/s) tuples. The cases missing
+        in the baseline are ignored.
+    """
+    baseline = {r["name"]: r["steps_per_s"] for r in baseline}
+    return [
+        (r["name"], r["steps_per_s"], baseline[r["name"]])
+        for r in results
+        if r["name"] in baseline
+        and r["steps_per_s"] < (1.0 - threshold) * baseline[r["name"]]
+    ]
+
+
+def _spin_up(env, config, queue):
+    if env is None:
+        env = gymnasium.make("FlappyBird-v0", **config)
+    env.reset(seed=0)
+    env.step(0)
+    env.render()
+    queue.put(time.perf_counter())
+    env.close()
+
+
+def spawn_benchmark(num_workers=64, ship_env=True, context="spawn", **config):
+    """Measures the time until `num_workers` new processes have stepped and
+    rendered an environment.
+
+    Args:
+        num_workers (int): Number of worker processes.
+        ship_env (bool): Whether the workers receive a pickled environment,
+            made once by the parent, or make their own.
+        context (str): The start method of the processes.
+        **config: The arguments of the environment.
+
+    Returns:
+        The total and per-worker spin-up time in seconds and the size of the
+        pickled environment in bytes.
+    """
+    ctx = multiprocessing.get_context(context)
+    queue = ctx.Queue()
+    env = gymnasium.make("FlappyBird-v0", **config) if ship_env else None
+
+    start_time = time.perf_counter()
+    workers = [
+        ctx.Process(target=_spin_up, args=(env, config, queue), daemon=True)
+        for _ in range(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    ready = [queue.get() for _ in workers]
+    elapsed = max(ready) - start_time
+    for worker in workers:
+        worker.join()
+
+    return {
+        "name": f"spawn,workers={num_workers},ship_env={ship_env}",
+        "config": config,
+        "spin_up_s": elapsed,
+        "per_worker_ms": 1e3 * elapsed / num_workers,
+        "pickle_bytes": len(pickle.dumps(env)) if ship_env else 0,
+    }
+
+
+def play(output=None, baseline=None, threshold=0.2, env_steps=2000):
+    results = run(env_steps=env_steps)
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        with open(baseline) as f:
+            regressions = compare(results, json.load(f), threshold=threshold)
+        for name, steps_per_s, expected in regressions:
+            print(f"Regression: {name}: {steps_per_s:.0f} < {expected:.0f} steps/s")
+        return not regressions
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks the environment.")
+    parser.add_argument("--output", type=str, help="Saves the results as JSON.")
+    parser.add_argument("--baseline", type=str, help="Results to compare with.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Tolerated throughput drop."
+    )
+    parser.add_argument("--steps", type=int, default=2000, help="Steps per case.")
+    parser.add_argument(
+        "--spawn", type=int, help="Only measures the spin-up of this many workers."
+    )
+    args = parser.parse_args()
+    if args.spawn:
+        for ship_env in (True, False):
+            result = spawn_benchmark(
+                args.spawn, ship_env=ship_env, render_mode="rgb_array"
+            )
+            print(
+                f"{result['name']}: {result['spin_up_s']:.2f} s, "
+                f"{result['per_worker_ms']:.1f} ms/worker, "
+                f"{result['pickle_bytes']} bytes"
+            )
+        sys.exit(0)
+    sys.exit(0 if play(args.output, args.baseline, args.threshold, args.steps) else 1)
@@ -0,0 +1,57 @@
+""" Benchmarks the batched operations of the prioritized replay's sum-tree.
+
+$ python -m flappy_bird_gymnasium.tests.benchmark_replay
+"""
+
+import time
+
+import numpy as np
+
+from flappy_bird_gymnasium.tests.replay import SumTree
+
+
+def benchmark_sum_tree(capacity, batch_size=512, iterations=200, seed=0):
+    """Returns the mean time in microseconds of the sum-tree operations."""
+    rng = np.random.default_rng(seed)
+    tree = SumTree(capacity)
+
+    start_time = time.perf_counter()
+    chunk = 1 << 16
+    for i in range(0, capacity, chunk):
+        idx = np.arange(i, min(i + chunk, capacity))
+        tree.update(idx, rng.random(len(idx)))
+    fill_time = time.perf_counter() - start_time
+
+    results = {"capacity": capacity, "batch_size": batch_size, "fill_s": fill_time}
+    for stratified in (True, False):
+        start_time = time.perf_counter()
+        for _ in range(iterations):
+            tree.sample(batch_size, rng, stratified=stratified)
+        key = "sample_stratified_us" if stratified else "sample_us"
+        results[key] = (time.perf_counter() - start_time) / iterations * 1e6
+
+    batches = [rng.integers(0, capacity, size=batch_size) for _ in range(iterations)]
+    start_time = time.perf_counter()
+    for idx in batches:
+        tree.update(idx, rng.random(batch_size))
+    results["update_us"] = (time.perf_counter() - start_time) / iterations * 1e6
+    results["memory_mb"] = tree.tree.nbytes / 2**20
+    return results
+
+
+def play(capacities=(1_000_000, 10_000_000), batch_size=512):
+    results = [benchmark_sum_tree(c, batch_size=batch_size) for c in capacities]
+    for r in results:
+        print(
+            f"Capacity: {r['capacity']:>10}, Batch: {r['batch_size']}, "
+            f"Fill: {r['fill_s']:.2f} s, "
+            f"Sample: {r['sample_us']:.0f} us, "
+            f"Stratified sample: {r['sample_stratified_us']:.0f} us, "
+            f"Update: {r['update_us']:.0f} us, "
+            f"Memory: {r['memory_mb']:.0f} MB"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    play()
@@ -0,0 +1,325 @@
+""" Pure NumPy inference of the bundled Dueling DQN models.
+
+The forward passes reproduce :class:`flappy_bird_gymnasium.tests.dueling.DuelingDQN`
+and :class:`flappy_bird_gymnasium.tests.dueling_v2.DuelingDQN` without importing
+TensorFlow. The weights are converted once from the Keras `.h5` checkpoints into
+`.npz` archives of float32 arrays:
+
+    $ python -m flappy_bird_gymnasium.tests.dueling_numpy model.h5 model.npz
+"""
+
+import argparse
+import math
+
+import numpy as np
+
+from flappy_bird_gymnasium.tests.framestack import FrameRing
+
+_ENCODER_KEYS = (
+    "mha/query/kernel",
+    "mha/query/bias",
+    "mha/key/kernel",
+    "mha/key/bias",
+    "mha/value/kernel",
+    "mha/value/bias",
+    "mha/attention_output/kernel",
+    "mha/attention_output/bias",
+    "dense_0/kernel",
+    "dense_0/bias",
+    "dense_1/kernel",
+    "dense_1/bias",
+    "norm_0/gamma",
+    "norm_0/beta",
+    "norm_1/gamma",
+    "norm_1/beta",
+)
+
+
+def _dense(x, weights, name):
+    return x @ weights[name + "/kernel"] + weights[name + "/bias"]
+
+
+def _elu(x):
+    return np.where(x > 0.0, x, np.expm1(np.minimum(x, 0.0)))
+
+
+def _erf(x):
+    # Abramowitz & Stegun 7.1.26 (max. absolute error 1.5e-7)
+    sign = np.sign(x)
+    x = np.abs(x)
+    t = 1.0 / (1.0 + 0.3275911 * x)
+    y = t * (
+        0.254829592
+        + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429)))
+    )
+    return sign * (1.0 - y * np.exp(-x * x))
+
+
+def _gelu(x):
+    return 0.5 * x * (1.0 + _erf(x * (1.0 / math.sqrt(2.0))))
+
+
+def _softmax(x):
+    x = np.exp(x - np.max(x, axis=-1, keepdims=True))
+    return x / np.sum(x, axis=-1, keepdims=True)
+
+
+def _layer_norm(x, weights, name, epsilon=1e-6):
+    mean = np.mean(x, axis=-1, keepdims=True)
+    var = np.var(x, axis=-1, keepdims=True)
+    x = (x - mean) / np.sqrt(var + epsilon)
+    return x * weights[name + "/gamma"] + weights[name + "/beta"]
+
+
+def _dueling_head(x, weights):
+    V = _dense(x, weights, "V")
+    A = _dense(x, weights, "A")
+    return V + (A - np.mean(A, axis=-1, keepdims=True))
+
+
+def _decode(names):
+    return [n.decode("utf8") if isinstance(n, bytes) else str(n) for n in names]
+
+
+def load_h5_layers(path):
+    """Reads the weights of a Keras `.h5` checkpoint saved by `save_weights`.
+
+    Returns:
+        A list with the weights of every layer that has any, in the order of
+        `model.layers` and `layer.weights`.
+    """
+    import h5py
+
+    layers = []
+    with h5py.File(path, "r") as f:
+        group = f["model_weights"] if "model_weights" in f else f
+        for layer_name in _decode(group.attrs["layer_names"]):
+            g = group[layer_name]
+            weight_names = _decode(g.attrs["weight_names"])
+            if weight_names:
+                layers.append([np.asarray(g[name]) for name in weight_names])
+    return layers
+
+
+def keras_layers(model):
+    """Returns the weights of a built Keras model in the `.h5` saving order."""
+    return [
+        [np.asarray(w) for w in layer.weights]
+        for layer in model.layers
+        if layer.weights
+    ]
+
+
+def layers_to_weights(layers):
+    """Maps the per-layer weight lists to the named weights of the NumPy models."""
+    weights = {}
+    # Dueling head
+    weights["V/kernel"], weights["V/bias"] = layers[-2]
+    weights["A/kernel"], weights["A/bias"] = layers[-1]
+
+    if len(layers[0]) == 3:
+        # Transformer (`dueling_v2`)
+        (
+            weights["pos_embs/position"],
+            weights["pos_embs/projection/kernel"],
+            weights["pos_embs/projection/bias"],
+        ) = layers[0]
+        for i, layer in enumerate(layers[1:-2]):
+            if len(layer) != len(_ENCODER_KEYS):
+                raise ValueError(f"Unexpected weights of encoder layer {i}!")
+            for key, value in zip(_ENCODER_KEYS, layer):
+                weights[f"e_layers/{i}/{key}"] = value
+    else:
+        # MLP (`dueling`)
+        if len(layers) != 4:
+            raise ValueError(f"Expected 4 dense layers, found {len(layers)}!")
+        weights["fc1/kernel"], weights["fc1/bias"] = layers[0]
+        weights["fc2/kernel"], weights["fc2/bias"] = layers[1]
+
+    return {k: np.asarray(v, dtype=np.float32) for k, v in weights.items()}
+
+
+def convert(h5_path, npz_path):
+    """Converts a Keras `.h5` checkpoint into a `.npz` archive."""
+    np.savez(npz_path, **layers_to_weights(load_h5_layers(h5_path)))
+
+
+def load_model(path):
+    """Loads the matching NumPy model from a `.npz` archive."""
+    with np.load(path) as f:
+        weights = dict(f)
+    if "pos_embs/position" in weights:
+        return DuelingDQNv2(weights)
+    return DuelingDQN(weights)
+
+
+class DuelingDQN:
+    """NumPy version of :class:`flappy_bird_gymnasium.tests.dueling.DuelingDQN`.
+
+    Args:
+        weights (Dict[str, np.ndarray]): Named weights, see :func:`convert`.
+    """
+
+    def __init__(self, weights):
+        self.weights = {k: np.asarray(v, dtype=np.float32) for k, v in weights.items()}
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(dict(f))
+
+    def __call__(self, inputs):
+        """Returns the Q-values of a batch of observations with shape (B, 12)."""
+        x = np.asarray(inputs, dtype=np.float32)
+        x = _elu(_dense(x, self.weights, "fc1"))
+        x = _elu(_dense(x, self.weights, "fc2"))
+        return _dueling_head(x, self.weights)
+
+    def get_actions(self, states):
+        return np.argmax(self(states), axis=-1)
+
+    def get_action(self, state):
+        return self.get_actions(state)[0]
+
+
+class DuelingDQNv2:
+    """NumPy version of :class:`flappy_bird_gymnasium.tests.dueling_v2.DuelingDQN`.
+
+    The number of encoder layers and attention heads is inferred from the
+    weights. Dropout is inactive at inference time, so it is left out.
+
+    Args:
+        weights (Dict[str, np.ndarray]): Named weights, see :func:`convert`.
+    """
+
+    def __init__(self, weights):
+        self.weights = {k: np.asarray(v, dtype=np.float32) for k, v in weights.items()}
+        self.num_layers = len(
+            [k for k in self.weights if k.endswith("/mha/query/kernel")]
+        )
+        _, self.num_heads, self.key_dim = self.weights[
+            "e_layers/0/mha/query/kernel"
+        ].shape
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            return cls(dict(f))
+
+    def _attention(self, x, prefix):
+        batch_size, seq_len, _ = x.shape
+        heads_dim = (self.num_heads, self.key_dim)
+
+        def project(name):
+            kernel = self.weights[prefix + name + "/kernel"]
+            y = x @ kernel.reshape(kernel.shape[0], -1)
+            y = y.reshape(batch_size, seq_len, *heads_dim)
+            y += self.weights[prefix + name + "/bias"]
+            return y.transpose(0, 2, 1, 3)  # [B, H, T, D]
+
+        query = project("query") * (1.0 / math.sqrt(self.key_dim))
+        key = project("key")
+        value = project("value")
+
+        scores = _softmax(query @ key.transpose(0, 1, 3, 2))  # [B, H, T, S]
+        x = (scores @ value).transpose(0, 2, 1, 3).reshape(batch_size, seq_len, -1)
+
+        kernel = self.weights[prefix + "attention_output/kernel"]
+        x = x @ kernel.reshape(-1, kernel.shape[-1])
+        return x + self.weights[prefix + "attention_output/bias"], scores
+
+    def _encoder(self, inputs, i):
+        prefix = f"e_layers/{i}/"
+
+        # Attention block
+        x = _layer_norm(inputs, self.weights, prefix + "norm_0")
+        x, attn_scores = self._attention(x, prefix + "mha/")
+        x = x + inputs
+
+        # MLP block
+        y = _layer_norm(x, self.weights, prefix + "norm_1")
+        y = _gelu(_dense(y, self.weights, prefix + "dense_0"))
+        y = _dense(y, self.weights, prefix + "dense_1")
+
+        return x + y, attn_scores
+
+    def embed(self, inputs):
+        """Projects a batch of frames with shape (..., 180) to the embedding."""
+        x = np.asarray(inputs, dtype=np.float32)
+        return _dense(x, self.weights, "pos_embs/projection")
+
+    def forward_embedded(self, x):
+        """Runs the model from the projected frames with shape (B, T, E)."""
+        x = x + self.weights["pos_embs/position"]
+
+        for i in range(self.num_layers):
+            x, attn_matrix = self._encoder(x, i)
+
+        # Reduce block
+        x = np.mean(x, axis=1)
+
+        return _dueling_head(x, self.weights), attn_matrix
+
+    def __call__(self, inputs):
+        """Returns the Q-values and the attention scores of the last encoder for
+        a batch of frame stacks with shape (B, T, 180)."""
+        return self.forward_embedded(self.embed(inputs))
+
+    def get_actions(self, states):
+        y, attn_matrix = self(states)
+        return np.argmax(y, axis=-1), attn_matrix
+
+    def get_action(self, state):
+        actions, attn_matrix = self.get_actions(state)
+        return actions[0], attn_matrix
+
+
+class IncrementalDuelingDQNv2:
+    """Incremental inference of :class:`DuelingDQNv2` over N frame stacks.
+
+    The projection of the positional embedding is applied frame by frame, so
+    the projections of the k stacked frames are kept in a :class:`FrameRing`
+    aligned with the frame stack. Every step projects only the newest frames
+    and the positional embeddings are added to the rolled window afterwards,
+    which gives the same Q-values as running the model on the whole stacks.
+
+    Args:
+        model (DuelingDQNv2): The model.
+        num_envs (int): Number of frame stacks (N).
+    """
+
+    def __init__(self, model, num_envs=1):
+        self.model = model
+        _, k, embed_dim = model.weights["pos_embs/position"].shape
+        self.ring = FrameRing(num_envs, k, (embed_dim,), dtype=np.float32)
+
+    def reset(self, frames, mask=None):
+        """Fills the history of the (masked) stacks with the first frames."""
+        self.ring.fill(self.model.embed(frames), mask)
+
+    def __call__(self, frames, reset_mask=None):
+        """Appends the newest frames with shape (N, 180) and returns the
+        Q-values and the attention scores of the last encoder.
+
+        Args:
+            frames (np.ndarray): The newest frame of every stack.
+            reset_mask (Optional[np.ndarray]): Stacks whose episode has just
+                started, their history is filled with the new frame.
+        """
+        x = self.model.embed(frames)
+        self.ring.push(x)
+        if reset_mask is not None and np.any(reset_mask):
+            self.ring.fill(x, reset_mask)
+        return self.model.forward_embedded(self.ring.view())
+
+    def get_actions(self, frames, reset_mask=None):
+        y, attn_matrix = self(frames, reset_mask)
+        return np.argmax(y, axis=-1), attn_matrix
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Converts a Keras checkpoint.")
+    parser.add_argument("h5_path", type=str, help="The `.h5` weights file.")
+    parser.add_argument("npz_path", type=str, help="The output `.npz` file.")
+    args = parser.parse_args()
+    convert(args.h5_path, args.npz_path)
@@ -44,3 +44,111 @@ class FrameStack(gymnasium.Wrapper):
     def _get_ob(self):
         assert len(self.frames) == self.k
         return np.stack(list(self.frames), axis=0)  # stack along time axis
+
+
+class FrameRing:
+    """Rolling buffer of the k last frames of N parallel streams.
+
+    Every frame is written twice, at positions `t` and `t + k` of a buffer of
+    length 2k, so the k last frames always form a contiguous window that can be
+    returned as a view without copying or rolling the buffer.
+
+    Args:
+        num_envs (int): Number of parallel streams (N).
+        k (int): Number of stacked frames.
+        frame_shape (Tuple[int, ...]): Shape of a single frame.
+        dtype: Data type of the frames.
+    """
+
+    def __init__(self, num_envs, k, frame_shape, dtype=np.float64):
+        self.k = k
+        self.frames = np.zeros((num_envs, 2 * k, *frame_shape), dtype=dtype)
+        self._t = k - 1
+
+    def push(self, frame):
+        """Appends a batch of frames with shape (N, *frame_shape)."""
+        self._t = (self._t + 1) % self.k
+        self.frames[:, self._t] = frame
+        self.frames[:, self._t + self.k] = frame
+
+    def fill(self, frame, mask=None):
+        """Fills the whole history of the (masked) streams with `frame`."""
+        if mask is None:
+            self.frames[:] = np.expand_dims(frame, axis=1)
+        else:
+            self.frames[mask] = np.expand_dims(frame[mask], axis=1)
+
+    def view(self):
+        """Returns a (N, k, *frame_shape) view ordered from oldest to newest."""
+        return self.frames[:, slice(self._t + 1, self._t + 1 + self.k)]
+
+
+class VectorFrameStack(gymnasium.vector.VectorWrapper):
+    """Stack k last frames of every sub-environment of a vector environment.
+
+    The frames of all sub-environments live in one :class:`FrameRing`, so a step
+    costs two batched writes and the sub-environments that were auto-reset are
+    refilled with a single masked assignment. The returned observations are
+    (N, k, *obs_shape) views into the ring: they are only valid until the next
+    call to `step` or `reset`, copy them if they must be kept (e.g. in a replay
+    buffer).
+
+    With the "same-step" autoreset mode the stacked final observations of the
+    finished episodes are not available, only the raw ones in `info`.
+    """
+
+    def __init__(self, env, k):
+        super().__init__(env)
+
+        self.k = k
+
+        single_space = self.env.single_observation_space
+        self.single_observation_space = gymnasium.spaces.Box(
+            low=np.repeat(single_space.low[np.newaxis, ...], k, axis=0),
+            high=np.repeat(single_space.high[np.newaxis, ...], k, axis=0),
+            dtype=single_space.dtype,
+        )
+        self.observation_space = gymnasium.vector.utils.batch_space(
+            self.single_observation_space, self.num_envs
+        )
+
+        self.ring = FrameRing(
+            self.num_envs, k, single_space.shape, dtype=single_space.dtype
+        )
+
+        self._autoreset_mode = gymnasium.vector.AutoresetMode(
+            self.env.metadata.get(
+                "autoreset_mode", gymnasium.vector.AutoresetMode.NEXT_STEP
+            )
+        )
+        self._autoreset = np.zeros(self.num_envs, dtype=np.bool_)
+
+    def reset(self, *, seed=None, options=None):
+        obs, info = self.env.reset(seed=seed, options=options)
+
+        # partial resets (`reset_mask`) keep the history of the other envs
+        mask = None if options is None else options.get("reset_mask")
+        self.ring.fill(obs, mask)
+        if mask is None:
+            self._autoreset[:] = False
+        else:
+            self._autoreset[mask] = False
+
+        return self.ring.view(), info
+
+    def step(self, actions):
+        obs, reward, terminated, truncated, info = self.env.step(actions)
+        self.ring.push(obs)
+
+        # episode boundaries
+        if self._autoreset_mode == gymnasium.vector.AutoresetMode.NEXT_STEP:
+            mask = self._autoreset
+        elif self._autoreset_mode == gymnasium.vector.AutoresetMode.SAME_STEP:
+            mask = np.logical_or(terminated, truncated)
+        else:
+            mask = None
+        if mask is not None and mask.any():
+            self.ring.fill(obs, mask)
+        self._autoreset = np.logical_or(terminated, truncated)
+
+        return self.ring.view(), reward, terminated, truncated, info
@@ -0,0 +1,237 @@
+""" Micro-batching policy inference for many environment worker processes.
+
+The workers write their observation into their own slot of a shared-memory
+array and push the slot index to a request queue. The server collects the
+requests for at most `max_wait` seconds or until `max_batch_size` of them are
+pending, runs one batched forward pass and writes the actions back into shared
+memory, waking up every served worker.
+
+Example:
+
+    server = InferenceServer(policy, obs_shape=(12,), num_workers=8)
+    server.start()
+    # pass `server.client(i)` to the i-th worker process
+    ...
+    server.close()
+"""
+
+import multiprocessing as mp
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class InferenceClient:
+    """Worker side of an :class:`InferenceServer`, picklable to child processes.
+
+    Args:
+        slot (int): Index of the worker's observation slot.
+    """
+
+    def __init__(
+        self, slot, shm_name, obs_shape, obs_dtype, num_workers, requests, ready
+    ):
+        self.slot = slot
+        self._shm_name = shm_name
+        self._obs_shape = obs_shape
+        self._obs_dtype = obs_dtype
+        self._num_workers = num_workers
+        self._requests = requests
+        self._ready = ready
+        self._shm = None
+        # a :class:`flappy_bird_gymnasium.envs.tracing.Tracer` of the worker
+        self.tracer = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_shm"] = None
+        return state
+
+    def _attach(self):
+        self._shm = shared_memory.SharedMemory(name=self._shm_name)
+        self._obs, self._actions = _shared_arrays(
+            self._shm, self._num_workers, self._obs_shape, self._obs_dtype
+        )
+
+    def get_action(self, obs):
+        """Sends one observation to the server and waits for its action."""
+        if self._shm is None:
+            self._attach()
+        self._obs[self.slot] = obs
+        if self.tracer is not None:
+            start = time.monotonic_ns()
+        self._requests.put(self.slot)
+        self._ready.acquire()
+        if self.tracer is not None:
+            self.tracer.record("inference_wait", start, time.monotonic_ns())
+        return int(self._actions[self.slot])
+
+    def close(self):
+        if self._shm is not None:
+            self._obs, self._actions = None, None
+            self._shm.close()
+            self._shm = None
+
+
+def _shared_arrays(shm, num_workers, obs_shape, obs_dtype):
+    obs = np.ndarray((num_workers, *obs_shape), dtype=obs_dtype, buffer=shm.buf)
+    actions = np.ndarray(
+        (num_workers,), dtype=np.int64, buffer=shm.buf, offset=obs.nbytes
+    )
+    return obs, actions
+
+
+class InferenceServer:
+    """Serves batched actions of a policy to up to `num_workers` workers.
+
+    Args:
+        policy (Callable[[np.ndarray], np.ndarray]): Maps a batch of
+            observations to a batch of actions, e.g.
+            :func:`flappy_bird_gymnasium.tests.test_evaluation.greedy_policy` of
+            a NumPy or TensorFlow Dueling DQN.
+        obs_shape (Tuple[int, ...]): Shape of a single observation.
+        num_workers (int): Number of worker slots.
+        max_batch_size (int): Maximum number of observations per forward pass.
+        max_wait (float): Maximum time in seconds the first request of a batch
+            waits for more requests.
+        obs_dtype: Data type of the observations.
+        context (Optional[str]): Multiprocessing start method of the workers.
+        tracer (Optional[flappy_bird_gymnasium.envs.tracing.Tracer]): Records
+            the collection and the computation of every batch.
+    """
+
+    def __init__(
+        self,
+        policy,
+        obs_shape,
+        num_workers,
+        max_batch_size=64,
+        max_wait=0.002,
+        obs_dtype=np.float32,
+        context=None,
+        tracer=None,
+    ):
+        self.policy = policy
+        self.tracer = tracer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+
+        self._num_workers = num_workers
+        self._obs_shape = tuple(obs_shape)
+        self._obs_dtype = np.dtype(obs_dtype)
+
+        ctx = mp.get_context(context)
+        nbytes = num_workers * (
+            int(np.prod(self._obs_shape)) * self._obs_dtype.itemsize + 8
+        )
+        self._shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._obs, self._actions = _shared_arrays(
+            self._shm, num_workers, self._obs_shape, self._obs_dtype
+        )
+        self._requests = ctx.Queue()
+        self._ready = [ctx.Semaphore(0) for _ in range(num_workers)]
+
+        # statistics
+        self.batch_size_hist = np.zeros(max_batch_size + 1, dtype=np.int64)
+        self.queue_depth_hist = np.zeros(num_workers + 1, dtype=np.int64)
+        self.wait_time = 0.0
+        self.compute_time = 0.0
+
+        self._running = False
+        self._thread = None
+
+    def client(self, slot):
+        """Returns the client of the worker using the observation slot `slot`."""
+        return InferenceClient(
+            slot,
+            self._shm.name,
+            self._obs_shape,
+            self._obs_dtype,
+            self._num_workers,
+            self._requests,
+            self._ready[slot],
+        )
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self):
+        self.stop()
+        self._obs, self._actions = None, None
+        self._shm.close()
+        self._shm.unlink()
+
+    def _collect(self):
+        """Returns the slots of the next batch of requests."""
+        try:
+            slots = [self._requests.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        deadline = time.perf_counter() + self.max_wait
+        while len(slots) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                slots.append(self._requests.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return slots
+
+    def _serve(self):
+        while self._running:
+            start_time = time.perf_counter()
+            slots = self._collect()
+            if not slots:
+                continue
+
+            try:
+                depth = self._requests.qsize()
+            except NotImplementedError:  # macOS
+                depth = 0
+            self.queue_depth_hist[min(depth, self._num_workers)] += 1
+            self.batch_size_hist[len(slots)] += 1
+
+            compute_time = time.perf_counter()
+            self.wait_time += compute_time - start_time
+            self._actions[slots] = self.policy(self._obs[slots])
+            end_time = time.perf_counter()
+            self.compute_time += end_time - compute_time
+            if self.tracer is not None:
+                # `perf_counter` and `monotonic` differ only by their origin
+                offset = time.monotonic_ns() - int(end_time * 1e9)
+                collect, compute, end = (
+                    int(t * 1e9) + offset for t in (start_time, compute_time, end_time)
+                )
+                self.tracer.record("inference_collect", collect, compute)
+                self.tracer.record("inference_batch", compute, end)
+
+            for slot in slots:
+                self._ready[slot].release()
+
+    def stats(self):
+        """Returns the batch-size and queue-depth histograms and timings."""
+        batches = max(int(np.sum(self.batch_size_hist)), 1)
+        return {
+            "batches": int(np.sum(self.batch_size_hist)),
+            "mean_batch_size": float(
+                np.dot(np.arange(len(self.batch_size_hist)), self.batch_size_hist)
+                / batches
+            ),
+            "batch_size_hist": self.batch_size_hist.copy(),
+            "queue_depth_hist": self.queue_depth_hist.copy(),
+            "wait_time": self.wait_time,
+            "compute_time": self.compute_time,
+        }
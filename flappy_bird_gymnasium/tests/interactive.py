@@ -0,0 +1,133 @@
+""" Interactive play with low input latency.
+
+The :class:`InteractiveRunner` owns the pygame event queue: between two frames it
+keeps polling the input instead of sleeping in `Clock.tick`, timestamps every
+key press and applies the presses at the next simulation tick, so no flap is lost
+while a frame is being displayed. The delay between a key press and the display
+of the frame that applied it is measured for every flap.
+"""
+
+import time
+
+import gymnasium
+import numpy as np
+import pygame
+
+import flappy_bird_gymnasium
+
+FLAP_KEYS = (pygame.K_SPACE, pygame.K_UP)
+
+
+class InteractiveRunner:
+    """Plays an environment with the keyboard at a fixed frame rate.
+
+    Args:
+        env (gymnasium.Env): The environment, made with `render_mode="rgb_array"`
+            so that the runner controls the display and its timing.
+        fps (int): Number of simulation ticks per second.
+        poll_interval (float): Seconds between two polls of the input while
+            waiting for the next tick.
+    """
+
+    def __init__(self, env, fps=30, poll_interval=0.001):
+        if env.render_mode != "rgb_array":
+            raise ValueError("The runner needs an environment rendering RGB arrays!")
+
+        self.env = env
+        self.fps = fps
+        self.poll_interval = poll_interval
+        self.latencies = []
+        self.quit = False
+        self._presses = []  # timestamps of the presses since the last tick
+
+    def poll(self):
+        """Moves the pending events of pygame to the runner's queue."""
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.quit = True
+            elif event.type == pygame.KEYDOWN and event.key in FLAP_KEYS:
+                self._presses.append(time.perf_counter())
+
+    def _wait(self, deadline):
+        while True:
+            self.poll()
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0.0:
+                break
+            time.sleep(min(self.poll_interval, remaining))
+
+    def _display(self):
+        env = self.env.unwrapped
+        env._draw_surface(show_score=True, show_rays=env._use_lidar)
+        if env._display is None:
+            env._make_display()
+        env._update_display()
+
+    def run(self, max_steps=None, callback=None):
+        """Plays one episode.
+
+        Args:
+            max_steps (Optional[int]): Maximum number of steps.
+            callback (Optional[Callable]): Called after every step with the
+                observation, the action and the info dictionary.
+
+        Returns:
+            The info dictionary of the last step.
+        """
+        obs, info = self.env.reset()
+        self._display()
+
+        period = 1.0 / self.fps
+        deadline = time.perf_counter() + period
+        steps = 0
+        while not self.quit and (max_steps is None or steps < max_steps):
+            self._wait(deadline)
+            deadline = max(deadline + period, time.perf_counter())
+
+            # several presses within a tick give a single flap
+            presses, self._presses = self._presses, []
+            action = int(len(presses) > 0)
+
+            obs, _, terminated, truncated, info = self.env.step(action)
+            self._display()
+            if presses:
+                self.latencies.append(time.perf_counter() - presses[0])
+
+            steps += 1
+            if callback is not None:
+                callback(obs, action, info)
+            if terminated or truncated:
+                break
+        return info
+
+    def stats(self):
+        """Returns the percentiles of the input-to-frame latency in ms."""
+        if not self.latencies:
+            return {"flaps": 0}
+        latencies = 1000.0 * np.array(self.latencies)
+        return {
+            "flaps": len(latencies),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p99_ms": float(np.percentile(latencies, 99)),
+            "max_ms": float(np.max(latencies)),
+        }
+
+    def close(self):
+        self.env.close()
+
+
+def play(use_lidar=True, audio_on=True, fps=30):
+    env = gymnasium.make(
+        "FlappyBird-v0",
+        audio_on=audio_on,
+        render_mode="rgb_array",
+        use_lidar=use_lidar,
+    )
+    runner = InteractiveRunner(env, fps=fps)
+    info = runner.run()
+    runner.close()
+    print(f"Score: {info['score']}\nInput latency: {runner.stats()}")
+
+
+if __name__ == "__main__":
+    play()
@@ -0,0 +1,311 @@
+""" Experience replay buffers for training the DQN agents.
+"""
+
+import numpy as np
+
+from flappy_bird_gymnasium.envs.constants import LIDAR_MAX_DISTANCE
+
+
+class ReplayBuffer:
+    """Uniform experience replay backed by preallocated circular arrays.
+
+    Args:
+        capacity (int): Maximum number of stored transitions.
+        obs_shape (Tuple[int, ...]): Shape of a single observation.
+        obs_dtype: Data type of the stored observations.
+        seed (Optional[int]): Seed of the sampling generator.
+    """
+
+    def __init__(self, capacity, obs_shape, obs_dtype=np.float32, seed=None):
+        self.capacity = capacity
+        self.obs = np.zeros((capacity, *obs_shape), dtype=obs_dtype)
+        self.next_obs = np.zeros((capacity, *obs_shape), dtype=obs_dtype)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.float32)
+
+        self._rng = np.random.default_rng(seed)
+        self._pos = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add_batch(self, obs, actions, rewards, next_obs, dones):
+        """Stores a batch of transitions, overwriting the oldest ones.
+
+        Returns:
+            The indices of the stored transitions.
+        """
+        idx = (self._pos + np.arange(len(actions))) % self.capacity
+        self.obs[idx] = obs
+        self.actions[idx] = actions
+        self.rewards[idx] = rewards
+        self.next_obs[idx] = next_obs
+        self.dones[idx] = dones
+
+        self._pos = (self._pos + len(actions)) % self.capacity
+        self._size = min(self._size + len(actions), self.capacity)
+        return idx
+
+    def sample(self, batch_size):
+        """Returns a dictionary with a uniformly sampled batch of transitions."""
+        return self._get(self._rng.integers(0, self._size, size=batch_size))
+
+    def _get(self, idx):
+        return {
+            "obs": self.obs[idx],
+            "actions": self.actions[idx],
+            "rewards": self.rewards[idx],
+            "next_obs": self.next_obs[idx],
+            "dones": self.dones[idx],
+        }
+
+
+class SumTree:
+    """Array-backed binary tree of priorities with batched operations.
+
+    The leaves hold the priorities and every inner node the sum of its
+    children, so sampling proportionally to the priorities and updating them
+    costs O(log n). Both operations process whole batches level by level with
+    NumPy instead of walking the tree once per element.
+
+    Args:
+        capacity (int): Number of leaves.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._depth = max(int(np.ceil(np.log2(capacity))), 1)
+        self._offset = 1 << self._depth  # index of the first leaf
+        self.tree = np.zeros(2 * self._offset, dtype=np.float64)
+
+    @property
+    def total(self):
+        return self.tree[1]
+
+    def __getitem__(self, idx):
+        return self.tree[np.asarray(idx) + self._offset]
+
+    def update(self, idx, priorities):
+        """Sets the priorities of the leaves `idx` (the last duplicate wins)."""
+        nodes = np.asarray(idx, dtype=np.int64) + self._offset
+        self.tree[nodes] = priorities
+
+        nodes = np.unique(nodes)
+        for _ in range(self._depth):
+            nodes //= 2
+            nodes = nodes[np.concatenate([[True], nodes[1:] != nodes[:-1]])]
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values):
+        """Returns the leaves whose prefix-sum intervals contain `values`."""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self._depth):
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            # never descend into an empty subtree because of rounding errors
+            right = np.logical_and(values > left_sum, self.tree[left + 1] > 0.0)
+            values -= left_sum * right
+            nodes = left + right
+        return nodes - self._offset
+
+    def sample(self, batch_size, rng, stratified=True):
+        """Samples leaves proportionally to their priorities.
+
+        With `stratified` sampling the total priority is split into
+        `batch_size` equal segments and one leaf is drawn from each segment.
+        """
+        if stratified:
+            values = (np.arange(batch_size) + rng.random(batch_size)) / batch_size
+        else:
+            values = rng.random(batch_size)
+        return self.find(values * self.total)
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """Proportional prioritized experience replay (Schaul et al., 2016).
+
+    Args:
+        capacity (int): Maximum number of stored transitions.
+        obs_shape (Tuple[int, ...]): Shape of a single observation.
+        alpha (float): Priority exponent, zero gives uniform sampling.
+        eps (float): Added to the absolute TD errors.
+        obs_dtype: Data type of the stored observations.
+        seed (Optional[int]): Seed of the sampling generator.
+    """
+
+    def __init__(
+        self, capacity, obs_shape, alpha=0.6, eps=1e-6, obs_dtype=np.float32, seed=None
+    ):
+        super().__init__(capacity, obs_shape, obs_dtype=obs_dtype, seed=seed)
+        self.alpha = alpha
+        self.eps = eps
+        self.priorities = SumTree(capacity)
+        self._max_priority = 1.0
+
+    def add_batch(self, obs, actions, rewards, next_obs, dones):
+        idx = super().add_batch(obs, actions, rewards, next_obs, dones)
+        self.priorities.update(idx, np.full(len(idx), self._max_priority))
+        return idx
+
+    def sample(self, batch_size, beta=0.4, stratified=True):
+        """Returns a batch sampled proportionally to the priorities.
+
+        Next to the transitions, the batch contains their `indices`, needed by
+        :meth:`update_priorities`, and the importance-sampling `weights`
+        normalized by their maximum in the batch.
+        """
+        idx = self.priorities.sample(batch_size, self._rng, stratified=stratified)
+        probs = self.priorities[idx] / self.priorities.total
+        weights = (len(self) * probs) ** -beta
+
+        batch = self._get(idx)
+        batch["indices"] = idx
+        batch["weights"] = (weights / np.max(weights)).astype(np.float32)
+        return batch
+
+    def update_priorities(self, idx, td_errors):
+        """Updates the priorities of the sampled transitions from TD errors."""
+        priorities = (np.abs(td_errors) + self.eps) ** self.alpha
+        self._max_priority = max(self._max_priority, float(np.max(priorities)))
+        self.priorities.update(idx, priorities)
+
+
+class FrameReplayBuffer:
+    """Experience replay of frame stacks that stores every frame only once.
+
+    The frames of one stream of episodes are kept in a circular array and the
+    (k, *frame_shape) stacks are rebuilt from index arithmetic at sampling
+    time. Like :class:`flappy_bird_gymnasium.tests.framestack.FrameStack`, the
+    stacks of the first steps of an episode repeat its first frame. The frames
+    can be quantized to unsigned integers, since the LIDAR distances are
+    bounded by `LIDAR_MAX_DISTANCE` (or by 1.0 when normalized).
+
+    Vector environments need one buffer per sub-environment.
+
+    Args:
+        capacity (int): Maximum number of stored frames.
+        frame_shape (Tuple[int, ...]): Shape of a single frame.
+        k (int): Number of stacked frames.
+        dtype: Storage type, `np.uint8` and `np.uint16` quantize the frames.
+        max_value (float): Upper bound of the frames' values.
+        seed (Optional[int]): Seed of the sampling generator.
+    """
+
+    def __init__(
+        self,
+        capacity,
+        frame_shape,
+        k=16,
+        dtype=np.uint8,
+        max_value=LIDAR_MAX_DISTANCE,
+        seed=None,
+    ):
+        self.capacity = capacity
+        self.k = k
+        self.frames = np.zeros((capacity, *frame_shape), dtype=dtype)
+        self.actions = np.zeros(capacity, dtype=np.int64)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.dones = np.zeros(capacity, dtype=np.bool_)
+        self.first = np.zeros(capacity, dtype=np.bool_)
+        self.episode_start = np.zeros(capacity, dtype=np.int64)
+
+        if np.issubdtype(self.frames.dtype, np.integer):
+            self._scale = np.iinfo(self.frames.dtype).max / max_value
+        else:
+            self._scale = None
+
+        self._rng = np.random.default_rng(seed)
+        self._total = 0  # number of frames ever added
+        self._episode_start = 0
+
+    def __len__(self):
+        return min(self._total, self.capacity)
+
+    @property
+    def nbytes(self):
+        return sum(
+            a.nbytes
+            for a in (
+                self.frames,
+                self.actions,
+                self.rewards,
+                self.dones,
+                self.first,
+                self.episode_start,
+            )
+        )
+
+    def _add(self, frame, action, reward, done, first):
+        i = self._total % self.capacity
+        if self._scale is None:
+            self.frames[i] = frame
+        else:
+            self.frames[i] = np.clip(
+                np.rint(np.asarray(frame) * self._scale),
+                0,
+                np.iinfo(self.frames.dtype).max,
+            )
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.dones[i] = done
+        self.first[i] = first
+        self.episode_start[i] = self._episode_start
+        self._total += 1
+
+    def reset(self, frame):
+        """Starts a new episode with the frame returned by `env.reset`."""
+        self._episode_start = self._total
+        self._add(frame, 0, 0.0, False, True)
+
+    def add(self, action, reward, next_frame, terminated):
+        """Stores a step of the current episode."""
+        self._add(next_frame, action, reward, terminated, False)
+
+    def _stacks(self, idx):
+        offsets = np.arange(1 - self.k, 1)
+        stacks = np.maximum(
+            idx[:, np.newaxis] + offsets,
+            self.episode_start[idx % self.capacity][:, np.newaxis],
+        )
+        frames = self.frames[stacks % self.capacity]
+        if self._scale is None:
+            return frames.astype(np.float32)
+        return frames.astype(np.float32) * np.float32(1.0 / self._scale)
+
+    def _valid(self, idx):
+        oldest = max(self._total - self.capacity, 0)
+        start = np.maximum(idx - self.k + 1, self.episode_start[idx % self.capacity])
+        return np.logical_and(~self.first[(idx + 1) % self.capacity], start >= oldest)
+
+    def sample(self, batch_size):
+        """Returns a dictionary with a uniformly sampled batch of transitions."""
+        if self._total < 2:
+            raise ValueError("The replay buffer doesn't contain any transition!")
+
+        low = max(self._total - self.capacity, 0)
+        idx = np.empty(0, dtype=np.int64)
+        for _ in range(8):
+            candidates = self._rng.integers(low, self._total - 1, size=2 * batch_size)
+            idx = np.concatenate([idx, candidates[self._valid(candidates)]])
+            if len(idx) >= batch_size:
+                idx = idx[:batch_size]
+                break
+        else:
+            # few transitions are valid, draw among all of them
+            candidates = np.arange(low, self._total - 1)
+            candidates = candidates[self._valid(candidates)]
+            if len(candidates) == 0:
+                raise ValueError("The replay buffer doesn't contain any transition!")
+            idx = self._rng.choice(candidates, size=batch_size)
+
+        next_idx = (idx + 1) % self.capacity
+        return {
+            "obs": self._stacks(idx),
+            "actions": self.actions[next_idx],
+            "rewards": self.rewards[next_idx],
+            "next_obs": self._stacks(idx + 1),
+            "dones": self.dones[next_idx].astype(np.float32),
+        }
@@ -0,0 +1,20 @@
+""" Tests the benchmark suite and its comparison with a baseline.
+"""
+
+from flappy_bird_gymnasium.tests.benchmark import compare, run, spawn_benchmark
+
+
+def test_benchmark():
+    results = run(env_steps=20, batch_sizes=(1, 4), verbose=False)
+    assert len(results) == 16 + 2 + 2 * 2 * 2
+    assert all(r["steps_per_s"] > 0 and r["p99_us"] >= r["p50_us"] for r in results)
+
+    assert compare(results, results) == []
+    baseline = [dict(r, steps_per_s=2 * r["steps_per_s"]) for r in results]
+    assert len(compare(results, baseline, threshold=0.2)) == len(results)
+    assert compare(results, baseline[:1], threshold=0.6) == []
+
+
+def test_spawn_benchmark():
+    result = spawn_benchmark(num_workers=2, render_mode="rgb_array")
+    assert result["spin_up_s"] > 0 and 0 < result["pickle_bytes"] < 64 * 1024
@@ -0,0 +1,65 @@
+""" Tests the pixel-accurate collisions.
+"""
+
+import numpy as np
+import pygame
+
+from flappy_bird_gymnasium import FlappyBirdEnv, FlappyBirdMultiEnv
+from flappy_bird_gymnasium.envs import utils
+
+
+def test_pixel_collision():
+    hitmasks = utils.get_hitmasks()
+    image = utils.load_images(convert=False)["pipe"][0]
+    mask = pygame.mask.from_surface(image)
+    assert hitmasks.pipes[0].shape == image.get_size()
+    assert all(
+        hitmasks.pipes[0][x, y] == bool(mask.get_at((x, y)))
+        for x in range(image.get_width())
+        for y in range(image.get_height())
+    )
+
+    rng = np.random.default_rng(0)
+    pipe_rect = pygame.Rect(100, 50, *hitmasks.pipes[0].shape)
+    players = hitmasks.players[1, rng.integers(0, 111, size=200)]
+    xs = rng.integers(60, 160, size=200)
+    ys = rng.integers(10, 400, size=200)
+    batch = utils.pixel_collision_batch(xs, ys, players, pipe_rect, hitmasks.pipes[0])
+    for x, y, player, collide in zip(xs, ys, players, batch):
+        rect = pygame.Rect(x, y, hitmasks.size, hitmasks.size)
+        expected = any(
+            player[i, j] and hitmasks.pipes[0][x + i - 100, y + j - 50]
+            for i in range(hitmasks.size)
+            for j in range(hitmasks.size)
+            if pipe_rect.collidepoint(x + i, y + j)
+        )
+        assert collide == expected
+        assert (
+            utils.pixel_collision(rect, pipe_rect, player, hitmasks.pipes[0])
+            == expected
+        )
+    assert 0 < batch.sum() < len(batch)
+
+
+def test_pixel_collision_env():
+    rng = np.random.default_rng(1)
+    actions = (rng.random((300, 6)) < np.linspace(0.05, 0.12, 6)).astype(np.int64)
+
+    env = FlappyBirdMultiEnv(num_birds=6, use_lidar=False, pixel_collision=True)
+    env.reset(seed=3)
+    terminations = []
+    for action in actions:
+        _, _, terminated, _, info = env.step(action)
+        terminations.append(terminated)
+        if not info["alive"].any():
+            break
+
+    # the batched checks of the birds match the checks of single birds
+    for bird in range(6):
+        single_env = FlappyBirdEnv(use_lidar=False, pixel_collision=True)
+        single_env.reset(seed=3)
+        for t, action in enumerate(actions[:, bird]):
+            _, _, terminated, _, _ = single_env.step(action)
+            assert terminations[t][bird] == terminated
+            if terminated:
+                break
@@ -1,18 +1,68 @@
+import os
+
 import gymnasium
 import matplotlib.pyplot as plt
 import numpy as np
+import pytest
 
 import flappy_bird_gymnasium
 from flappy_bird_gymnasium.envs.utils import MODEL_PATH
-from flappy_bird_gymnasium.tests.dueling import DuelingDQN
-from flappy_bird_gymnasium.tests.dueling_v2 import DuelingDQN as DuelingDQN_v2
+from flappy_bird_gymnasium.tests.dueling_numpy import load_model
 from flappy_bird_gymnasium.tests.framestack import FrameStack
 
 plt.ion()
 
+# the LIDAR checkpoint isn't bundled with the package
+LIDAR_WEIGHTS = MODEL_PATH + "/LIDAR_AVG_16steps_15px"
+
+
+def _checkpoint(path):
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"The checkpoint {path} doesn't exist! Play without LIDAR (`use_lidar="
+            "False`, or without `--lidar`), or pass your own `weights_path`."
+        )
+    return path
+
+
+def load_q_model(env, use_lidar=True, backend="tf", weights_path=None):
+    """Loads the Q-network matching the environment's observations.
+
+    By default the bundled weights are loaded, `weights_path` selects another
+    checkpoint (`.npz` for the NumPy backend, Keras weights otherwise).
+    """
+    if backend == "numpy":
+        # TensorFlow-free inference with the weights converted to `.npz`
+        if weights_path is not None:
+            return load_model(_checkpoint(weights_path))
+        if use_lidar:
+            return load_model(_checkpoint(LIDAR_WEIGHTS + ".npz"))
+        return load_model(_checkpoint(MODEL_PATH + "/model.npz"))
+
+    from flappy_bird_gymnasium.tests.dueling import DuelingDQN
+    from flappy_bird_gymnasium.tests.dueling_v2 import DuelingDQN as DuelingDQN_v2
+
+    if use_lidar:
+        q_model = DuelingDQN_v2(int(env.action_space.n), 2, 128, 4, 6)
+        q_model(np.zeros((1, *env.observation_space.shape), dtype=np.float32))
+        q_model.load_weights(_checkpoint(weights_path or LIDAR_WEIGHTS + ".h5"))
+    else:
+        q_model = DuelingDQN(int(env.action_space.n))
+        q_model(np.zeros((1, *env.observation_space.shape), dtype=np.float32))
+        q_model.load_weights(_checkpoint(weights_path or MODEL_PATH + "/model.h5"))
+
+    q_model.summary()
+    return q_model
+
 
 def play(
-    epoch=500, audio_on=True, render_mode="human", use_lidar=True, score_limit=None
+    epoch=500,
+    audio_on=True,
+    render_mode="human",
+    use_lidar=True,
+    score_limit=None,
+    backend="tf",
+    weights_path=None,
 ):
     env = gymnasium.make(
         "FlappyBird-v0",
@@ -25,15 +75,9 @@ def play(
     # init models
     if use_lidar:
         env = FrameStack(env, 16)
-        q_model = DuelingDQN_v2(env.action_space.n, 2, 128, 4, 6)
-        q_model.build((None, *env.observation_space.shape))
-        q_model.load_weights(MODEL_PATH + "/LIDAR_AVG_16steps_15px.h5")
-    else:
-        q_model = DuelingDQN(env.action_space.n)
-        q_model.build((None, *env.observation_space.shape))
-        q_model.load_weights(MODEL_PATH + "/model.h5")
-
-    q_model.summary()
+    q_model = load_q_model(
+        env, use_lidar=use_lidar, backend=backend, weights_path=weights_path
+    )
 
     # if render_mode == "human" and use_lidar:
     #     similarity_scores = np.dot(
@@ -62,7 +106,7 @@ def play(
                 action, attn_matrix = q_model.get_action(state)
             else:
                 action = q_model.get_action(state)
-            action = np.array(action, copy=False, dtype=env.env.action_space.dtype)
+            action = np.asarray(action, dtype=env.env.action_space.dtype)
 
             # if render_mode == "human" and use_lidar:
             #     # plotting the attention matrix
@@ -90,8 +134,33 @@ def play(
 
 def test_play():
     play(epoch=1, audio_on=False, render_mode=None, use_lidar=False, score_limit=10)
+
+
+@pytest.mark.skipif(
+    not os.path.exists(LIDAR_WEIGHTS + ".h5"),
+    reason="The LIDAR checkpoint isn't bundled with the package.",
+)
+def test_play_lidar():
     play(epoch=1, audio_on=False, render_mode=None, use_lidar=True, score_limit=10)
 
 
+def test_play_numpy():
+    play(
+        epoch=1,
+        audio_on=False,
+        render_mode=None,
+        use_lidar=False,
+        score_limit=10,
+        backend="numpy",
+    )
+
+
+def test_missing_checkpoint():
+    env = FrameStack(gymnasium.make("FlappyBird-v0", use_lidar=True), 16)
+    with pytest.raises(FileNotFoundError, match="weights_path"):
+        load_q_model(env, backend="numpy", weights_path="missing.npz")
+    env.close()
+
+
 if __name__ == "__main__":
     play()
@@ -0,0 +1,90 @@
+""" Tests the NumPy inference of the Dueling DQN models against TensorFlow."""
+
+import numpy as np
+import pytest
+
+from flappy_bird_gymnasium.envs.utils import MODEL_PATH
+from flappy_bird_gymnasium.tests import dueling_numpy
+
+
+def test_dueling():
+    pytest.importorskip("tensorflow")
+    from flappy_bird_gymnasium.tests.dueling import DuelingDQN
+
+    q_model = DuelingDQN(2)
+    q_model(np.zeros((1, 12), dtype=np.float32))
+    q_model.load_weights(MODEL_PATH + "/model.h5")
+
+    np_model = dueling_numpy.load_model(MODEL_PATH + "/model.npz")
+    assert isinstance(np_model, dueling_numpy.DuelingDQN)
+
+    state = np.random.default_rng(0).normal(size=(32, 12)).astype(np.float32)
+    np.testing.assert_allclose(np_model(state), q_model(state), rtol=1e-4, atol=1e-3)
+
+
+def test_dueling_v2():
+    pytest.importorskip("tensorflow")
+    from flappy_bird_gymnasium.tests.dueling_v2 import DuelingDQN
+
+    q_model = DuelingDQN(2, 2, 32, 4, 3)
+    q_model(np.zeros((1, 16, 180), dtype=np.float32))
+    rng = np.random.default_rng(0)
+    for w in q_model.weights:
+        w.assign(rng.normal(scale=0.1, size=w.shape).astype(np.float32))
+
+    np_model = dueling_numpy.DuelingDQNv2(
+        dueling_numpy.layers_to_weights(dueling_numpy.keras_layers(q_model))
+    )
+    assert np_model.num_layers == 2 and np_model.num_heads == 3
+
+    state = rng.uniform(size=(8, 16, 180)).astype(np.float32)
+    y, attn_matrix = q_model(state, training=False)
+    np_y, np_attn_matrix = np_model(state)
+    np.testing.assert_allclose(np_y, y, rtol=1e-4, atol=1e-5)
+    np.testing.assert_allclose(np_attn_matrix, attn_matrix, atol=1e-5)
+
+
+def test_incremental_dueling_v2():
+    rng = np.random.default_rng(0)
+    num_envs, k, embed_dim, num_heads = 3, 4, 8, 2
+
+    def normal(*shape):
+        return rng.normal(scale=0.1, size=shape)
+
+    weights = {
+        "pos_embs/position": normal(1, k, embed_dim),
+        "pos_embs/projection/kernel": normal(180, embed_dim),
+        "pos_embs/projection/bias": normal(embed_dim),
+        "V/kernel": normal(embed_dim, 1),
+        "V/bias": normal(1),
+        "A/kernel": normal(embed_dim, 2),
+        "A/bias": normal(2),
+    }
+    encoder_shapes = {
+        "mha/attention_output/kernel": (num_heads, embed_dim, embed_dim),
+        "mha/attention_output/bias": (embed_dim,),
+        "dense_0/kernel": (embed_dim, 2 * embed_dim),
+        "dense_0/bias": (2 * embed_dim,),
+        "dense_1/kernel": (2 * embed_dim, embed_dim),
+        "dense_1/bias": (embed_dim,),
+    }
+    for name in ("query", "key", "value"):
+        encoder_shapes[f"mha/{name}/kernel"] = (embed_dim, num_heads, embed_dim)
+        encoder_shapes[f"mha/{name}/bias"] = (num_heads, embed_dim)
+    for key in dueling_numpy._ENCODER_KEYS:
+        weights["e_layers/0/" + key] = normal(*encoder_shapes.get(key, (embed_dim,)))
+
+    model = dueling_numpy.DuelingDQNv2(weights)
+    incremental = dueling_numpy.IncrementalDuelingDQNv2(model, num_envs)
+
+    frames = rng.uniform(size=(num_envs, 180))
+    stacks = np.repeat(frames[:, np.newaxis], k, axis=1)
+    incremental.reset(frames)
+    for t in range(10):
+        frames = rng.uniform(size=(num_envs, 180))
+        reset_mask = np.array([t == 5, False, t % 3 == 0])
+        stacks = np.concatenate([stacks[:, 1:], frames[:, np.newaxis]], axis=1)
+        stacks[reset_mask] = frames[reset_mask, np.newaxis]
+
+        y, _ = incremental(frames, reset_mask)
+        np.testing.assert_allclose(y, model(stacks)[0], rtol=1e-4, atol=1e-6)
@@ -0,0 +1,174 @@
+""" Batched evaluation of trained agents over many seeded episodes.
+
+The environments are stepped in lockstep and the policy is called once per step
+on the stacked observations of all the running episodes. A finished environment
+is reset with the next seed, or dropped from the batch once every seed has been
+started.
+"""
+
+import time
+
+import gymnasium
+import numpy as np
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.tests.framestack import FrameStack
+
+
+def greedy_policy(q_model):
+    """Returns a batched greedy policy for a NumPy or TensorFlow Q-network."""
+
+    def policy(states):
+        y = q_model(states)
+        if isinstance(y, tuple):
+            y = y[0]  # the transformer also returns the attention scores
+        return np.argmax(np.asarray(y), axis=-1)
+
+    return policy
+
+
+def evaluate(policy, make_env, num_episodes=500, num_envs=32, seed=0):
+    """Evaluates a policy on `num_episodes` episodes seeded `seed`, `seed + 1`...
+
+    Args:
+        policy (Callable[[np.ndarray], np.ndarray]): Maps a batch of
+            observations to a batch of actions.
+        make_env (Callable[[], gymnasium.Env]): Creates one environment.
+        num_episodes (int): Number of evaluated episodes.
+        num_envs (int): Number of environments stepped in lockstep.
+        seed (int): Seed of the first episode.
+
+    Returns:
+        A dictionary with the per-episode `seeds`, `scores` and `lengths`
+        (ordered by seed), the total number of `steps` and policy `calls`, and
+        the wall-clock `time` in seconds.
+    """
+    seeds = np.arange(seed, seed + num_episodes)
+    scores = np.zeros(num_episodes, dtype=np.int64)
+    lengths = np.zeros(num_episodes, dtype=np.int64)
+
+    envs = [make_env() for _ in range(min(num_envs, num_episodes))]
+    episode = [None] * len(envs)
+    obs = [None] * len(envs)
+    next_episode = 0
+    steps, calls = 0, 0
+
+    start_time = time.perf_counter()
+
+    for i, env in enumerate(envs):
+        episode[i] = next_episode
+        obs[i], _ = env.reset(seed=int(seeds[next_episode]))
+        next_episode += 1
+
+    active = list(range(len(envs)))
+    while active:
+        actions = policy(np.stack([obs[i] for i in active], axis=0))
+        calls += 1
+
+        running = []
+        for i, action in zip(active, actions):
+            obs[i], _, terminated, truncated, info = envs[i].step(action)
+            lengths[episode[i]] += 1
+            steps += 1
+
+            if terminated or truncated:
+                scores[episode[i]] = info["score"]
+                if next_episode == num_episodes:
+                    continue  # drop the environment from the batch
+                episode[i] = next_episode
+                obs[i], _ = envs[i].reset(seed=int(seeds[next_episode]))
+                next_episode += 1
+            running.append(i)
+        active = running
+
+    elapsed_time = time.perf_counter() - start_time
+
+    for env in envs:
+        env.close()
+
+    return {
+        "seeds": seeds,
+        "scores": scores,
+        "lengths": lengths,
+        "steps": steps,
+        "calls": calls,
+        "time": elapsed_time,
+    }
+
+
+def summarize(results):
+    """Returns the score and length distributions and the throughput."""
+    summary = {}
+    for key in ("scores", "lengths"):
+        values = results[key]
+        summary[key] = {
+            "mean": float(np.mean(values)),
+            "std": float(np.std(values)),
+            "min": int(np.min(values)),
+            "p50": float(np.percentile(values, 50)),
+            "p90": float(np.percentile(values, 90)),
+            "p99": float(np.percentile(values, 99)),
+            "max": int(np.max(values)),
+        }
+    summary["episodes"] = len(results["scores"])
+    summary["steps_per_sec"] = results["steps"] / results["time"]
+    summary["episodes_per_sec"] = len(results["scores"]) / results["time"]
+    summary["mean_batch_size"] = results["steps"] / results["calls"]
+    return summary
+
+
+def play(episodes=500, num_envs=32, use_lidar=False, score_limit=1000, backend="tf"):
+    from flappy_bird_gymnasium.tests.test_dqn import load_q_model
+
+    def make_env():
+        env = gymnasium.make(
+            "FlappyBird-v0",
+            audio_on=False,
+            render_mode=None,
+            use_lidar=use_lidar,
+            score_limit=score_limit,
+        )
+        if use_lidar:
+            env = FrameStack(env, 16)
+        return env
+
+    env = make_env()
+    q_model = load_q_model(env, use_lidar=use_lidar, backend=backend)
+    env.close()
+
+    results = evaluate(
+        greedy_policy(q_model), make_env, num_episodes=episodes, num_envs=num_envs
+    )
+    summary = summarize(results)
+
+    for key in ("scores", "lengths"):
+        print(
+            f"{key.capitalize()}: "
+            + ", ".join(f"{k}={v:.2f}" for k, v in summary[key].items())
+        )
+    print(
+        f"Episodes: {summary['episodes']}, "
+        f"Steps/sec: {summary['steps_per_sec']:.0f}, "
+        f"Episodes/sec: {summary['episodes_per_sec']:.2f}, "
+        f"Mean batch size: {summary['mean_batch_size']:.1f}"
+    )
+    return summary
+
+
+def test_evaluate():
+    def make_env():
+        return gymnasium.make("FlappyBird-v0", use_lidar=False)
+
+    def policy(states):
+        return np.zeros(len(states), dtype=np.int64)  # never flap
+
+    results = evaluate(policy, make_env, num_episodes=7, num_envs=3, seed=5)
+    assert np.array_equal(results["seeds"], np.arange(5, 12))
+    assert np.all(results["lengths"] > 0)
+    assert results["steps"] == np.sum(results["lengths"])
+    assert results["calls"] < results["steps"]
+    assert summarize(results)["scores"]["max"] == 0
+
+
+if __name__ == "__main__":
+    play()
@@ -0,0 +1,39 @@
+""" Tests the vector frame stacking against a per-environment reference.
+"""
+
+from collections import deque
+
+import gymnasium
+import numpy as np
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.tests.framestack import VectorFrameStack
+
+
+def test_vector_frame_stack():
+    num_envs, k = 4, 3
+    envs = gymnasium.vector.SyncVectorEnv(
+        [
+            lambda: gymnasium.make("FlappyBird-v0", use_lidar=False)
+            for _ in range(num_envs)
+        ]
+    )
+    envs = VectorFrameStack(envs, k)
+    envs.action_space.seed(0)
+
+    obs, _ = envs.reset(seed=0)
+    frames = [deque([o] * k, maxlen=k) for o in obs[:, -1]]
+    autoreset = np.zeros(num_envs, dtype=np.bool_)
+    assert obs.shape == envs.observation_space.shape
+
+    for _ in range(300):
+        obs, _, terminated, truncated, _ = envs.step(envs.action_space.sample())
+        for i in range(num_envs):
+            if autoreset[i]:
+                frames[i].extend([obs[i, -1]] * k)
+            else:
+                frames[i].append(obs[i, -1])
+            assert np.array_equal(obs[i], np.stack(frames[i]))
+        autoreset = np.logical_or(terminated, truncated)
+
+    envs.close()
@@ -30,46 +30,31 @@ import gymnasium
 import matplotlib.animation as animation
 import matplotlib.pyplot as plt
 import numpy as np
-import pygame
 
 import flappy_bird_gymnasium
+from flappy_bird_gymnasium.tests.interactive import InteractiveRunner
 
 
 def play(use_lidar=True):
     env = gymnasium.make(
-        "FlappyBird-v0", audio_on=True, render_mode="human", use_lidar=use_lidar
+        "FlappyBird-v0", audio_on=True, render_mode="rgb_array", use_lidar=use_lidar
     )
+    runner = InteractiveRunner(env)
 
-    steps = 0
     video_buffer = []
 
-    obs = env.reset()
-    while True:
-        # Getting action:
-        action = 0
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-            if event.type == pygame.KEYDOWN and (
-                event.key == pygame.K_SPACE or event.key == pygame.K_UP
-            ):
-                action = 1
-
-        # Processing:
-        obs, _, done, _, info = env.step(action)
+    def callback(obs, action, info):
         video_buffer.append(obs)
-
-        steps += 1
         print(
             f"Obs: {obs}\n"
             f"Action: {action}\n"
-            f"Score: {info['score']}\n Steps: {steps}\n"
+            f"Score: {info['score']}\n Steps: {len(video_buffer)}\n"
         )
 
-        if done:
-            break
-
-    env.close()
+    runner.run(callback=callback)
+    runner.close()
+    print(f"Input latency: {runner.stats()}")
+    steps = len(video_buffer)
 
     if use_lidar:
         fig = plt.figure(figsize=(6, 6))
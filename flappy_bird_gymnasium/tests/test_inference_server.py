@@ -0,0 +1,110 @@
+""" Tests the micro-batching inference server with Dueling DQN workers.
+"""
+
+import glob
+import multiprocessing as mp
+import os
+import time
+
+import gymnasium
+import numpy as np
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.envs.tracing import Tracer, TracingWrapper, merge_traces
+from flappy_bird_gymnasium.envs.utils import MODEL_PATH
+from flappy_bird_gymnasium.tests.dueling_numpy import load_model
+from flappy_bird_gymnasium.tests.inference_server import InferenceServer
+from flappy_bird_gymnasium.tests.test_evaluation import greedy_policy
+
+
+def _worker(client, episodes, seed, score_limit, scores, trace_dir=None):
+    env = gymnasium.make("FlappyBird-v0", use_lidar=False, score_limit=score_limit)
+    if trace_dir is not None:
+        env = TracingWrapper(env, directory=trace_dir)
+        client.tracer = env.tracer
+    for t in range(episodes):
+        obs, _ = env.reset(seed=seed + t)
+        while True:
+            obs, _, done, truncated, info = env.step(client.get_action(obs))
+            if done or truncated:
+                break
+        scores.put(info["score"])
+    env.close()
+    client.close()
+
+
+def play(
+    num_workers=8,
+    episodes=4,
+    max_batch_size=8,
+    max_wait=0.002,
+    score_limit=100,
+    context=None,
+    trace_dir=None,
+):
+    tracer = None if trace_dir is None else Tracer(label="inference server")
+    server = InferenceServer(
+        greedy_policy(load_model(MODEL_PATH + "/model.npz")),
+        obs_shape=(12,),
+        num_workers=num_workers,
+        max_batch_size=max_batch_size,
+        max_wait=max_wait,
+        context=context,
+        tracer=tracer,
+    )
+    server.start()
+
+    ctx = mp.get_context(context)
+    scores = ctx.Queue()
+    workers = [
+        ctx.Process(
+            target=_worker,
+            args=(
+                server.client(i),
+                episodes,
+                1000 * i,
+                score_limit,
+                scores,
+                trace_dir,
+            ),
+        )
+        for i in range(num_workers)
+    ]
+    start_time = time.perf_counter()
+    for w in workers:
+        w.start()
+    scores = [scores.get() for _ in range(num_workers * episodes)]
+    for w in workers:
+        w.join()
+    elapsed_time = time.perf_counter() - start_time
+
+    stats = server.stats()
+    server.close()
+
+    if trace_dir is not None:
+        tracer.save(os.path.join(trace_dir, "trace_server.npz"))
+        merge_traces(
+            glob.glob(os.path.join(trace_dir, "*.npz")),
+            os.path.join(trace_dir, "trace.json"),
+        )
+
+    requests = stats["batches"] * stats["mean_batch_size"]
+    print(f"Scores: {scores}")
+    print(
+        f"Requests/sec: {requests / elapsed_time:.0f}, "
+        f"Mean batch size: {stats['mean_batch_size']:.2f}"
+    )
+    print(f"Batch size histogram: {stats['batch_size_hist']}")
+    print(f"Queue depth histogram: {stats['queue_depth_hist']}")
+    return scores, stats
+
+
+def test_play():
+    scores, stats = play(num_workers=3, episodes=1, max_batch_size=4, score_limit=10)
+    assert len(scores) == 3
+    assert all(score > 0 for score in scores)
+    assert stats["batches"] > 0
+
+
+if __name__ == "__main__":
+    play()
@@ -0,0 +1,35 @@
+""" Tests the interactive runner with synthetic key presses.
+"""
+
+import gymnasium
+import pygame
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.tests.interactive import InteractiveRunner
+
+
+def test_interactive_runner(monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+
+    env = gymnasium.make(
+        "FlappyBird-v0", audio_on=False, render_mode="rgb_array", use_lidar=False
+    )
+    runner = InteractiveRunner(env, fps=200)
+    actions = []
+
+    def callback(obs, action, info):
+        actions.append(action)
+        if len(actions) % 5 == 0:
+            # two presses before the next tick give a single flap
+            for _ in range(2):
+                pygame.event.post(
+                    pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE)
+                )
+
+    runner.run(max_steps=30, callback=callback)
+    runner.close()
+
+    flaps = [i for i, action in enumerate(actions) if action == 1]
+    assert flaps == list(range(5, len(actions), 5))
+    assert runner.stats()["flaps"] == len(flaps)
+    assert runner.stats()["max_ms"] < 1000.0 / 200 + 50.0
@@ -0,0 +1,69 @@
+""" Tests watching many environments in a single window.
+"""
+
+import gymnasium
+import numpy as np
+import pygame
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.envs.monitor import CRASH_COLOR, TiledMonitor, VectorMonitor
+
+
+def test_tiled_monitor():
+    envs = [gymnasium.make("FlappyBird-v0", use_lidar=False) for _ in range(5)]
+    for i, env in enumerate(envs):
+        env.reset(seed=i)
+    states = np.stack([env.unwrapped._pack_state() for env in envs])
+
+    monitor = TiledMonitor(5, scale=0.25, columns=3, headless=True)
+    assert monitor.surface.get_size() == (3 * 72, 2 * 128)
+    monitor.draw(states, crashed=np.array([False, True, False, False, False]))
+
+    frame = pygame.surfarray.array3d(monitor.surface)
+    # the border of the second tile is red, the first one isn't
+    assert tuple(frame[72, 64]) == CRASH_COLOR
+    assert tuple(frame[0, 64]) != CRASH_COLOR
+    monitor.close()
+
+
+def test_vector_monitor(monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+
+    envs = VectorMonitor(
+        gymnasium.make_vec("FlappyBird-v0", num_envs=8, use_lidar=False), fps=1
+    )
+    envs.reset(seed=0)
+    for _ in range(50):
+        envs.step(envs.action_space.sample())
+    # the frames are throttled independently of the steps
+    assert envs.monitor.frames == 1
+    envs.close()
+
+
+def test_vector_monitor_crashes(monkeypatch):
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+
+    envs = VectorMonitor(
+        gymnasium.make_vec("FlappyBird-v0", num_envs=4, use_lidar=False), fps=1e-3
+    )
+    envs.reset(seed=0)
+    drawn = []
+    monkeypatch.setattr(
+        envs.monitor, "draw", lambda states, crashed: drawn.append(crashed.copy())
+    )
+
+    # the birds crash between two frames
+    crashed = np.zeros(4, dtype=np.bool_)
+    while not crashed.all():
+        _, _, terminated, _, _ = envs.step(np.zeros(4, dtype=np.int64))
+        crashed |= terminated
+    assert len(drawn) == 0
+
+    # the next frame frames them, the one after doesn't
+    envs.monitor._last_frame = -np.inf
+    envs.step(np.zeros(4, dtype=np.int64))
+    assert drawn[-1].all()
+    envs.monitor._last_frame = -np.inf
+    envs.step(np.zeros(4, dtype=np.int64))
+    assert not drawn[-1].any()
+    envs.close()
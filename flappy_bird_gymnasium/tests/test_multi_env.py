@@ -0,0 +1,59 @@
+""" Tests the environment with several birds in the same world.
+"""
+
+import gymnasium
+import numpy as np
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium import FlappyBirdEnv
+
+
+def play(use_lidar, actions, seed=0):
+    env = gymnasium.make(
+        "FlappyBirdMulti-v0", num_birds=actions.shape[1], use_lidar=use_lidar
+    )
+    obs, _ = env.reset(seed=seed)
+    steps = [(obs, None, None, None)]
+    for action in actions:
+        obs, reward, terminated, _, info = env.step(action)
+        steps.append((obs, reward, terminated, info["alive"]))
+        if not info["alive"].any():
+            break
+    env.close()
+    return steps
+
+
+def test_multi_env():
+    rng = np.random.default_rng(0)
+    actions = (rng.random((500, 4)) < [0.05, 0.08, 0.1, 0.12]).astype(np.int64)
+
+    for use_lidar in (False, True):
+        steps = play(use_lidar, actions)
+        assert not steps[-1][3].any()
+
+        # every bird flies like in its own environment
+        for bird in range(4):
+            env = FlappyBirdEnv(use_lidar=use_lidar)
+            obs, _ = env.reset(seed=0)
+            errors = [np.abs(obs - steps[0][0][bird])]
+            for t, action in enumerate(actions[:, bird]):
+                obs, reward, terminated, _, _ = env.step(action)
+                multi_obs, multi_reward, multi_terminated, _ = steps[t + 1]
+                errors.append(np.abs(obs - multi_obs[bird]))
+                assert multi_terminated[bird] == terminated
+                if not use_lidar:
+                    assert multi_reward[bird] == reward
+                if terminated:
+                    break
+            errors = np.concatenate(errors)
+            if use_lidar:
+                # a few rays grazing the corners of the pipes may differ
+                assert np.mean(errors < 0.01) > 0.99
+            else:
+                assert np.all(errors == 0)
+
+            # the dead bird is frozen
+            death, after = t + 1, t + 2
+            for multi_obs, multi_reward, multi_terminated, _ in steps[after:]:
+                assert np.array_equal(multi_obs[bird], steps[death][0][bird])
+                assert multi_reward[bird] == 0 and multi_terminated[bird]
@@ -0,0 +1,81 @@
+""" Tests the physics parameters changed when resetting the environments.
+"""
+
+import gymnasium
+import numpy as np
+import pytest
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium import FlappyBirdEnv, FlappyBirdMultiEnv
+from flappy_bird_gymnasium.envs.constants import PIPE_WIDTH, PLAYER_WIDTH
+
+
+def fall(env, steps=10):
+    env.step(0)
+    return [env.step(0)[0][9] for _ in range(steps)]
+
+
+def test_physics():
+    env = FlappyBirdEnv(use_lidar=False, normalize_obs=False)
+    env.reset(seed=0)
+    default = fall(env)
+    env.reset(seed=0, options={"player_acc_y": 2})
+    assert fall(env) > default
+    # the parameters are kept by the next episodes
+    env.reset(seed=0)
+    assert env.physics["player_acc_y"] == 2
+    with pytest.raises(ValueError):
+        env.physics = {"gravity": 1}
+    # the pipes must move to the left, and the gaps be open
+    for options in ({"pipe_vel_x": 4}, {"pipe_gap": 0}, {"player_acc_y": [1, 2]}):
+        with pytest.raises(ValueError):
+            env.reset(options={"player_acc_y": 3, **options})
+        assert env.physics["player_acc_y"] == 2
+
+    # every pipe is scored once, whatever its speed
+    env.reset(seed=0, options={"pipe_vel_x": -7, "player_acc_y": 1})
+    player_mid_pos = env._player_x + PLAYER_WIDTH / 2
+    passed = 0
+    for _ in range(300):
+        before = [pipe["x"] + PIPE_WIDTH / 2 for pipe in env._upper_pipes]
+        _, _, _, _, info = env.step(0)
+        after = [pipe["x"] + PIPE_WIDTH / 2 for pipe in env._upper_pipes]
+        passed += sum(a < player_mid_pos <= b for a, b in zip(after, before))
+    assert info["score"] == passed > 0
+
+
+def test_vector_physics():
+    gravity = [0.5, 1.0, 1.5, 2.0]
+    envs = gymnasium.make_vec(
+        "FlappyBird-v0",
+        num_envs=4,
+        vectorization_mode="sync",
+        use_lidar=False,
+        normalize_obs=False,
+    )
+    envs.set_attr("physics", [{"player_acc_y": g} for g in gravity])
+    envs.reset(seed=0)
+    for _ in range(10):
+        obs, *_ = envs.step(np.zeros(4, dtype=np.int64))
+    assert np.all(np.diff(obs[:, 9]) > 0)
+    # the options of `reset` are the same for all the sub-environments
+    with pytest.raises(ValueError, match="set_attr"):
+        envs.reset(options={"player_acc_y": np.array(gravity)})
+    envs.close()
+
+    # the birds of a multi-bird world fly like in their own environments
+    env = FlappyBirdMultiEnv(num_birds=4, use_lidar=False)
+    obs, _ = env.reset(seed=0, options={"player_acc_y": gravity, "pipe_gap": 120})
+    actions = np.random.default_rng(0).random((40, 4)) < 0.1
+    observations = [obs] + [env.step(action)[0] for action in actions]
+    for bird, g in enumerate(gravity):
+        single_env = FlappyBirdEnv(use_lidar=False)
+        obs, _ = single_env.reset(seed=0, options={"player_acc_y": g, "pipe_gap": 120})
+        single = [obs] + [single_env.step(a)[0] for a in actions[:, bird]]
+        assert np.array_equal(np.array(single), np.array(observations)[:, bird])
+
+    # the pipes are shared by the birds
+    with pytest.raises(ValueError):
+        env.reset(options={"pipe_vel_x": [-4, -5, -6, -7]})
+    with pytest.raises(ValueError):
+        env.reset(options={"pipe_vel_x": 2})
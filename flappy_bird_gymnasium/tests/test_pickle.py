@@ -0,0 +1,40 @@
+""" Tests the serialization of the environments.
+"""
+
+import pickle
+
+import numpy as np
+
+from flappy_bird_gymnasium import FlappyBirdEnv, FlappyBirdMultiEnv
+
+
+def test_pickle():
+    for kwargs in (
+        {"render_mode": "rgb_array"},
+        {"use_lidar": False, "debug": True, "profile": True},
+    ):
+        env = FlappyBirdEnv(**kwargs)
+        env.reset(seed=0)
+        for t in range(20):
+            env.step(t % 5 == 0)
+
+        copy = pickle.loads(pickle.dumps(env))
+        assert copy._surface is None
+        for t in range(30):
+            result, copy_result = env.step(t % 4 == 0), copy.step(t % 4 == 0)
+            assert np.array_equal(result[0], copy_result[0])
+            assert result[1:] == copy_result[1:]
+            if env.render_mode is not None:
+                # the render resources are loaded again
+                assert np.array_equal(env.render(), copy.render())
+        if env.telemetry is not None:
+            assert copy.telemetry.recorded == 30
+            assert copy.profile.counts[0] == 50
+
+    env = FlappyBirdMultiEnv(num_birds=4, render_mode="rgb_array")
+    env.reset(seed=0)
+    env.render()
+    copy = pickle.loads(pickle.dumps(env))
+    actions = np.array([0, 1, 0, 1])
+    assert np.array_equal(env.step(actions)[0], copy.step(actions)[0])
+    assert np.array_equal(env.render(), copy.render())
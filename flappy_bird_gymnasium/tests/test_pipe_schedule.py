@@ -0,0 +1,57 @@
+""" Tests the schedules of the pipes' gaps and the benchmark tracks.
+"""
+
+import gymnasium
+import numpy as np
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.envs.constants import PIPE_HEIGHT
+from flappy_bird_gymnasium.envs.pipe_schedule import GAP_YS, create_track, load_track
+
+
+def gaps(env, seed=None, options=None, steps=300):
+    """Returns the gap indices of the pipes of an episode."""
+    env.reset(seed=seed, options=options)
+    unwrapped = env.unwrapped
+    offset = int(unwrapped._ground["y"] * 0.2) - PIPE_HEIGHT
+    seen = [GAP_YS.index(pipe["y"] - offset) for pipe in unwrapped._upper_pipes]
+    for _ in range(steps):
+        xs = [pipe["x"] for pipe in unwrapped._upper_pipes]
+        env.step(0)
+        for pipe, x in zip(unwrapped._upper_pipes, xs):
+            if pipe["x"] > x:
+                seen.append(GAP_YS.index(pipe["y"] - offset))
+    return seen
+
+
+def test_random_schedule():
+    env = gymnasium.make("FlappyBird-v0", use_lidar=False)
+    first = gaps(env, seed=0)
+    assert gaps(env, seed=0) == first
+    assert gaps(env) != first
+    assert len(set(first)) > 1
+    env.close()
+
+
+def test_track(tmp_path):
+    path = str(tmp_path / "track.npy")
+    create_track(path, num_seeds=10, length=5, seed=0)
+    track = load_track(path)
+    assert load_track(path) is track
+    assert track.shape == (10, 5)
+
+    env = gymnasium.make("FlappyBird-v0", use_lidar=False, track=path)
+    seen = gaps(env, seed=3, steps=200)
+    assert len(seen) > 5
+    # the row is repeated when the episode outlasts it
+    assert seen == np.resize(track[3], len(seen)).tolist()
+    assert gaps(env, seed=13, steps=200) == seen
+
+    # the track can be switched off and on when resetting
+    env = gymnasium.make("FlappyBird-v0", use_lidar=False)
+    assert gaps(env, seed=3, options={"track": path}, steps=200) == seen
+    assert gaps(env, seed=3, options={"track": None}, steps=200) != seen
+
+    multi_env = gymnasium.make("FlappyBirdMulti-v0", num_birds=2, track=path)
+    multi_env.reset(seed=3)
+    assert multi_env.unwrapped._gaps.next() == track[3][3]
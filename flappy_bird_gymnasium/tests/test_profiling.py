@@ -0,0 +1,39 @@
+""" Tests the timing of the phases of the environment's step.
+"""
+
+import numpy as np
+
+from flappy_bird_gymnasium import FlappyBirdEnv
+from flappy_bird_gymnasium.envs.profiling import PHASES
+
+
+def play(env):
+    observations = [env.reset(seed=0)[0]]
+    for t in range(1000):
+        obs, _, terminated, _, info = env.step(t % 7 == 0)
+        env.render()
+        observations.append(obs)
+        if terminated:
+            return np.array(observations), info
+
+
+def test_profiling():
+    env = FlappyBirdEnv(use_lidar=False, render_mode="rgb_array")
+    assert env.profile is None and "step" not in vars(env)
+    expected, info = play(env)
+    assert "profile" not in info
+
+    env = FlappyBirdEnv(use_lidar=False, render_mode="rgb_array", profile="episode")
+    observations, info = play(env)
+    np.testing.assert_array_equal(observations, expected)
+
+    steps = len(observations) - 1
+    summary = env.profile.summary()
+    assert set(summary) == set(PHASES)
+    assert all(summary[phase]["count"] == steps for phase in PHASES)
+    assert summary["render"]["p99_us"] >= summary["render"]["p50_us"] > 0.0
+    assert info["profile"]["physics"]["count"] == steps
+
+    # the summary in `info` covers only the last episode
+    _, info = play(env)
+    assert info["profile"]["physics"]["count"] < env.profile.counts[2]
@@ -0,0 +1,130 @@
+""" Tests the experience replay buffers.
+"""
+
+from collections import deque
+
+import numpy as np
+import pytest
+
+from flappy_bird_gymnasium.envs.constants import LIDAR_MAX_DISTANCE
+from flappy_bird_gymnasium.tests.replay import (
+    FrameReplayBuffer,
+    PrioritizedReplayBuffer,
+    SumTree,
+)
+
+
+def test_frame_replay_buffer():
+    k = 4
+    replay = FrameReplayBuffer(50, (3,), k=k, dtype=np.float32, seed=0)
+    rng = np.random.default_rng(0)
+
+    # every frame is filled with its global index
+    stacks, transitions = {}, {}
+    t = 0
+    for length in (3, 1, 20, 7, 30, 12):
+        frames = deque([np.full(3, t, dtype=np.float32)] * k, maxlen=k)
+        stacks[t] = np.stack(frames)
+        replay.reset(frames[-1])
+        for step in range(length):
+            t += 1
+            action, reward = rng.integers(0, 2), rng.normal()
+            frames.append(np.full(3, t, dtype=np.float32))
+            stacks[t] = np.stack(frames)
+            transitions[t - 1] = (action, reward, step == length - 1)
+            replay.add(action, reward, frames[-1], step == length - 1)
+        t += 1
+
+    batch = replay.sample(256)
+    for i in range(256):
+        idx = int(batch["obs"][i, -1, 0])
+        assert idx >= t - 50
+        np.testing.assert_array_equal(batch["obs"][i], stacks[idx])
+        np.testing.assert_array_equal(batch["next_obs"][i], stacks[idx + 1])
+        action, reward, done = transitions[idx]
+        assert batch["actions"][i] == action
+        assert np.isclose(batch["rewards"][i], reward)
+        assert batch["dones"][i] == done
+
+
+def test_frame_replay_buffer_without_transitions():
+    replay = FrameReplayBuffer(8, (3,), k=4, dtype=np.float32, seed=0)
+    for t in range(20):
+        replay.reset(np.full(3, t, dtype=np.float32))
+    with pytest.raises(ValueError):
+        replay.sample(4)
+
+    # a single valid transition left after wrapping
+    replay.add(1, 1.0, np.full(3, 20, dtype=np.float32), True)
+    batch = replay.sample(4)
+    assert np.all(batch["next_obs"][:, -1] == 20)
+    assert np.all(batch["obs"][:, -1] == 19)
+
+
+def test_frame_replay_buffer_quantization():
+    replay = FrameReplayBuffer(100, (180,), k=16, dtype=np.uint8, seed=0)
+    rng = np.random.default_rng(0)
+
+    frames = rng.uniform(0, LIDAR_MAX_DISTANCE, size=(50, 180))
+    replay.reset(frames[0])
+    for frame in frames[1:]:
+        replay.add(1, 0.1, frame, False)
+
+    batch = replay.sample(32)
+    assert batch["obs"].shape == (32, 16, 180)
+    assert batch["obs"].dtype == np.float32
+    diff = np.abs(batch["obs"][:, -1, np.newaxis] - frames)
+    error = np.min(np.max(diff, axis=2), axis=1)  # to the closest stored frame
+    assert np.all(error <= LIDAR_MAX_DISTANCE / 255 / 2 + 1e-4)
+    assert replay.nbytes < 100 * (180 + 32)
+
+
+def test_sum_tree():
+    rng = np.random.default_rng(0)
+    tree = SumTree(1000)
+    priorities = rng.random(1000)
+    priorities[::7] = 0.0
+    tree.update(np.arange(1000), priorities)
+    assert np.isclose(tree.total, np.sum(priorities))
+
+    # batched update with duplicates
+    idx = np.array([3, 500, 3, 999])
+    tree.update(idx, [5.0, 2.0, 5.0, 0.5])
+    priorities[idx] = [5.0, 2.0, 5.0, 0.5]
+    assert np.isclose(tree.total, np.sum(priorities))
+    np.testing.assert_allclose(tree[np.arange(1000)], priorities)
+
+    # prefix sums
+    values = rng.uniform(0, tree.total, size=10_000)
+    expected = np.searchsorted(np.cumsum(priorities), values, side="left")
+    np.testing.assert_array_equal(tree.find(values), expected)
+
+    # sampling frequencies follow the priorities
+    samples = tree.sample(200_000, rng)
+    assert np.all(priorities[samples] > 0)
+    freqs = np.bincount(samples, minlength=1000) / len(samples)
+    np.testing.assert_allclose(freqs, priorities / np.sum(priorities), atol=3e-3)
+
+
+def test_prioritized_replay_buffer():
+    replay = PrioritizedReplayBuffer(64, (12,), alpha=1.0, seed=0)
+    idx = replay.add_batch(
+        np.zeros((100, 12)),
+        np.ones(100),
+        np.zeros(100),
+        np.zeros((100, 12)),
+        np.zeros(100),
+    )
+    assert len(replay) == 64
+
+    # half of the total priority on the transition 10
+    td_errors = np.ones(100)
+    td_errors[idx == 10] = 63.0
+    replay.update_priorities(idx[-64:], td_errors[-64:])
+
+    batch = replay.sample(32, beta=1.0)
+    assert 0.35 < np.mean(batch["indices"] == 10) < 0.65
+    np.testing.assert_allclose(batch["weights"][batch["indices"] != 10], 1.0)
+    np.testing.assert_allclose(
+        batch["weights"][batch["indices"] == 10], 1.0 / 63.0, rtol=1e-5
+    )
@@ -0,0 +1,49 @@
+""" Tests the recording, re-simulation and rendering of replay files.
+"""
+
+import glob
+import os
+
+import gymnasium
+import numpy as np
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.envs.replays import (
+    ReplayRecorder,
+    load_replay,
+    render,
+    save_replay,
+    verify,
+)
+
+
+def test_replays(tmp_path):
+    env = ReplayRecorder(
+        gymnasium.make("FlappyBird-v0", use_lidar=True, score_limit=2),
+        str(tmp_path),
+        seed=0,
+    )
+    env.action_space.seed(0)
+    for _ in range(3):
+        env.reset()
+        while True:
+            _, _, terminated, truncated, _ = env.step(env.action_space.sample())
+            if terminated or truncated:
+                break
+    env.close()
+
+    paths = sorted(glob.glob(os.path.join(tmp_path, "*.fbr")))
+    assert len(paths) == 3
+    assert verify(paths) == []
+
+    # a different action changes the outcome of the episode
+    replay = load_replay(paths[0])
+    actions = replay.actions.copy()
+    actions[len(actions) // 2] ^= 1
+    save_replay(paths[0], replay._replace(actions=actions))
+    assert verify(paths) == [paths[0]]
+
+    replay = load_replay(paths[1])
+    render(replay, str(tmp_path / "frames"), every=2, format="png")
+    frames = glob.glob(os.path.join(tmp_path, "frames", "*.png"))
+    assert len(frames) == len(replay.actions) // 2 + 1
@@ -0,0 +1,30 @@
+""" Tests watching an environment from a separate viewer process.
+"""
+
+import time
+
+import gymnasium
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.envs.spectator import Spectator
+
+
+def test_spectator(monkeypatch):
+    # the viewer process inherits the environment variables
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    monkeypatch.setenv("PYGAME_HIDE_SUPPORT_PROMPT", "hide")
+
+    env = Spectator(gymnasium.make("FlappyBird-v0"), fps=100)
+    env.reset(seed=0)
+    steps = 0
+    deadline = time.monotonic() + 30.0
+    while env.frames < 3 and time.monotonic() < deadline:
+        _, _, terminated, _, _ = env.step(steps % 8 == 0)
+        if terminated:
+            env.reset()
+        steps += 1
+        time.sleep(0.001)
+
+    assert env.frames >= 3
+    assert int(env.ring.header[0]) > env.frames  # states were dropped
+    env.close()
@@ -0,0 +1,143 @@
+""" Tests the streaming statistics of the episodes.
+"""
+
+import json
+
+import gymnasium
+import numpy as np
+import pytest
+from gymnasium.vector import AutoresetMode
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.envs.statistics import (
+    EpisodeStatistics,
+    Moments,
+    QuantileSketch,
+    StatisticsWrapper,
+    VectorStatisticsWrapper,
+)
+
+
+def test_quantile_sketch():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.lognormal(3, 2, 10_000), -rng.exponential(5, 100)])
+    values[:50] = 0
+
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for chunk in np.array_split(values, 7):
+        sketch.add(chunk)
+    assert sketch.count == len(values)
+
+    qs = [0.0, 0.005, 0.1, 0.5, 0.9, 0.99, 1.0]
+    expected = np.quantile(values, qs, method="lower")
+    assert np.allclose(sketch.quantiles(qs), expected, rtol=0.01, atol=0)
+
+    # merging equals adding all the values to one sketch
+    left, right = QuantileSketch(), QuantileSketch()
+    left.add(values[:3000])
+    right.add(values[3000:])
+    left.merge(right)
+    assert left.quantiles(qs) == sketch.quantiles(qs)
+
+    restored = QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict())))
+    assert restored.quantiles(qs) == sketch.quantiles(qs)
+    assert np.isnan(QuantileSketch().quantiles([0.5])[0])
+    with pytest.raises(ValueError):
+        sketch.merge(QuantileSketch(relative_accuracy=0.05))
+
+
+def test_moments():
+    values = np.random.default_rng(1).normal(10, 3, 1000)
+    moments, other = Moments(), Moments()
+    moments.add(values[:10])
+    moments.add(values[10:400])
+    other.add(values[400:])
+    moments.merge(other)
+    moments.merge(Moments())
+
+    assert moments.count == 1000
+    assert np.isclose(moments.mean, values.mean())
+    assert np.isclose(moments.std, values.std())
+    assert (moments.min, moments.max) == (values.min(), values.max())
+    restored = Moments.from_dict(json.loads(json.dumps(moments.to_dict())))
+    assert restored.to_dict() == moments.to_dict()
+
+
+def play(env, episodes):
+    scores, lengths = [], []
+    env.reset(seed=0)
+    length = 0
+    for _ in range(100_000):
+        _, _, terminated, truncated, info = env.step(length % 11 == 0)
+        length += 1
+        if terminated or truncated:
+            scores.append(info["score"])
+            lengths.append(length)
+            if len(scores) == episodes:
+                return scores, lengths, info
+            env.reset()
+            length = 0
+
+
+def test_statistics_wrapper():
+    env = StatisticsWrapper(
+        gymnasium.make("FlappyBird-v0", use_lidar=False), snapshot_every=3
+    )
+    scores, lengths, info = play(env, episodes=6)
+
+    snapshot = info["statistics"]
+    assert snapshot["episodes"] == 6
+    assert snapshot["length"]["max"] == max(lengths)
+    assert np.isclose(snapshot["length"]["mean"], np.mean(lengths))
+    assert snapshot["score"]["max"] == max(scores)
+    for metric in ("score", "length", "return"):
+        summary = snapshot[metric]
+        assert summary["min"] <= summary["p50"] <= summary["p90"]
+        assert summary["p90"] <= summary["p99"] <= summary["max"]
+
+    # the statistics of several workers are merged after a round trip
+    total = EpisodeStatistics()
+    for _ in range(2):
+        data = json.loads(json.dumps(env.statistics.to_dict()))
+        total.merge(EpisodeStatistics.from_dict(data))
+    merged = total.snapshot()
+    assert merged["episodes"] == 12
+    assert merged["length"]["p50"] == snapshot["length"]["p50"]
+    env.close()
+
+
+@pytest.mark.parametrize(
+    "autoreset_mode", [AutoresetMode.NEXT_STEP, AutoresetMode.SAME_STEP]
+)
+def test_vector_statistics_wrapper(autoreset_mode):
+    num_envs = 4
+    envs = VectorStatisticsWrapper(
+        gymnasium.make_vec(
+            "FlappyBird-v0",
+            num_envs=num_envs,
+            use_lidar=False,
+            vector_kwargs={"autoreset_mode": autoreset_mode},
+        ),
+        snapshot_every=4,
+    )
+    single = StatisticsWrapper(gymnasium.make("FlappyBird-v0", use_lidar=False))
+
+    # every sub-environment plays the same episodes as the single environment
+    envs.reset(seed=[0] * num_envs)
+    lengths = np.zeros(num_envs, dtype=int)
+    for _ in range(3000):
+        _, _, terminated, truncated, _ = envs.step(lengths % 11 == 0)
+        lengths += 1
+        # in the next-step mode, the next step resets the sub-environment
+        lengths[terminated | truncated] = (
+            -1 if autoreset_mode == AutoresetMode.NEXT_STEP else 0
+        )
+    play(single, episodes=envs.statistics.episodes // num_envs)
+
+    vector, scalar = envs.statistics.snapshot(), single.statistics.snapshot()
+    assert vector["episodes"] >= 4 * num_envs
+    for metric in ("score", "length", "return"):
+        for key in ("mean", "max", "p50", "p99"):
+            assert np.isclose(vector[metric][key], scalar[metric][key])
+    envs.close()
+    single.close()
@@ -0,0 +1,73 @@
+""" Tests the crash and proximity telemetry of the environment.
+"""
+
+import gymnasium
+import numpy as np
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.envs.constants import LIDAR_MAX_DISTANCE
+from flappy_bird_gymnasium.envs.telemetry import (
+    CrashType,
+    EventLog,
+    collect,
+    summarize,
+)
+
+
+def play(env, episodes, seed=0):
+    env.reset(seed=seed)
+    steps = 0
+    for t in range(100_000):
+        _, _, terminated, _, _ = env.step(t % 9 == 0)
+        steps += 1
+        if terminated:
+            episodes -= 1
+            if episodes == 0:
+                return steps
+            env.reset()
+
+
+def test_telemetry(capsys):
+    env = gymnasium.make("FlappyBird-v0", use_lidar=True, debug=True)
+    steps = play(env, episodes=3)
+    assert capsys.readouterr().out == ""
+
+    events = env.unwrapped.telemetry.events()
+    assert len(events) == steps
+    assert np.array_equal(np.unique(events["episode"]), [0, 1, 2])
+    crashes = events[events["crash"] != CrashType.NONE]
+    assert len(crashes) == 3
+    assert np.all(events["ray_index"] >= 0)
+    assert np.all(events["ray_value"] <= LIDAR_MAX_DISTANCE)
+
+    summary = summarize(events)
+    assert summary["steps"] == steps
+    assert summary["crashes"] == 3
+    assert sum(summary["crash_types"].values()) == 3
+    assert sum(summary["crash_positions"].values()) == 3
+    env.close()
+
+    # the ring keeps the newest records
+    env = gymnasium.make("FlappyBird-v0", use_lidar=False, debug=True)
+    env.unwrapped.telemetry = EventLog(capacity=16)
+    play(env, episodes=2)
+    log = env.unwrapped.telemetry
+    events = log.events()
+    assert len(events) == 16 and log.dropped == log.recorded - 16
+    assert events["crash"][-1] != CrashType.NONE
+    assert np.all(np.diff(events["step"][events["episode"] == 1]) == 1)
+    assert np.all(events["ray_index"] == -1)
+    env.close()
+
+
+def test_collect():
+    envs = gymnasium.make_vec(
+        "FlappyBird-v0", num_envs=3, vectorization_mode="sync", debug=True
+    )
+    envs.reset(seed=0)
+    for _ in range(20):
+        envs.step(np.zeros(3, dtype=np.int64))
+    events = collect(envs)
+    assert len(events) == 60
+    assert np.array_equal(np.bincount(events["env_id"]), [20, 20, 20])
+    envs.close()
@@ -0,0 +1,38 @@
+""" Tests the tracing of environments and inference workers.
+"""
+
+import json
+import os
+
+import gymnasium
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.envs.tracing import Tracer, TracingWrapper
+from flappy_bird_gymnasium.tests.test_inference_server import play
+
+
+def test_tracer_ring():
+    tracer = Tracer(capacity=8, sample_rate=0.5)
+    env = TracingWrapper(gymnasium.make("FlappyBird-v0", use_lidar=False), tracer)
+    env.reset(seed=0)
+    for _ in range(20):
+        env.step(0)
+
+    # the reset, every other step and every other observation (also of the reset)
+    assert tracer.recorded == 1 + 10 + 11
+    assert tracer.dropped == tracer.recorded - 8
+    spans = tracer.ordered_spans()
+    assert len(spans) == 8
+    assert all(spans["start"][1:] >= spans["start"][:-1])
+
+
+def test_trace_inference_workers(tmp_path):
+    play(num_workers=2, episodes=1, max_batch_size=2, score_limit=3, trace_dir=tmp_path)
+
+    with open(os.path.join(tmp_path, "trace.json")) as f:
+        events = json.load(f)["traceEvents"]
+    names = {e["name"] for e in events if e["ph"] == "X"}
+    assert {"reset", "step", "observation", "inference_wait"} <= names
+    assert "inference_batch" in names
+    # two workers and the server
+    assert len({e["pid"] for e in events}) == 3
@@ -0,0 +1,65 @@
+""" Tests the actor/learner training of the Dueling DQN agent.
+"""
+
+import os
+import pickle
+
+import gymnasium
+import numpy as np
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.tests.test_dqn import load_q_model
+from flappy_bird_gymnasium.tests.train import SharedArrays, train
+
+
+def test_shared_arrays():
+    arrays = SharedArrays({"a": ((2, 3), np.float32), "b": ((4,), np.int64)})
+    arrays["a"][...] = 1.5
+    arrays["b"][...] = np.arange(4)
+
+    # a pickled copy attaches to the same memory
+    copy = pickle.loads(pickle.dumps(arrays))
+    assert np.all(copy["a"] == 1.5)
+    copy["b"][0] = 7
+    assert arrays["b"][0] == 7
+    copy.close()
+    arrays.close()
+
+
+def test_train(tmp_path):
+    metrics = train(
+        num_actors=2,
+        num_envs=2,
+        total_updates=20,
+        batch_size=8,
+        replay_capacity=1000,
+        warmup=64,
+        target_update=5,
+        broadcast_interval=5,
+        chunk_size=16,
+        slots_per_actor=2,
+        checkpoint_dir=str(tmp_path),
+        checkpoint_interval=10,
+    )
+    assert metrics["updates"] == 20
+    assert metrics["env_steps"] >= 64
+    assert metrics["checkpoint"] == os.path.join(tmp_path, "model.weights.h5")
+    for name in ("model_10", "model_20", "model"):
+        assert os.path.exists(os.path.join(tmp_path, name + ".weights.h5"))
+        assert os.path.exists(os.path.join(tmp_path, name + ".npz"))
+
+    # both checkpoints load and agree
+    env = gymnasium.make("FlappyBird-v0", use_lidar=False)
+    obs, _ = env.reset(seed=0)
+    keras_model = load_q_model(env, use_lidar=False, weights_path=metrics["checkpoint"])
+    numpy_model = load_q_model(
+        env,
+        use_lidar=False,
+        backend="numpy",
+        weights_path=os.path.join(tmp_path, "model.npz"),
+    )
+    states = obs[None].astype(np.float32)
+    assert np.allclose(
+        keras_model(states).numpy(), numpy_model(states), rtol=1e-4, atol=1e-5
+    )
+    env.close()
@@ -0,0 +1,106 @@
+""" Tests the recording of trajectories into memory-mapped shards.
+"""
+
+import json
+import os
+
+import gymnasium
+import numpy as np
+import pytest
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.envs.trajectory import (
+    INDEX_FILE,
+    TrajectoryDataset,
+    TrajectoryRecorder,
+)
+
+
+def record(directory, episodes=3, shard_size=50):
+    env = TrajectoryRecorder(
+        gymnasium.make("FlappyBird-v0", use_lidar=False),
+        directory,
+        shard_size=shard_size,
+    )
+    env.action_space.seed(0)
+
+    observations, actions, steps = [], [], []
+    for t in range(episodes):
+        obs, _ = env.reset(seed=t)
+        observations.append(obs)
+        steps.append(0)
+        while True:
+            action = env.action_space.sample()
+            obs, _, terminated, truncated, _ = env.step(action)
+            observations.append(obs)
+            actions.append(action)
+            steps.append(steps[-1] + 1)
+            if terminated or truncated:
+                break
+    env.close()
+    return np.array(observations), np.array(actions), np.array(steps)
+
+
+def test_trajectory_recorder(tmp_path):
+    observations, actions, _ = record(str(tmp_path))
+
+    with open(os.path.join(tmp_path, INDEX_FILE)) as f:
+        index = json.load(f)
+    assert len(index["shards"]) > 1
+
+    rows = {"obs": [], "action": [], "step": [], "episode": [], "seed": []}
+    for i, shard in enumerate(index["shards"]):
+        for key in rows:
+            column = np.load(
+                os.path.join(tmp_path, shard["name"], key + ".npy"), mmap_mode="r"
+            )
+            rows[key].append(np.array(column[: shard["length"]]))
+        # drop the copied row of an episode continuing from the last shard
+        if i > 0 and rows["step"][-1][0] > 0:
+            for key in rows:
+                rows[key][-1] = rows[key][-1][1:]
+    rows = {key: np.concatenate(value) for key, value in rows.items()}
+
+    np.testing.assert_array_equal(rows["obs"], observations)
+    np.testing.assert_array_equal(rows["action"][rows["step"] > 0], actions)
+    assert np.all(rows["action"][rows["step"] == 0] == -1)
+    np.testing.assert_array_equal(rows["episode"][rows["step"] == 0], [0, 1, 2])
+    np.testing.assert_array_equal(rows["seed"], rows["episode"])
+
+
+def test_trajectory_recorder_shard_size(tmp_path):
+    env = gymnasium.make("FlappyBird-v0", use_lidar=False)
+    with pytest.raises(ValueError):
+        TrajectoryRecorder(env, str(tmp_path), shard_size=1)
+    env.close()
+
+
+# with small shards, the stacks read back into the previous shards
+@pytest.mark.parametrize("shard_size", [10_000, 7, 2])
+def test_trajectory_dataset(tmp_path, shard_size):
+    observations, actions, steps = record(str(tmp_path), shard_size=shard_size)
+    k = 4
+
+    dataset = TrajectoryDataset(str(tmp_path), k=k, seed=0)
+    assert len(dataset) == len(actions)
+
+    # the transitions of the index follow the recording order
+    batch = dataset.get(np.arange(len(dataset)))
+    np.testing.assert_array_equal(batch["actions"], actions)
+    assert batch["dones"][-1] == 1.0
+
+    (rows,) = np.nonzero(steps > 0)
+    np.testing.assert_allclose(batch["next_obs"][:, -1], observations[rows])
+    for j, i in enumerate(rows):
+        stack = np.maximum(np.arange(i - k, i), i - steps[i])
+        np.testing.assert_allclose(batch["obs"][j], observations[stack])
+
+    # the transitions come back in the order asked for
+    batch = dataset.get([7, 3])
+    np.testing.assert_array_equal(batch["obs"][0], dataset.get([7])["obs"][0])
+    np.testing.assert_array_equal(batch["obs"][1], dataset.get([3])["obs"][0])
+    np.testing.assert_array_equal(batch["actions"], actions[[7, 3]])
+
+    batches = list(dataset.batches(32, num_batches=5, prefetch=2))
+    assert len(batches) == 5
+    assert batches[0]["obs"].shape == (32, k, *observations.shape[1:])
@@ -0,0 +1,55 @@
+""" Tests the streaming capture of episode videos.
+"""
+
+import glob
+import os
+
+import gymnasium
+import numpy as np
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.envs.video import VideoRecorder, read_video
+
+
+def play(env, seed, frames=None, num_steps=40):
+    env.reset(seed=seed)
+    if frames is not None:
+        frames.append(env.render())
+    for t in range(num_steps):
+        _, _, terminated, _, _ = env.step(t % 6 == 0)
+        if frames is not None:
+            frames.append(env.render())
+        if terminated:
+            break
+
+
+def test_video_recorder(tmp_path):
+    frames = []
+    env = gymnasium.make("FlappyBird-v0", render_mode="rgb_array")
+    play(env, seed=0, frames=frames)
+    env.close()
+
+    env = VideoRecorder(
+        gymnasium.make("FlappyBird-v0", render_mode="rgb_array"),
+        str(tmp_path),
+        every=3,
+        max_queue=4,
+    )
+    play(env, seed=0)
+    play(env, seed=1)
+    env.close()
+
+    video = list(read_video(os.path.join(tmp_path, "episode_000000.fbv")))
+    np.testing.assert_array_equal(video, frames[::3])
+    assert os.path.exists(os.path.join(tmp_path, "episode_000001.fbv"))
+
+    env = VideoRecorder(
+        gymnasium.make("FlappyBird-v0", render_mode="rgb_array"),
+        str(tmp_path),
+        format="png",
+        every=3,
+    )
+    play(env, seed=0)
+    env.close()
+    images = glob.glob(os.path.join(tmp_path, "episode_000000", "*.png"))
+    assert len(images) == len(video)
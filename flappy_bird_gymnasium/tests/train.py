@@ -0,0 +1,416 @@
+""" Actor/learner training of the Dueling DQN agent.
+
+Several actor processes step vectorized FlappyBird environments with the NumPy
+inference of the Q-network (so they never import TensorFlow) and write chunks
+of transitions into shared-memory slots. The learner, running in the main
+process, moves the finished chunks into its replay buffer, trains the
+TensorFlow model with Double DQN and periodically broadcasts the new weights to
+the actors through shared memory.
+
+The checkpoints are Keras weight files loadable by
+:func:`flappy_bird_gymnasium.tests.test_dqn.play`, next to their `.npz`
+conversion for the NumPy models:
+
+    $ python -m flappy_bird_gymnasium.tests.train --actors 4 --updates 100000
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import time
+from multiprocessing import shared_memory
+
+import gymnasium
+import numpy as np
+
+import flappy_bird_gymnasium
+from flappy_bird_gymnasium.tests.dueling_numpy import (
+    DuelingDQN,
+    keras_layers,
+    layers_to_weights,
+)
+from flappy_bird_gymnasium.tests.replay import ReplayBuffer
+
+
+class SharedArrays:
+    """Named NumPy arrays living in a single shared-memory block.
+
+    Instances are picklable: a child process attaches to the same block by name.
+
+    Args:
+        spec (Dict[str, Tuple[Tuple[int, ...], np.dtype]]): Shape and data type
+            of every array.
+    """
+
+    def __init__(self, spec, name=None):
+        self.spec = {
+            k: (tuple(shape), np.dtype(dtype)) for k, (shape, dtype) in spec.items()
+        }
+        size = sum(
+            int(np.prod(shape)) * dtype.itemsize for shape, dtype in self.spec.values()
+        )
+        self._owner = name is None
+        self._shm = shared_memory.SharedMemory(
+            name=name, create=self._owner, size=max(size, 1)
+        )
+
+        self.arrays = {}
+        offset = 0
+        for key, (shape, dtype) in self.spec.items():
+            self.arrays[key] = np.ndarray(
+                shape, dtype=dtype, buffer=self._shm.buf, offset=offset
+            )
+            offset += self.arrays[key].nbytes
+
+    def __getitem__(self, key):
+        return self.arrays[key]
+
+    def __reduce__(self):
+        return (self.__class__, (self.spec, self._shm.name))
+
+    def close(self):
+        self.arrays = {}
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class WeightBroadcast:
+    """Publishes versioned NumPy weights of the Q-network to the actors.
+
+    Args:
+        weights (Dict[str, np.ndarray]): Initial weights, fixing the layout.
+    """
+
+    def __init__(self, weights, ctx):
+        self.buffer = SharedArrays(
+            {k: (v.shape, np.float32) for k, v in weights.items()}
+        )
+        self.version = ctx.Value("q", 0)
+        self.publish(weights)
+
+    def publish(self, weights):
+        with self.version.get_lock():
+            for key, value in weights.items():
+                self.buffer[key][...] = value
+            self.version.value += 1
+
+    def fetch(self, version):
+        """Returns `(weights, version)`, or `(None, version)` if not newer."""
+        if self.version.value == version:
+            return None, version
+        with self.version.get_lock():
+            weights = {k: v.copy() for k, v in self.buffer.arrays.items()}
+            return weights, self.version.value
+
+    def close(self):
+        self.buffer.close()
+
+
+def _make_env(score_limit):
+    return gymnasium.make("FlappyBird-v0", use_lidar=False, score_limit=score_limit)
+
+
+def _actor(actor_id, config, broadcast, slots, free_slots, full_slots, stats, stop):
+    """Steps `num_envs` environments and fills transition chunks."""
+    num_envs = config["num_envs"]
+    rng = np.random.default_rng(config["seed"] + actor_id)
+
+    # Ape-X style fixed exploration rate per actor
+    epsilon = config["epsilon"] ** (
+        1.0 + config["epsilon_alpha"] * actor_id / max(config["num_actors"] - 1, 1)
+    )
+
+    envs = gymnasium.vector.SyncVectorEnv(
+        [lambda: _make_env(config["score_limit"]) for _ in range(num_envs)]
+    )
+    obs, _ = envs.reset(seed=config["seed"] + 1000 * actor_id)
+    autoreset = np.zeros(num_envs, dtype=np.bool_)
+    weights, version = broadcast.fetch(0)
+    q_model = DuelingDQN(weights)
+
+    slot, row = None, 0
+    while not stop.is_set():
+        # new weights
+        weights, version = broadcast.fetch(version)
+        if weights is not None:
+            q_model = DuelingDQN(weights)
+
+        actions = q_model.get_actions(obs)
+        explore = rng.random(num_envs) < epsilon
+        actions[explore] = rng.integers(0, 2, size=np.sum(explore))
+
+        next_obs, rewards, terminated, truncated, info = envs.step(actions)
+        stats["steps"][actor_id] += num_envs
+
+        done = np.logical_and(np.logical_or(terminated, truncated), ~autoreset)
+        if np.any(done):
+            stats["episodes"][actor_id] += np.sum(done)
+            stats["scores"][actor_id] += np.sum(info["score"][done])
+
+        # the environments reset on this step didn't make a transition
+        pending = np.flatnonzero(~autoreset)
+        while len(pending) > 0 and not stop.is_set():
+            if slot is None:
+                try:
+                    slot, row = free_slots.get(timeout=0.1), 0
+                except queue.Empty:
+                    continue
+
+            n = min(len(pending), config["chunk_size"] - row)
+            idx, pending = pending[:n], pending[n:]
+            rows = slice(row, row + n)
+            slots["obs"][slot, rows] = obs[idx]
+            slots["actions"][slot, rows] = actions[idx]
+            slots["rewards"][slot, rows] = rewards[idx]
+            slots["next_obs"][slot, rows] = next_obs[idx]
+            slots["dones"][slot, rows] = terminated[idx]
+            row += n
+
+            if row == config["chunk_size"]:
+                full_slots.put(slot)
+                slot = None
+
+        obs, autoreset = next_obs, np.logical_or(terminated, truncated)
+
+    envs.close()
+
+
+def _build_q_model(action_space_n, obs_shape):
+    from flappy_bird_gymnasium.tests.dueling import DuelingDQN as KerasDuelingDQN
+
+    q_model = KerasDuelingDQN(int(action_space_n))
+    q_model(np.zeros((1, *obs_shape), dtype=np.float32))
+    return q_model
+
+
+def train(
+    num_actors=4,
+    num_envs=16,
+    total_updates=100_000,
+    batch_size=128,
+    learning_rate=1e-4,
+    gamma=0.99,
+    replay_capacity=1_000_000,
+    warmup=10_000,
+    target_update=2_000,
+    broadcast_interval=100,
+    chunk_size=256,
+    slots_per_actor=4,
+    epsilon=0.1,
+    epsilon_alpha=3.0,
+    score_limit=None,
+    checkpoint_dir="checkpoints",
+    checkpoint_interval=10_000,
+    log_interval=10.0,
+    seed=0,
+    context="spawn",
+):
+    """Trains the Dueling DQN on the feature observations.
+
+    Returns:
+        A dictionary with the final throughput metrics and the path of the last
+        checkpoint.
+    """
+    import tensorflow as tf
+
+    ctx = mp.get_context(context)
+    env = _make_env(score_limit)
+    obs_shape = env.observation_space.shape
+    num_actions = env.action_space.n
+    env.close()
+
+    q_model = _build_q_model(num_actions, obs_shape)
+    target_model = _build_q_model(num_actions, obs_shape)
+    target_model.set_weights(q_model.get_weights())
+    optimizer = tf.keras.optimizers.Adam(learning_rate=learning_rate)
+    replay = ReplayBuffer(replay_capacity, obs_shape, seed=seed)
+
+    @tf.function
+    def train_step(obs, actions, rewards, next_obs, dones):
+        # Double DQN target
+        next_actions = tf.argmax(q_model(next_obs), axis=-1)
+        next_q = tf.gather(target_model(next_obs), next_actions, batch_dims=1)
+        targets = rewards + gamma * (1.0 - dones) * next_q
+
+        with tf.GradientTape() as tape:
+            q = tf.gather(q_model(obs, training=True), actions, batch_dims=1)
+            loss = tf.reduce_mean(tf.keras.losses.huber(targets[:, None], q[:, None]))
+        grads = tape.gradient(loss, q_model.trainable_variables)
+        optimizer.apply_gradients(zip(grads, q_model.trainable_variables))
+        return loss
+
+    def numpy_weights():
+        return layers_to_weights(keras_layers(q_model))
+
+    def save_checkpoint(name):
+        path = os.path.join(checkpoint_dir, name)
+        q_model.save_weights(path + ".weights.h5")
+        np.savez(path + ".npz", **numpy_weights())
+        return path + ".weights.h5"
+
+    # shared memory
+    num_slots = num_actors * slots_per_actor
+    slots = SharedArrays(
+        {
+            "obs": ((num_slots, chunk_size, *obs_shape), np.float32),
+            "actions": ((num_slots, chunk_size), np.int64),
+            "rewards": ((num_slots, chunk_size), np.float32),
+            "next_obs": ((num_slots, chunk_size, *obs_shape), np.float32),
+            "dones": ((num_slots, chunk_size), np.float32),
+        }
+    )
+    stats = SharedArrays(
+        {
+            "steps": ((num_actors,), np.int64),
+            "episodes": ((num_actors,), np.int64),
+            "scores": ((num_actors,), np.int64),
+        }
+    )
+    broadcast = WeightBroadcast(numpy_weights(), ctx)
+    free_slots = [ctx.Queue() for _ in range(num_actors)]
+    full_slots = [ctx.Queue() for _ in range(num_actors)]
+    for actor_id in range(num_actors):
+        for i in range(slots_per_actor):
+            free_slots[actor_id].put(actor_id * slots_per_actor + i)
+    stop = ctx.Event()
+
+    config = {
+        "num_actors": num_actors,
+        "num_envs": num_envs,
+        "chunk_size": chunk_size,
+        "epsilon": epsilon,
+        "epsilon_alpha": epsilon_alpha,
+        "score_limit": score_limit,
+        "seed": seed,
+    }
+    actors = [
+        ctx.Process(
+            target=_actor,
+            args=(
+                actor_id,
+                config,
+                broadcast,
+                slots,
+                free_slots[actor_id],
+                full_slots[actor_id],
+                stats,
+                stop,
+            ),
+            daemon=True,
+        )
+        for actor_id in range(num_actors)
+    ]
+    for actor in actors:
+        actor.start()
+
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    start_time = time.perf_counter()
+    log_time, log_steps, log_updates = start_time, 0, 0
+    log_episodes, log_scores = 0, 0
+    updates, checkpoint = 0, None
+
+    try:
+        while updates < total_updates:
+            # consume the finished chunks
+            for actor_id in range(num_actors):
+                while True:
+                    try:
+                        slot = full_slots[actor_id].get_nowait()
+                    except queue.Empty:
+                        break
+                    replay.add_batch(
+                        slots["obs"][slot],
+                        slots["actions"][slot],
+                        slots["rewards"][slot],
+                        slots["next_obs"][slot],
+                        slots["dones"][slot],
+                    )
+                    free_slots[actor_id].put(slot)
+
+            if len(replay) < warmup:
+                time.sleep(0.01)
+            else:
+                batch = replay.sample(batch_size)
+                train_step(
+                    batch["obs"],
+                    batch["actions"],
+                    batch["rewards"],
+                    batch["next_obs"],
+                    batch["dones"],
+                )
+                updates += 1
+
+                if updates % target_update == 0:
+                    target_model.set_weights(q_model.get_weights())
+                if updates % broadcast_interval == 0:
+                    broadcast.publish(numpy_weights())
+                if updates % checkpoint_interval == 0:
+                    checkpoint = save_checkpoint(f"model_{updates}")
+
+            now = time.perf_counter()
+            if now - log_time >= log_interval:
+                steps = int(np.sum(stats["steps"]))
+                episodes = int(np.sum(stats["episodes"]))
+                scores = int(np.sum(stats["scores"]))
+                print(
+                    f"Updates: {updates}, Env steps: {steps}, "
+                    f"Env steps/sec: {(steps - log_steps) / (now - log_time):.0f}, "
+                    f"Updates/sec: {(updates - log_updates) / (now - log_time):.1f}, "
+                    f"Replay: {len(replay)}, "
+                    f"Mean score: "
+                    f"{(scores - log_scores) / max(episodes - log_episodes, 1):.2f}"
+                )
+                log_time, log_steps, log_updates = now, steps, updates
+                log_episodes, log_scores = episodes, scores
+    finally:
+        stop.set()
+        for actor in actors:
+            actor.join(timeout=10)
+            if actor.is_alive():
+                actor.terminate()
+
+    elapsed_time = time.perf_counter() - start_time
+    checkpoint = save_checkpoint("model")
+    metrics = {
+        "updates": updates,
+        "env_steps": int(np.sum(stats["steps"])),
+        "episodes": int(np.sum(stats["episodes"])),
+        "time": elapsed_time,
+        "env_steps_per_sec": int(np.sum(stats["steps"])) / elapsed_time,
+        "updates_per_sec": updates / elapsed_time,
+        "checkpoint": checkpoint,
+    }
+
+    broadcast.close()
+    slots.close()
+    stats.close()
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--actors", type=int, default=4)
+    parser.add_argument("--envs", type=int, default=16)
+    parser.add_argument("--updates", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--warmup", type=int, default=10_000)
+    parser.add_argument("--checkpoint-dir", type=str, default="checkpoints")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    metrics = train(
+        num_actors=args.actors,
+        num_envs=args.envs,
+        total_updates=args.updates,
+        batch_size=args.batch_size,
+        warmup=args.warmup,
+        checkpoint_dir=args.checkpoint_dir,
+        seed=args.seed,
+    )
+    print(metrics)
+
+
+if __name__ == "__main__":
+    main()